@@ -64,7 +64,15 @@ class Config:
     # Redis (для кешування)
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
     CACHE_TTL = int(os.getenv("CACHE_TTL", 3600))  # 1 година
-    
+
+    # Кеш графіків (пам'ять + необов'язковий дисковий рівень)
+    CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    CHART_CACHE_DIR = os.getenv("CHART_CACHE_DIR", "")  # порожньо = без диска
+    CHART_CACHE_DISK_MAX_BYTES = int(os.getenv("CHART_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024))
+    CHART_FILE_ID_CACHE_SIZE = int(os.getenv("CHART_FILE_ID_CACHE_SIZE", 10000))
+    # Ручні правки таблиці не змінюють версію даних – кеш старіє за цей час
+    CHART_CACHE_TTL_SECONDS = int(os.getenv("CHART_CACHE_TTL_SECONDS", 300))
+
     # Sentry (моніторинг помилок)
     SENTRY_DSN = os.getenv("SENTRY_DSN")
     SENTRY_ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
@@ -74,23 +82,84 @@ class Config:
     DEFAULT_CURRENCY = "UAH"
     SUPPORTED_CURRENCIES = ["UAH", "USD", "EUR", "CRYPTO"]
     
-    # Налаштування нагадувань
+    # Налаштування нагадувань (типовий розклад; користувач може задати свій час і дні)
     REMINDER_TIMES = [
         {"hour": 9, "minute": 0},   # Ранкове нагадування
         {"hour": 13, "minute": 0},  # Обідня перевірка
         {"hour": 20, "minute": 0}   # Вечірнє нагадування
     ]
+    # Час кожного користувача зсувається на сталі 0..N-1 хвилин, щоб розподілити відправки
+    REMINDER_SPREAD_MINUTES = int(os.getenv("REMINDER_SPREAD_MINUTES", 15))
+    REMINDER_TICK_SECONDS = int(os.getenv("REMINDER_TICK_SECONDS", 60))
+    # Як часто перечитувати reminder_settings (ручні правки таблиці)
+    REMINDER_RELOAD_SECONDS = int(os.getenv("REMINDER_RELOAD_SECONDS", 3600))
+    # Останній день активності користувачів (SQLite) – активним сьогодні нагадування не йдуть
+    ACTIVITY_INDEX_DB = os.getenv("ACTIVITY_INDEX_DB", str(BASE_DIR / "data" / "activity_index.sqlite3"))
     
     # Обмеження
     MAX_MESSAGE_LENGTH = 4096
     MAX_TRANSACTIONS_DISPLAY = 10
     RATE_LIMIT_MESSAGES = 30  # повідомлень на хвилину
+    # Розсилки: глобальний темп (ліміт Telegram ~30/с), паралельні відправки, повтори після 429
+    BROADCAST_RATE_PER_SECOND = float(os.getenv("BROADCAST_RATE_PER_SECOND", 25))
+    BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", 10))
+    BROADCAST_MAX_RETRIES = int(os.getenv("BROADCAST_MAX_RETRIES", 3))
+    # Менші розсилки (щохвилинні пачки нагадувань) лише логуються, без запису в broadcast_stats
+    BROADCAST_STATS_MIN_RECIPIENTS = int(os.getenv("BROADCAST_STATS_MIN_RECIPIENTS", 100))
     
+    # Процеси-воркери для рендеру графіків і PDF (0 = потоки в основному процесі)
+    # CHART_RENDER_WORKERS – стара назва, коли пул обслуговував лише графіки
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", os.getenv("CHART_RENDER_WORKERS", 2)))
+    
+    # Експорт: файли до цього розміру тримаються в пам'яті, більші – на диску
+    EXPORT_SPOOL_MAX_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", 1024 * 1024))
+    EXPORT_MAX_CONCURRENT_JOBS = int(os.getenv("EXPORT_MAX_CONCURRENT_JOBS", 2))
+    EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    EXPORT_FILE_ID_CACHE_SIZE = int(os.getenv("EXPORT_FILE_ID_CACHE_SIZE", 10000))
+    EXPORT_CACHE_TTL_SECONDS = int(os.getenv("EXPORT_CACHE_TTL_SECONDS", 300))
+    
+    # Щоденна перевірка підписок: аркушів на один batchGet і одночасних звернень до Sheets
+    SUBSCRIPTION_READ_BATCH = int(os.getenv("SUBSCRIPTION_READ_BATCH", 50))
+    SUBSCRIPTION_SWEEP_CONCURRENCY = int(os.getenv("SUBSCRIPTION_SWEEP_CONCURRENCY", 4))
+    # Індекс дат списання (SQLite); повне пересканування аркушів – раз на стільки днів
+    SUBSCRIPTION_INDEX_DB = os.getenv(
+        "SUBSCRIPTION_INDEX_DB", str(BASE_DIR / "data" / "subscription_index.sqlite3")
+    )
+    SUBSCRIPTION_INDEX_REBUILD_DAYS = int(os.getenv("SUBSCRIPTION_INDEX_REBUILD_DAYS", 7))
+
+    # Курси ПриватБанку: після TTL віддаються останні відомі, оновлення – у фоні
+    EXCHANGE_RATES_TTL_SECONDS = int(os.getenv("EXCHANGE_RATES_TTL_SECONDS", 600))
+    EXCHANGE_RATES_REFRESH_SECONDS = int(os.getenv("EXCHANGE_RATES_REFRESH_SECONDS", 540))
+    EXCHANGE_RATES_FILE = os.getenv(
+        "EXCHANGE_RATES_FILE", str(BASE_DIR / "data" / "exchange_rates.json")
+    )  # порожньо = без диска
+    # Історія курсів по днях (SQLite): щоденне доповнення та початкове заповнення
+    RATE_HISTORY_DB = os.getenv("RATE_HISTORY_DB", str(BASE_DIR / "data" / "rate_history.sqlite3"))
+    RATE_HISTORY_BACKFILL_DAYS = int(os.getenv("RATE_HISTORY_BACKFILL_DAYS", 365))
+    RATE_HISTORY_FETCH_CONCURRENCY = int(os.getenv("RATE_HISTORY_FETCH_CONCURRENCY", 2))
+
+    # Кеш відповідей AI: ключ – відбиток вхідних даних запиту
+    AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", 6 * 3600))
+    AI_CACHE_MAX_ITEMS = int(os.getenv("AI_CACHE_MAX_ITEMS", 1000))
+    # Виклики Gemini: власний пул потоків, черга, дедлайн і запобіжник
+    AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 4))
+    AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", 16))
+    AI_CALL_TIMEOUT_SECONDS = float(os.getenv("AI_CALL_TIMEOUT_SECONDS", 60))
+    AI_BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", 5))
+    AI_BREAKER_RESET_SECONDS = float(os.getenv("AI_BREAKER_RESET_SECONDS", 60))
+    # Нічний перерахунок 30-денного AI-аналізу для активних користувачів (час – Київ)
+    AI_PRECOMPUTE_HOUR = int(os.getenv("AI_PRECOMPUTE_HOUR", 4))
+    AI_PRECOMPUTE_ACTIVE_DAYS = int(os.getenv("AI_PRECOMPUTE_ACTIVE_DAYS", 7))
+    AI_PRECOMPUTE_CONCURRENCY = int(os.getenv("AI_PRECOMPUTE_CONCURRENCY", 2))
+    AI_PRECOMPUTE_TTL_SECONDS = int(os.getenv("AI_PRECOMPUTE_TTL_SECONDS", 24 * 3600))
+
     # Функції (увімкнути/вимкнути)
     ENABLE_AI_ANALYSIS = True
     ENABLE_EXPORT = True
     ENABLE_ADVANCED_ANALYTICS = True
     ENABLE_FAMILY_BUDGETS = False  # Майбутня функція
+    # Фонове прогрівання важких бібліотек після старту webhook
+    ENABLE_BACKGROUND_WARMUP = os.getenv("ENABLE_BACKGROUND_WARMUP", "true").lower() == "true"
     
     def validate(self):
         """Перевірка наявності обов'язкових змінних"""
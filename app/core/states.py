@@ -22,6 +22,7 @@ class UserState(StatesGroup):
     select_transaction_to_edit = State()
     add_feedback = State()
     waiting_for_export_period = State()
+    waiting_for_reminder_times = State()
     setting_savings_goal = State()
 
 
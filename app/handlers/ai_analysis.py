@@ -5,6 +5,8 @@
 Обробники для AI-аналізу бюджету.
 """
 
+import asyncio
+import html
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
@@ -18,15 +20,15 @@ from app.core.states import AIAnalysisState
 from app.keyboards.inline import get_ai_analysis_period_keyboard
 from app.services.ai_service import ai_service
 from app.services.sheets_service import sheets_service
-from app.utils.formatters import format_currency, format_date, split_long_message
+from app.utils.formatters import format_currency, format_date
 from app.utils.helpers import SheetContext, build_sheet_context
+from app.utils.message_stream import MessageStreamer
 from app.utils.validators import validate_date
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 MIN_TRANSACTIONS_REQUIRED = 5
-AI_TRANSACTIONS_LIMIT = 200
 PERIOD_LENGTHS = {"30": 30, "60": 60, "90": 90}
 
 
@@ -55,7 +57,7 @@ async def handle_ai_period(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    start, end = _resolve_period_bounds(period_key)
+    start, end = resolve_period_bounds(period_key)
     if start is None and end is None:
         await callback.answer("Невідомий період", show_alert=True)
         return
@@ -136,31 +138,23 @@ async def _run_ai_analysis(
         "🤖 Збираю транзакції та готую аналітику..."
     )
     try:
-        rows = sheets_service.get_all_transactions(ctx.sheet_title, ctx.legacy_titles)
-        filtered, actual_start, actual_end = _filter_transactions(rows, start, end)
-
-        if len(filtered) < MIN_TRANSACTIONS_REQUIRED:
+        payload = await prepare_analysis(ctx, start, end)
+        if payload is None:
             await waiting_msg.edit_text(
                 "Замало даних для AI-аналізу обраного періоду. Потрібно хоча б 5 транзакцій."
             )
             return
 
-        analysis_context, ai_transactions, period_label = _build_analysis_payload(
-            filtered, ctx, actual_start, actual_end
-        )
-
-        analysis_text = await ai_service.analyze_finances(
-            ai_transactions, analysis_context
-        )
-
-        try:
-            await waiting_msg.delete()
-        except Exception:
-            pass
+        analysis_context, ai_transactions, period_label = payload
 
+        # Відповідь з'являється в повідомленні очікування по мірі генерації
         header = f"🤖 <b>AI Аналіз за {period_label}</b>\n\n"
-        for chunk in split_long_message(header + analysis_text):
-            await target_message.answer(chunk)
+        streamer = MessageStreamer(waiting_msg, header=header)
+        async for chunk in ai_service.stream_finances_analysis(
+            ai_transactions, analysis_context
+        ):
+            await streamer.feed(html.escape(chunk, quote=False))
+        await streamer.finish()
 
     except Exception as exc:
         logger.error("AI analysis error for %s: %s", ctx.sheet_title, exc, exc_info=True)
@@ -171,16 +165,40 @@ async def _run_ai_analysis(
         await state.clear()
 
 
-def _resolve_period_bounds(
+def resolve_period_bounds(
     period_key: str,
 ) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Межі періоду; початок вирівняно на північ (UTC), тож протягом дня
+    ті самі дані дають той самий AI-контекст і відповідь береться з кешу.
+    """
     now = datetime.now(timezone.utc)
     if period_key == "all":
         return None, now
-    days = PERIOD_LENGTHS.get(period_key)
-    if days is None:
-        return now - timedelta(days=30), now
-    return now - timedelta(days=days), now
+    days = PERIOD_LENGTHS.get(period_key, 30)
+    start = (now - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, now
+
+
+async def prepare_analysis(
+    ctx: SheetContext,
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], str]]:
+    """Контекст, транзакції та підпис періоду для AI; None, якщо транзакцій замало."""
+    rows, goals, budgets = await _load_analysis_sources(ctx)
+    filtered, actual_start, actual_end = _filter_transactions(rows, start, end)
+    if len(filtered) < MIN_TRANSACTIONS_REQUIRED:
+        return None
+
+    return _build_analysis_payload(
+        filtered,
+        actual_start,
+        actual_end,
+        goals=goals,
+        budgets=budgets,
+        subscriptions=sheets_service.select_subscriptions(rows),
+    )
 
 
 def _filter_transactions(
@@ -211,21 +229,50 @@ def _filter_transactions(
     return filtered, filtered[0]["_parsed_date"], filtered[-1]["_parsed_date"]
 
 
+async def _load_analysis_sources(
+    ctx: SheetContext,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Транзакції, цілі та бюджети для AI-контексту.
+
+    Транзакції й цілі живуть в одному аркуші і читаються разом; аркуш
+    бюджетів читається паралельно, тож очікування визначає найповільніше
+    читання, а не їх сума. Підписки вибираються з уже завантажених транзакцій.
+    """
+    (rows, goals), budgets = await asyncio.gather(
+        asyncio.to_thread(
+            sheets_service.get_transactions_and_goals, ctx.sheet_title, ctx.legacy_titles
+        ),
+        asyncio.to_thread(_load_budgets, ctx),
+    )
+    return rows, goals, budgets
+
+
+def _load_budgets(ctx: SheetContext) -> List[Dict[str, Any]]:
+    try:
+        return sheets_service.get_category_budgets(ctx.sheet_title, ctx.legacy_titles)
+    except Exception as exc:
+        logger.warning("Could not load budgets for %s: %s", ctx.sheet_title, exc)
+        return []
+
+
 def _build_analysis_payload(
     transactions: List[Dict[str, Any]],
-    ctx: SheetContext,
     period_start: datetime,
     period_end: datetime,
+    goals: List[Dict[str, Any]],
+    budgets: List[Dict[str, Any]],
+    subscriptions: List[Dict[str, Any]],
 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], str]:
-    """Готує агрегати та контекст для AI."""
+    """Готує агрегати та контекст для AI з уже завантажених даних."""
     currency = _detect_currency(transactions, config.DEFAULT_CURRENCY)
     aggregates = _calculate_aggregates(transactions, period_start, period_end)
     top_categories = _summarize_top_categories(transactions, currency)
-    goals_summary = _summarize_goals(ctx, currency)
-    budgets_summary = _summarize_budgets(ctx, currency)
-    subscriptions_summary = _summarize_subscriptions(ctx, currency)
+    goals_summary = _summarize_goals(goals, currency)
+    budgets_summary = _summarize_budgets(budgets, currency)
+    subscriptions_summary = _summarize_subscriptions(subscriptions, currency)
 
-    limited = transactions[-AI_TRANSACTIONS_LIMIT:]
+    # Розмір промпту обмежує ai_service: дрібні витрати він підсумовує під бюджет токенів
     ai_transactions = [
         {
             "date": tx["_parsed_date"].isoformat(),
@@ -234,30 +281,23 @@ def _build_analysis_payload(
             "category": tx.get("category", "Без категорії"),
             "note": tx.get("note", ""),
         }
-        for tx in limited
+        for tx in transactions
     ]
 
     period_display = (
         f"{period_start.strftime('%d.%m.%Y')} → {period_end.strftime('%d.%m.%Y')}"
     )
-    period_note = (
-        f"This analysis covers the period from {period_start.strftime('%Y-%m-%d')} "
-        f"to {period_end.strftime('%Y-%m-%d')}. Only the last {len(ai_transactions)} "
-        "transactions were included to optimize context."
-    )
 
     analysis_context = {
         "period_start": period_start.strftime("%Y-%m-%d"),
         "period_end": period_end.strftime("%Y-%m-%d"),
         "transactions_count": len(transactions),
-        "limited_count": len(ai_transactions),
         "currency": currency,
         "aggregates": aggregates,
         "top_categories": top_categories,
         "goals_summary": goals_summary,
         "budgets_summary": budgets_summary,
         "subscriptions_summary": subscriptions_summary,
-        "period_note": period_note,
     }
 
     return analysis_context, ai_transactions, period_display
@@ -311,8 +351,7 @@ def _summarize_top_categories(transactions: List[Dict[str, Any]], currency: str)
     )
 
 
-def _summarize_goals(ctx: SheetContext, currency: str) -> str:
-    goals = _load_with_fallback(ctx, sheets_service.get_goals)
+def _summarize_goals(goals: List[Dict[str, Any]], currency: str) -> str:
     if not goals:
         return "Активних фінансових цілей немає."
 
@@ -331,8 +370,7 @@ def _summarize_goals(ctx: SheetContext, currency: str) -> str:
     return "\n".join(lines)
 
 
-def _summarize_budgets(ctx: SheetContext, currency: str) -> str:
-    budgets = _load_with_fallback(ctx, sheets_service.get_category_budgets)
+def _summarize_budgets(budgets: List[Dict[str, Any]], currency: str) -> str:
     if not budgets:
         return "Бюджети ще не налаштовані."
 
@@ -353,15 +391,7 @@ def _summarize_budgets(ctx: SheetContext, currency: str) -> str:
     return "\n".join(lines)
 
 
-def _summarize_subscriptions(ctx: SheetContext, currency: str) -> str:
-    try:
-        subscriptions = sheets_service.get_subscriptions(
-            ctx.sheet_title, ctx.legacy_titles
-        )
-    except Exception as exc:
-        logger.warning("Could not load subscriptions for %s: %s", ctx.sheet_title, exc)
-        return "Не вдалося завантажити інформацію про підписки."
-
+def _summarize_subscriptions(subscriptions: List[Dict[str, Any]], currency: str) -> str:
     if not subscriptions:
         return "Активних підписок не знайдено."
 
@@ -387,20 +417,6 @@ def _summarize_subscriptions(ctx: SheetContext, currency: str) -> str:
     return "\n".join(lines)
 
 
-def _load_with_fallback(
-    ctx: SheetContext, loader
-) -> List[Dict[str, Any]]:  # pragma: no cover - simple helper
-    candidates = [ctx.sheet_title, *ctx.legacy_titles]
-    for title in candidates:
-        try:
-            data = loader(title)
-        except Exception:
-            continue
-        if data:
-            return data
-    return []
-
-
 def _detect_currency(transactions: List[Dict[str, Any]], default: str) -> str:
     for tx in reversed(transactions):
         currency = tx.get("currency")
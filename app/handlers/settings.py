@@ -3,24 +3,44 @@
 """
 Обробники для налаштувань
 """
+import asyncio
+import html
+import io
 import logging
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery, BufferedInputFile
+from aiogram.types.input_file import DEFAULT_CHUNK_SIZE, InputFile
 
 from app.keyboards.inline import (
     get_settings_menu,
     get_reminder_settings,
     get_currency_keyboard,
-    get_export_format_keyboard
+    get_export_format_keyboard,
+    get_export_period_keyboard
 )
 from app.services.sheets_service import sheets_service
-from app.services.export_service import export_service
-from app.utils.helpers import filter_transactions_by_period
+from app.config.settings import config
+from app.services.export_jobs import export_jobs
+from app.services.export_service import EXPORT_EXTENSIONS, PARQUET_AVAILABLE, export_service
+from app.services.reminder_service import reminder_service
+from app.core.states import UserState
+from app.utils.helpers import filter_transactions_by_period, parse_sheet_datetime
+from app.utils.reminder_schedule import MAX_REMINDER_TIMES, ReminderSchedule, parse_times, parse_weekdays
+from app.utils.validators import validate_date
 
 logger = logging.getLogger(__name__)
 router = Router()
 
+EXPORT_PERIODS = ("all", "new", "month", "custom")
+EXPORT_RECENT_DAYS = 30
+EXPORT_PERIOD_PATTERN = re.compile(r"\d{1,2}[.-]\d{1,2}[.-]\d{4}")
+REMINDER_DAY_PRESETS = {"all": "1234567", "work": "12345", "weekend": "67"}
+
 
 @router.message(F.text == "⚙️ Налаштування")
 async def show_settings(message: Message):
@@ -68,33 +88,39 @@ async def show_how_it_works(callback: CallbackQuery):
     await callback.answer()
 
 
-@router.callback_query(F.data == "reminders_menu")
-async def show_reminders_menu(callback: CallbackQuery):
-    """Показує меню нагадувань"""
-    user_id = callback.from_user.id
-    enabled_users = sheets_service.get_reminder_users()
+async def _reminders_menu_text(user_id: int) -> str:
+    schedule = await reminder_service.get_schedule(user_id)
+    status = "✅ Увімкнено" if schedule else "❌ Вимкнено"
+    shown = schedule or reminder_service.default_schedule()
 
-    status = "✅ Увімкнено" if user_id in enabled_users else "❌ Вимкнено"
-
-    text = (
+    return (
         "🔔 <b>Налаштування нагадувань</b>\n\n"
-        f"<b>Статус:</b> {status}\n\n"
+        f"<b>Статус:</b> {status}\n"
+        f"<b>Час:</b> {shown.format_times()}\n"
+        f"<b>Дні:</b> {shown.format_weekdays()}\n\n"
         "Нагадування допоможуть не забувати\n"
-        "записувати витрати щодня.\n\n"
-        "Ти отримаєш 3 нагадування:\n"
-        "• 09:00 - Ранок\n"
-        "• 13:00 - Обід\n"
-        "• 20:00 - Вечір"
+        "записувати витрати щодня.\n"
+        "Якщо ти вже записав транзакцію сьогодні,\n"
+        "нагадування не надійде."
     )
 
-    await callback.message.edit_text(text, reply_markup=get_reminder_settings())
+
+@router.callback_query(F.data == "reminders_menu")
+async def show_reminders_menu(callback: CallbackQuery):
+    """Показує меню нагадувань"""
+    text = await _reminders_menu_text(callback.from_user.id)
+    try:
+        await callback.message.edit_text(text, reply_markup=get_reminder_settings())
+    except TelegramBadRequest:
+        # Налаштування не змінились
+        pass
     await callback.answer()
 
 
 @router.callback_query(F.data == "enable_reminders")
 async def enable_reminders(callback: CallbackQuery):
     """Вмикає нагадування"""
-    sheets_service.add_reminder_user(callback.from_user.id)
+    await reminder_service.enable(callback.from_user.id)
 
     await callback.answer("✅ Нагадування увімкнено!", show_alert=True)
     await show_reminders_menu(callback)
@@ -103,80 +129,345 @@ async def enable_reminders(callback: CallbackQuery):
 @router.callback_query(F.data == "disable_reminders")
 async def disable_reminders(callback: CallbackQuery):
     """Вимикає нагадування"""
-    sheets_service.remove_reminder_user(callback.from_user.id)
+    await reminder_service.disable(callback.from_user.id)
 
     await callback.answer("❌ Нагадування вимкнено", show_alert=True)
     await show_reminders_menu(callback)
 
 
+@router.callback_query(F.data == "reminder_set_time")
+async def ask_reminder_times(callback: CallbackQuery, state: FSMContext):
+    """Запитує власний час нагадувань"""
+    await state.set_state(UserState.waiting_for_reminder_times)
+    await callback.message.edit_text(
+        "🕘 Введи час нагадувань через кому\n"
+        f"(до {MAX_REMINDER_TIMES} на день), наприклад:\n"
+        "<code>08:30, 21:00</code>"
+    )
+    await callback.answer()
+
+
+@router.message(UserState.waiting_for_reminder_times)
+async def process_reminder_times(message: Message, state: FSMContext):
+    """Зберігає власний час нагадувань"""
+    try:
+        times = parse_times(message.text or "")
+    except ValueError as exc:
+        await message.answer(f"❌ {html.escape(str(exc))}")
+        return
+    if not times:
+        await message.answer("❌ Введи хоча б один час, наприклад <code>20:00</code>")
+        return
+    await state.clear()
+
+    user_id = message.from_user.id
+    current = await reminder_service.get_schedule(user_id) or reminder_service.default_schedule()
+    await reminder_service.set_schedule(
+        user_id, ReminderSchedule(times=times, weekdays=current.weekdays)
+    )
+    await message.answer(
+        await _reminders_menu_text(user_id), reply_markup=get_reminder_settings()
+    )
+
+
+@router.callback_query(F.data.startswith("reminder_days_"))
+async def set_reminder_days(callback: CallbackQuery):
+    """Змінює дні тижня для нагадувань"""
+    preset = REMINDER_DAY_PRESETS.get(callback.data.removeprefix("reminder_days_"))
+    if preset is None:
+        await callback.answer("❌ Невідомий варіант", show_alert=True)
+        return
+
+    user_id = callback.from_user.id
+    current = await reminder_service.get_schedule(user_id) or reminder_service.default_schedule()
+    await reminder_service.set_schedule(
+        user_id, ReminderSchedule(times=current.times, weekdays=parse_weekdays(preset))
+    )
+    await show_reminders_menu(callback)
+
+
+class _FileObjectInputFile(InputFile):
+    """Відправляє відкритий бінарний файл частинами, не читаючи його в пам'ять цілком"""
+
+    def __init__(self, file, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot):
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
+
+
 @router.callback_query(F.data == "export_data")
 async def show_export_menu(callback: CallbackQuery):
     """Показує меню експорту"""
     await callback.message.edit_text(
         "📥 <b>Експорт даних</b>\n\n"
         "Обери формат для завантаження своїх даних:",
-        reply_markup=get_export_format_keyboard()
+        reply_markup=get_export_format_keyboard(include_parquet=PARQUET_AVAILABLE)
     )
     await callback.answer()
 
 
 @router.callback_query(F.data.startswith("export_"))
 async def process_export(callback: CallbackQuery):
-    """Обробляє експорт даних"""
+    """Показує вибір періоду для обраного формату"""
     format_type = callback.data.split("_")[1]
+
+    if format_type not in EXPORT_EXTENSIONS:
+        await callback.answer("❌ Невідомий формат", show_alert=True)
+        return
+
+    await callback.message.edit_text(
+        f"📥 <b>Експорт {format_type.upper()}</b>\n\n"
+        "За який період вивантажити дані?",
+        reply_markup=get_export_period_keyboard(format_type)
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("exportperiod_"))
+async def process_export_period(callback: CallbackQuery, state: FSMContext):
+    """Ставить експорт за обраний період у фонову чергу"""
+    _, format_type, period = callback.data.split("_")
     nickname = callback.from_user.username or "anonymous"
 
-    await callback.message.edit_text("⏳ Готую файл для завантаження...")
+    if format_type not in EXPORT_EXTENSIONS or period not in EXPORT_PERIODS:
+        await callback.answer("❌ Невідомий формат", show_alert=True)
+        return
 
-    try:
-        transactions = sheets_service.get_all_transactions(nickname)
-        balance, currency = sheets_service.get_current_balance(nickname)
-
-        if not transactions:
-            await callback.message.edit_text(
-                "❌ Немає даних для експорту",
-                reply_markup=get_settings_menu()
-            )
-            return
+    if period == "custom":
+        await state.set_state(UserState.waiting_for_export_period)
+        await state.update_data(export_format=format_type)
+        await callback.message.edit_text(
+            "🗓 Введи період у форматі\n"
+            "<code>ДД.ММ.РРРР - ДД.ММ.РРРР</code>\n\n"
+            "Наприклад: <code>01.09.2025 - 30.09.2025</code>"
+        )
+        await callback.answer()
+        return
 
-        if format_type == "csv":
-            file_buffer = export_service.export_to_csv(transactions)
-            filename = f"budget_{nickname}_{datetime.now().strftime('%Y%m%d')}.csv"
-
-        elif format_type == "excel":
-            file_buffer = export_service.export_to_excel(transactions)
-            filename = f"budget_{nickname}_{datetime.now().strftime('%Y%m%d')}.xlsx"
-
-        elif format_type == "pdf":
-            file_buffer = export_service.export_to_pdf(
-                transactions, nickname, balance, currency
-            )
-            filename = f"budget_{nickname}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        else:
-            await callback.answer("❌ Невідомий формат", show_alert=True)
-            return
+    if export_jobs.is_running(nickname):
+        await callback.answer("⏳ Попередній експорт ще виконується", show_alert=True)
+        return
 
-        # Створюємо BufferedInputFile для відправки
-        document = BufferedInputFile(file_buffer.getvalue(), filename=filename)
+    start = None
+    if period == "month":
+        start = (datetime.now() - timedelta(days=EXPORT_RECENT_DAYS)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
 
-        await callback.message.answer_document(
-            document=document,
-            caption=f"📊 Твій фінансовий звіт у форматі {format_type.upper()}"
+    message = callback.message
+    await callback.answer()
+    await _show_export_progress(message, "⏳ Готую файл для завантаження...")
+    _start_export_job(message, nickname, format_type, period, start)
+
+
+@router.message(UserState.waiting_for_export_period)
+async def process_export_period_input(message: Message, state: FSMContext):
+    """Отримує власний період експорту"""
+    found = EXPORT_PERIOD_PATTERN.findall(message.text or "")
+    if len(found) != 2:
+        await message.answer(
+            "❌ Введи дві дати через дефіс, наприклад:\n"
+            "<code>01.09.2025 - 30.09.2025</code>"
         )
+        return
 
-        await callback.message.edit_text(
+    bounds = []
+    for raw in found:
+        is_valid, date_obj, error = validate_date(raw)
+        if not is_valid:
+            await message.answer(f"❌ {error}")
+            return
+        bounds.append(date_obj)
+    start, end = bounds[0], bounds[1].replace(hour=23, minute=59, second=59)
+    if start > end:
+        await message.answer("❌ Дата початку пізніша за дату кінця")
+        return
+
+    data = await state.get_data()
+    format_type = data.get("export_format", "csv")
+    await state.clear()
+
+    nickname = message.from_user.username or "anonymous"
+    if export_jobs.is_running(nickname):
+        await message.answer("⏳ Попередній експорт ще виконується")
+        return
+
+    progress = await message.answer("⏳ Готую файл для завантаження...")
+    _start_export_job(progress, nickname, format_type, "custom", start, end)
+
+
+def _start_export_job(
+    message: Message,
+    nickname: str,
+    format_type: str,
+    period: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    export_jobs.start(
+        nickname,
+        lambda: _run_export_job(message, nickname, format_type, period, start, end),
+        on_queued=lambda position: _show_export_progress(
+            message, f"⏳ Експорт у черзі (позиція {position})..."
+        ),
+    )
+
+
+async def _show_export_progress(message: Message, text: str):
+    """Показує етап експорту редагуванням повідомлення"""
+    try:
+        await message.edit_text(text)
+    except TelegramBadRequest:
+        # Текст не змінився або повідомлення вже недоступне
+        pass
+
+
+async def _send_cached_export(message: Message, cache_key: str, caption: str) -> bool:
+    """Надсилає файл за збереженим file_id; False, якщо його немає або він недійсний"""
+    file_id = export_jobs.get_file_id(cache_key)
+    if not file_id:
+        return False
+    try:
+        await message.answer_document(document=file_id, caption=caption)
+        return True
+    except TelegramBadRequest as exc:
+        logger.warning("Cached export file_id rejected: %s", exc)
+        export_jobs.forget_file_id(cache_key)
+        return False
+
+
+def _cache_export_file(cache_key: str, file_buffer, filename: str):
+    """Кешує вміст файлу, якщо він невеликий (великі файли повторно шлемо за file_id)"""
+    file_buffer.seek(0, io.SEEK_END)
+    if file_buffer.tell() <= config.EXPORT_CACHE_MAX_BYTES // 4:
+        file_buffer.seek(0)
+        export_jobs.put_file(cache_key, file_buffer.read(), filename)
+    file_buffer.seek(0)
+
+
+def _period_caption(period: str, start: Optional[datetime], end: Optional[datetime]) -> str:
+    if period == "new":
+        return "нове з минулого експорту"
+    if period == "month":
+        return f"за останні {EXPORT_RECENT_DAYS} днів"
+    if period == "custom" and start and end:
+        return f"за {start.strftime('%d.%m.%Y')} – {end.strftime('%d.%m.%Y')}"
+    return "уся історія"
+
+
+def _transaction_dates(transactions: List[Dict]) -> List[datetime]:
+    dates = (parse_sheet_datetime(t.get('date')) for t in transactions)
+    return [d.replace(tzinfo=None) for d in dates if d]
+
+
+def _closing_balance(transactions: List[Dict]) -> Tuple[float, str]:
+    """Баланс і валюта після останньої транзакції вибірки"""
+    last = transactions[-1]
+    try:
+        balance = float(last.get('balance') or 0)
+    except (TypeError, ValueError):
+        balance = 0.0
+    return balance, last.get('currency') or config.DEFAULT_CURRENCY
+
+
+async def _run_export_job(
+    message: Message,
+    nickname: str,
+    format_type: str,
+    period: str = "all",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Формує та надсилає файл експорту (виконується у фоні)"""
+    file_buffer = None
+    try:
+        if period == "new":
+            checkpoint = await asyncio.to_thread(sheets_service.get_export_checkpoint, nickname)
+            # Дати в таблиці з точністю до секунди
+            start = checkpoint + timedelta(seconds=1) if checkpoint else None
+
+        caption = (
+            f"📊 Твій фінансовий звіт у форматі {format_type.upper()}\n"
+            f"🗓 {_period_caption(period, start, end)}"
+        )
+        scope = "all" if period == "all" else f"{start}..{end}"
+        version = sheets_service.get_data_version(nickname)
+        cache_key = export_jobs.make_key(nickname, format_type, version, scope)
+
+        if not await _send_cached_export(message, cache_key, caption):
+            cached = export_jobs.get_file(cache_key)
+            if cached:
+                data, filename = cached
+                document = BufferedInputFile(data, filename=filename)
+                exported_until = None
+            else:
+                await _show_export_progress(message, "📥 Завантажую дані з таблиці...")
+                if period == "all":
+                    transactions = await asyncio.to_thread(sheets_service.get_all_transactions, nickname)
+                    balance, currency = await asyncio.to_thread(sheets_service.get_current_balance, nickname)
+                else:
+                    # Читаємо лише рядки потрібного періоду
+                    transactions = await asyncio.to_thread(
+                        sheets_service.get_transactions_in_range, nickname, start, end
+                    )
+                    balance, currency = (
+                        _closing_balance(transactions) if transactions else (0.0, config.DEFAULT_CURRENCY)
+                    )
+
+                if not transactions:
+                    text = (
+                        "✅ Нових транзакцій з минулого експорту немає"
+                        if period == "new" else "❌ Немає даних для експорту"
+                    )
+                    await message.edit_text(text, reply_markup=get_settings_menu())
+                    return
+
+                await _show_export_progress(
+                    message, f"🛠 Формую {format_type.upper()} ({len(transactions)} транзакцій)..."
+                )
+                file_buffer = await export_service.build(
+                    format_type, transactions, nickname, balance, currency
+                )
+                dates = _transaction_dates(transactions)
+                extension = EXPORT_EXTENSIONS[format_type]
+                if period == "all" or not dates:
+                    suffix = datetime.now().strftime('%Y%m%d')
+                else:
+                    suffix = f"{min(dates).strftime('%Y%m%d')}-{max(dates).strftime('%Y%m%d')}"
+                filename = f"budget_{nickname}_{suffix}.{extension}"
+                _cache_export_file(cache_key, file_buffer, filename)
+                # Файл відправляється частинами прямо з буфера/тимчасового файлу
+                document = _FileObjectInputFile(file_buffer, filename=filename)
+                # Власний період може не доходити до сьогодні – позначку не рухаємо
+                exported_until = max(dates) if dates and period != "custom" else None
+
+            await _show_export_progress(message, "📤 Надсилаю файл...")
+            sent = await message.answer_document(document=document, caption=caption)
+            if sent.document:
+                export_jobs.remember_file_id(cache_key, sent.document.file_id)
+            if exported_until:
+                await asyncio.to_thread(sheets_service.set_export_checkpoint, nickname, exported_until)
+
+        await message.edit_text(
             "✅ Файл успішно створено!",
             reply_markup=get_settings_menu()
         )
 
-        logger.info(f"Exported {format_type} for {nickname}")
+        logger.info(f"Exported {format_type} ({period}) for {nickname}")
 
     except Exception as e:
         logger.error(f"Export error: {e}", exc_info=True)
-        await callback.message.edit_text(
+        await message.edit_text(
             "❌ Помилка при створенні файлу",
             reply_markup=get_settings_menu()
         )
+    finally:
+        if file_buffer is not None:
+            file_buffer.close()
 
 
 @router.callback_query(F.data == "back_to_settings")
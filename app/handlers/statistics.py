@@ -5,22 +5,27 @@
 Обробники для статистики - З ДІАГНОСТИКОЮ
 """
 import logging
+from datetime import datetime
+
 from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import (
     Message,
     CallbackQuery,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     BufferedInputFile,
+    InputMediaPhoto,
 )
 from aiogram.fsm.context import FSMContext
 
 from app.core.states import UserState  # ← ДОДАНО!
 from app.services.sheets_service import sheets_service
-from app.services.chart_service import chart_service
+from app.services.chart_service import ChartImage, chart_service, chart_cache
 from app.keyboards.inline import get_stats_period_keyboard, get_transaction_edit_keyboard
 from app.utils.formatters import format_statistics, format_currency, format_date
 from app.utils.helpers import filter_transactions_by_period
+from app.utils.sparklines import horizontal_bar
 from app.utils.validators import validate_amount
 
 logger = logging.getLogger(__name__)
@@ -58,12 +63,15 @@ async def show_statistics(message: Message):
         budget_summary = _build_budget_summary_text(nickname, transactions, currency)
 
         stats_block = f"📅 <b>Сьогодні:</b>\n{stats_text}"
+        # Текстові міні-графіки – швидкий попередній перегляд, PNG – у меню «Графіки»
+        trends_block = chart_service.create_text_preview(transactions, currency)
         message_text = _compose_statistics_message(
             title="📊 <b>Статистика за сьогодні</b>",
             balance=balance,
             currency=currency,
             stats_block=stats_block,
             budget_summary=budget_summary,
+            trends_block=trends_block,
             include_period_prompt=True,
         )
 
@@ -142,6 +150,7 @@ def _compose_statistics_message(
     currency: str,
     stats_block: str,
     budget_summary: str = "",
+    trends_block: str = "",
     include_period_prompt: bool = False,
 ) -> str:
     """Збирає секції статистики в одне повідомлення."""
@@ -151,6 +160,8 @@ def _compose_statistics_message(
         stats_block.strip(),
     ]
 
+    if trends_block:
+        sections.append(trends_block.strip())
     if budget_summary:
         sections.append(budget_summary.strip())
     if include_period_prompt:
@@ -235,6 +246,9 @@ async def show_charts_menu(callback: CallbackQuery):
         [
             InlineKeyboardButton(text="💳 Історія балансу", callback_data="chart_balance_history")
         ],
+        [
+            InlineKeyboardButton(text="📊 Усі графіки", callback_data="charts_all")
+        ],
         [
             InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_stats")
         ]
@@ -248,6 +262,59 @@ async def show_charts_menu(callback: CallbackQuery):
     await callback.answer()
 
 
+CHART_CAPTIONS = {
+    "pie_expense": "🥧 Витрати по категоріях",
+    "pie_income": "💰 Доходи по категоріях",
+    "line_30": "📈 Динаміка фінансів за 30 днів",
+    "line_90": "📊 Динаміка фінансів за 90 днів",
+    "bar_comparison": "📊 Порівняння доходів та витрат по місяцях",
+    "balance_history": "💳 Історія балансу",
+}
+
+
+def _chart_period_token(chart_type: str) -> str:
+    """Частина ключа кешу, що залежить від поточної дати"""
+    if chart_type.startswith("line_"):
+        # Вікно "останні N днів" зсувається щодня
+        return datetime.now().strftime("%Y-%m-%d")
+    return "all"
+
+
+async def _send_cached_photo(message: Message, cache_key: str, caption: str) -> bool:
+    """Надсилає графік за збереженим file_id; False, якщо його немає або він недійсний"""
+    cached = chart_cache.get(cache_key)
+    if not cached or not cached.file_id:
+        return False
+    try:
+        await message.answer_photo(photo=cached.file_id, caption=caption)
+        return True
+    except TelegramBadRequest as exc:
+        logger.warning("Cached chart file_id rejected: %s", exc)
+        chart_cache.forget_file_id(cache_key)
+        return False
+
+
+async def _send_chart_image(message: Message, cache_key: str, chart: ChartImage, caption: str):
+    """Надсилає PNG і запам'ятовує file_id; заглушки шле за спільним file_id"""
+    placeholder = chart.placeholder
+    placeholder_key = chart_cache.placeholder_key(placeholder) if placeholder else None
+    
+    if placeholder_key and await _send_cached_photo(message, placeholder_key, caption):
+        chart_cache.remember_file_id(cache_key, chart_cache.get(placeholder_key).file_id)
+        return
+    
+    photo = BufferedInputFile(chart.image, filename="chart.png")
+    sent = await message.answer_photo(
+        photo=photo,
+        caption=caption
+    )
+    if sent.photo:
+        file_id = sent.photo[-1].file_id
+        chart_cache.remember_file_id(cache_key, file_id)
+        if placeholder_key:
+            chart_cache.remember_file_id(placeholder_key, file_id)
+
+
 @router.callback_query(F.data.startswith("chart_"))
 async def generate_chart(callback: CallbackQuery):
     """Генерує обраний графік"""
@@ -259,45 +326,27 @@ async def generate_chart(callback: CallbackQuery):
     await callback.message.edit_text("📊 Генерую графік, зачекай...")
     
     try:
-        transactions = sheets_service.get_all_transactions(nickname)
-        balance, currency = sheets_service.get_current_balance(nickname)
-        
-        # Генуруємо відповідний графік
-        if chart_type == "pie_expense":
-            buffer = chart_service.create_pie_chart(transactions, "expense")
-            caption = "🥧 Витрати по категоріях"
-        
-        elif chart_type == "pie_income":
-            buffer = chart_service.create_pie_chart(transactions, "income")
-            caption = "💰 Доходи по категоріях"
-        
-        elif chart_type == "line_30":
-            buffer = chart_service.create_line_chart(transactions, 30)
-            caption = "📈 Динаміка фінансів за 30 днів"
-        
-        elif chart_type == "line_90":
-            buffer = chart_service.create_line_chart(transactions, 90)
-            caption = "📊 Динаміка фінансів за 90 днів"
-        
-        elif chart_type == "bar_comparison":
-            buffer = chart_service.create_bar_comparison(transactions, currency)
-            caption = "📊 Порівняння доходів та витрат по місяцях"
-        
-        elif chart_type == "balance_history":
-            buffer = chart_service.create_balance_history(transactions, currency)
-            caption = "💳 Історія балансу"
-        
-        else:
+        caption = CHART_CAPTIONS.get(chart_type)
+        if not caption:
             await callback.message.edit_text("❌ Невідомий тип графіка")
             return
         
-        # Відправляємо графік
-        photo = BufferedInputFile(buffer.getvalue(), filename="chart.png")
+        # Той самий графік для незмінених даних беремо з кешу
+        version = sheets_service.get_data_version(nickname)
+        cache_key = chart_cache.make_key(nickname, chart_type, _chart_period_token(chart_type), version)
         
-        await callback.message.answer_photo(
-            photo=photo,
-            caption=caption
-        )
+        if not await _send_cached_photo(callback.message, cache_key, caption):
+            cached = chart_cache.get(cache_key)
+            if cached and cached.image:
+                chart = ChartImage(image=cached.image, placeholder=cached.placeholder)
+            else:
+                transactions = sheets_service.get_all_transactions(nickname)
+                balance, currency = sheets_service.get_current_balance(nickname)
+                chart = chart_service.render(chart_type, transactions, currency)
+                chart_cache.put(cache_key, chart)
+            
+            # Відправляємо графік
+            await _send_chart_image(callback.message, cache_key, chart, caption)
         
         # Повертаємо меню
         await show_charts_menu(callback)
@@ -312,6 +361,115 @@ async def generate_chart(callback: CallbackQuery):
         )
 
 
+# Користувачі, для яких зараз генерується альбом графіків
+_albums_in_progress = set()
+
+
+async def _show_album_progress(message: Message, done: int, total: int):
+    """Оновлює індикатор прогресу генерації альбому"""
+    try:
+        await message.edit_text(
+            "📊 Генерую всі графіки...\n\n"
+            f"<code>{horizontal_bar(done / total, 12)}</code> {done}/{total}"
+        )
+    except TelegramBadRequest:
+        # Текст не змінився або повідомлення вже недоступне
+        pass
+
+
+async def _collect_album_media(nickname: str, cache_keys, progress_message: Message,
+                               use_file_ids: bool = True):
+    """Збирає медіа для альбому: file_id або PNG з кешу, решту рендерить паралельно"""
+    sources = {}
+    missing = []
+    for chart_type, cache_key in cache_keys.items():
+        cached = chart_cache.get(cache_key)
+        if use_file_ids and cached and cached.file_id:
+            sources[chart_type] = cached.file_id
+        elif cached and cached.image:
+            sources[chart_type] = ChartImage(image=cached.image, placeholder=cached.placeholder)
+        else:
+            missing.append(chart_type)
+
+    total = len(cache_keys)
+    await _show_album_progress(progress_message, total - len(missing), total)
+
+    if missing:
+        # Дані з таблиці читаємо один раз для всіх графіків
+        transactions = sheets_service.get_all_transactions(nickname)
+        balance, currency = sheets_service.get_current_balance(nickname)
+
+        async def on_progress(done: int, _: int):
+            await _show_album_progress(progress_message, total - len(missing) + done, total)
+
+        images = await chart_service.render_many(missing, transactions, currency, on_progress)
+        for chart_type, chart in images.items():
+            chart_cache.put(cache_keys[chart_type], chart)
+            sources[chart_type] = chart
+
+    media = []
+    for chart_type in cache_keys:
+        source = sources[chart_type]
+        if isinstance(source, ChartImage):
+            placeholder = source.placeholder
+            cached = chart_cache.get(chart_cache.placeholder_key(placeholder)) if placeholder else None
+            if use_file_ids and cached and cached.file_id:
+                source = cached.file_id
+            else:
+                source = BufferedInputFile(source.image, filename=f"{chart_type}.png")
+        media.append(InputMediaPhoto(media=source, caption=CHART_CAPTIONS[chart_type]))
+    return media
+
+
+@router.callback_query(F.data == "charts_all")
+async def send_all_charts(callback: CallbackQuery):
+    """Надсилає всі графіки одним альбомом"""
+    nickname = callback.from_user.username or "anonymous"
+
+    if nickname in _albums_in_progress:
+        await callback.answer("⏳ Графіки вже генеруються", show_alert=False)
+        return
+
+    _albums_in_progress.add(nickname)
+    await callback.answer("⏳ Генерую графіки...", show_alert=False)
+
+    try:
+        version = sheets_service.get_data_version(nickname)
+        cache_keys = {
+            chart_type: chart_cache.make_key(nickname, chart_type, _chart_period_token(chart_type), version)
+            for chart_type in CHART_CAPTIONS
+        }
+
+        media = await _collect_album_media(nickname, cache_keys, callback.message)
+        try:
+            sent = await callback.message.answer_media_group(media)
+        except TelegramBadRequest as exc:
+            # Якийсь із збережених file_id недійсний – відправляємо самі PNG
+            logger.warning("Cached album file_id rejected: %s", exc)
+            for cache_key in cache_keys.values():
+                chart_cache.forget_file_id(cache_key)
+            media = await _collect_album_media(nickname, cache_keys, callback.message, use_file_ids=False)
+            sent = await callback.message.answer_media_group(media)
+
+        for cache_key, sent_message in zip(cache_keys.values(), sent):
+            if sent_message.photo:
+                chart_cache.remember_file_id(cache_key, sent_message.photo[-1].file_id)
+
+        # Повертаємо меню
+        await show_charts_menu(callback)
+
+        logger.info(f"Chart album sent for {nickname}")
+
+    except Exception as e:
+        logger.error(f"Error generating chart album: {e}", exc_info=True)
+        await callback.message.edit_text(
+            "❌ Помилка при генерації графіків.\n"
+            "Можливо, недостатньо даних."
+        )
+    finally:
+        _albums_in_progress.discard(nickname)
+
+
 # ==================== РЕДАГУВАННЯ БАЛАНСУ ====================
 
 @router.callback_query(F.data == "edit_balance_menu")
@@ -18,5 +18,6 @@ __all__ = [
     'get_stats_period_keyboard',
     'get_subscriptions_menu',
     'get_export_format_keyboard',
+    'get_export_period_keyboard',
     'get_currency_keyboard',
 ]
\ No newline at end of file
@@ -45,6 +45,12 @@ def get_reminder_settings() -> InlineKeyboardMarkup:
             InlineKeyboardButton(text="✅ Увімкнути", callback_data="enable_reminders"),
             InlineKeyboardButton(text="❌ Вимкнути", callback_data="disable_reminders")
         ],
+        [InlineKeyboardButton(text="🕘 Змінити час", callback_data="reminder_set_time")],
+        [
+            InlineKeyboardButton(text="Щодня", callback_data="reminder_days_all"),
+            InlineKeyboardButton(text="Будні", callback_data="reminder_days_work"),
+            InlineKeyboardButton(text="Вихідні", callback_data="reminder_days_weekend")
+        ],
         [InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_settings")]
     ])
 
@@ -113,17 +119,35 @@ def get_subscriptions_menu() -> InlineKeyboardMarkup:
     ])
 
 
-def get_export_format_keyboard() -> InlineKeyboardMarkup:
+def get_export_format_keyboard(include_parquet: bool = False) -> InlineKeyboardMarkup:
     """Вибір формату експорту"""
+    row = [InlineKeyboardButton(text="📊 Excel", callback_data="export_excel")]
+    if include_parquet:
+        row.append(InlineKeyboardButton(text="🧮 Parquet", callback_data="export_parquet"))
     return InlineKeyboardMarkup(inline_keyboard=[
         [
             InlineKeyboardButton(text="📄 CSV", callback_data="export_csv"),
             InlineKeyboardButton(text="📕 PDF", callback_data="export_pdf")
         ],
+        row,
+        [InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_settings")]
+    ])
+
+
+def get_export_period_keyboard(format_type: str) -> InlineKeyboardMarkup:
+    """Вибір періоду експорту"""
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text="🆕 Нове з минулого експорту", callback_data=f"exportperiod_{format_type}_new")
+        ],
         [
-            InlineKeyboardButton(text="📊 Excel", callback_data="export_excel")
+            InlineKeyboardButton(text="📅 Останні 30 днів", callback_data=f"exportperiod_{format_type}_month"),
+            InlineKeyboardButton(text="🗓 Свій період", callback_data=f"exportperiod_{format_type}_custom")
         ],
-        [InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_settings")]
+        [
+            InlineKeyboardButton(text="📦 Уся історія", callback_data=f"exportperiod_{format_type}_all")
+        ],
+        [InlineKeyboardButton(text="⬅️ Назад", callback_data="export_data")]
     ])
 
 
@@ -4,15 +4,24 @@
 
 import asyncio
 import logging
-from aiohttp import web
-from aiogram import Bot, Dispatcher, BaseMiddleware
-from aiogram.types import Update
-from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 
-from app.config.settings import config, logger
-from app.core.bot import dp, bot
-from app.handlers import register_all_handlers
-from app.scheduler.tasks import setup_scheduler
+from app.utils.process_pool import process_pool
+from app.utils.startup_timing import startup_timer
+
+with startup_timer.measure("aiohttp + aiogram"):
+    from aiohttp import web
+    from aiogram import Bot, Dispatcher, BaseMiddleware
+    from aiogram.types import Update
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+with startup_timer.measure("app.config"):
+    from app.config.settings import config, logger
+with startup_timer.measure("app.core.bot"):
+    from app.core.bot import dp, bot
+with startup_timer.measure("app.handlers"):
+    from app.handlers import register_all_handlers
+with startup_timer.measure("app.scheduler"):
+    from app.scheduler.tasks import setup_scheduler
 
 
 # ======================================
@@ -104,6 +113,12 @@ async def on_startup(app: web.Application) -> None:
     
     logger.info("🚀 Starting bot...")
     
+    # Процеси-воркери (графіки, PDF) форкаємо першими – до планувальника і to_thread
+    # (потоки Sentry SDK на цей момент уже можуть працювати, див. ProcessPool);
+    # успадковані клієнти Sheets і бота воркери не використовують
+    with startup_timer.measure("worker processes"):
+        process_pool.start(config.WORKER_PROCESSES)
+    
     # Видаляємо старий webhook
     try:
         await bot.delete_webhook(drop_pending_updates=True)
@@ -152,8 +167,35 @@ async def on_startup(app: web.Application) -> None:
     scheduler = setup_scheduler(bot)
     app['scheduler'] = scheduler
     logger.info("✅ Scheduler started")
-    
+
     logger.info("🎉 Bot startup complete!")
+    startup_timer.log_report("Startup timing (webhook ready)")
+
+    # Важкі бібліотеки прогріваємо у фоні вже після реєстрації webhook
+    if config.ENABLE_BACKGROUND_WARMUP:
+        app['warmup_task'] = asyncio.create_task(warm_up_services())
+
+
+def _warm_up_services_sync() -> None:
+    from app.services.chart_service import chart_service
+    from app.services.export_service import export_service
+    from app.services.ai_service import ai_service
+
+    with startup_timer.measure("warmup: charts"):
+        chart_service.warm_up()
+    with startup_timer.measure("warmup: export"):
+        export_service.warm_up()
+    with startup_timer.measure("warmup: gemini"):
+        ai_service.warm_up()
+
+
+async def warm_up_services() -> None:
+    """Фонове завантаження графіків, експорту та Gemini"""
+    try:
+        await asyncio.to_thread(_warm_up_services_sync)
+        startup_timer.log_report("Startup timing (background warm-up done)")
+    except Exception as e:
+        logger.warning(f"⚠️  Background warm-up failed: {e}", exc_info=True)
 
 
 async def on_shutdown(app: web.Application) -> None:
@@ -161,6 +203,11 @@ async def on_shutdown(app: web.Application) -> None:
     if 'scheduler' in app:
         app['scheduler'].shutdown()
         logger.info("✅ Scheduler shutdown")
+    process_pool.shutdown()
+    from app.services.ai_service import ai_service
+    from app.services.exchange_service import exchange_service
+    ai_service.shutdown()
+    await exchange_service.close()
     await bot.session.close()
     logger.info("✅ Bot session closed")
     # Не видаляємо вебхук, щоб уникнути втрати після перезапуску
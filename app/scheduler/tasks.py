@@ -2,23 +2,48 @@
 Планувальник періодичних задач (нагадування, автосписання тощо).
 """
 
+import asyncio
 import calendar
 import logging
-from datetime import datetime, date, timedelta
-from typing import Optional
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from aiogram import Bot
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 from app.config.settings import config
+from app.handlers.ai_analysis import prepare_analysis, resolve_period_bounds
+from app.services.ai_service import ai_service
+from app.services.broadcast_service import broadcast_service
 from app.services.exchange_service import exchange_service
+from app.services.reminder_service import reminder_service
 from app.services.sheets_service import sheets_service
 from app.utils.formatters import format_currency
+from app.utils.helpers import SheetContext, user_sheet_title
+from app.utils.resilience import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 SUBSCRIPTION_NOTE_PREFIX = "Підписка: "
+# Службові аркуші, що не належать користувачам
+NON_USER_SHEETS = {
+    "feedback_and_suggestions",
+    "Sheet1",
+    "reminder_settings",
+    "category_budgets",
+    "custom_categories",
+    "user_goals",
+    "export_checkpoints",
+    "broadcast_stats",
+}
+# Аркуші користувачів мають назву user_<telegram id>
+USER_SHEET_PATTERN = re.compile(r"user_\d+")
 
 
 # ----------------------- ДОПОМІЖНІ ФУНКЦІЇ ----------------------- #
@@ -79,142 +104,287 @@ def _format_original_message(amount: Optional[float], currency: Optional[str]) -
 
 # ----------------------- Нагадування ----------------------- #
 
-async def send_daily_reminders(bot: Bot):
-    logger.info("📅 Running scheduled task: daily reminders")
+async def dispatch_reminders(bot: Bot):
+    """Нагадування користувачам, чий час за власним розкладом уже настав"""
     try:
-        user_ids = sheets_service.get_reminder_users()
-        text = (
-            "🔔 <b>Нагадування</b>\n\n"
-            "Не забудь записати сьогоднішні витрати та доходи!"
-        )
-        sent = 0
-        for user_id in user_ids:
-            try:
-                await bot.send_message(chat_id=user_id, text=text)
-                sent += 1
-            except Exception as exc:
-                logger.error("Failed to send reminder to %s: %s", user_id, exc)
-        logger.info("✅ Sent reminders to %s/%s users", sent, len(user_ids))
+        await reminder_service.dispatch_due(bot)
     except Exception as exc:
-        logger.error("Error in daily reminders task: %s", exc, exc_info=True)
+        logger.error("Error in reminders task: %s", exc, exc_info=True)
 
 
 # ----------------------- ПІДПИСКИ ----------------------- #
 
-async def check_subscription_renewals(bot: Bot):
-    logger.info("📅 Running scheduled task: subscription renewals")
-    try:
-        worksheets = [
-            ws.title
-            for ws in sheets_service.spreadsheet.worksheets()
-            if ws.title not in {"feedback_and_suggestions", "Sheet1", "reminder_settings"}
-        ]
+@dataclass
+class _RenewalPlan:
+    """Зміни одного аркуша, обчислені з прочитаних значень"""
+    # Ключ версії даних користувача (аркуш може мати стару назву)
+    nickname: Optional[str] = None
+    field_updates: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    new_transactions: List[Dict[str, Any]] = field(default_factory=list)
+    # Повідомлення про автосписання надсилаються лише після успішного запису
+    charge_messages: List[Tuple[int, str]] = field(default_factory=list)
+    reminder_messages: List[Tuple[int, str]] = field(default_factory=list)
+
+
+async def _plan_renewals(sheet_title: str, values: List[List[Any]], today: date) -> _RenewalPlan:
+    plan = _RenewalPlan()
+    tomorrow = today + timedelta(days=1)
+    transactions = sheets_service.transactions_from_values(values)
+    for sub in sheets_service.select_subscriptions(transactions):
+        due_date = _parse_subscription_date(
+            sub.get("subscription_due_date") or sub.get("date", "")
+        )
+        if due_date not in (today, tomorrow):
+            continue
+        try:
+            user_id = int(str(sub.get("user_id")))
+        except (TypeError, ValueError):
+            continue
 
-        today = datetime.now().date()
-        tomorrow = today + timedelta(days=1)
-        notifications = 0
-        auto_charges = 0
+        name = _subscription_name(sub)
+        amount = abs(float(sub.get("amount", 0) or 0))
+
+        if due_date == tomorrow:
+            plan.reminder_messages.append((
+                user_id,
+                "⏰ <b>Наближається підписка</b>\n\n"
+                f"Завтра буде списання за <b>{name}</b>\n"
+                f"Сума: {amount:.2f} UAH",
+            ))
+            continue
 
-        for sheet_title in worksheets:
+        charge_amount = amount
+        original_amount, original_currency = _original_amount_info(sub)
+        original_line = _format_original_message(original_amount, original_currency)
+        if original_amount and original_currency:
             try:
-                subscriptions = sheets_service.get_subscriptions(sheet_title)
-                if not subscriptions:
-                    continue
+                converted = await exchange_service.convert_to_uah(
+                    original_amount, original_currency
+                )
+            except Exception as exc:
+                logger.warning(
+                    "Не вдалося оновити курс %s для %s: %s",
+                    original_currency,
+                    sheet_title,
+                    exc,
+                )
+            else:
+                if converted:
+                    charge_amount = converted
+
+        charge_value = -abs(charge_amount)
+        next_due = _next_charge_date(due_date)
+        plan.nickname = user_sheet_title(user_id)
+        plan.new_transactions.append({
+            'user_id': str(user_id),
+            'amount': charge_value,
+            'category': sub.get("category", "Підписки"),
+            'note': f"{SUBSCRIPTION_NOTE_PREFIX}{name} (авто)",
+            'nickname': sheet_title,
+            'Is_Subscription': False,
+            'subscription_name': name,
+            'subscription_due_date': due_date.strftime("%d.%m.%Y"),
+        })
+        plan.field_updates[sub["_row"]] = {
+            'subscription_due_date': next_due.strftime("%d.%m.%Y"),
+            'amount': charge_value,
+        }
+        plan.charge_messages.append((
+            user_id,
+            "🤖 <b>Автосписання виконано</b>\n\n"
+            f"{name}: {format_currency(charge_amount)}\n"
+            f"Наступна дата: {next_due.strftime('%d.%m.%Y')}"
+            + (f"\nБазова сума: {original_line}" if original_line else ""),
+        ))
+    return plan
 
-                for sub in subscriptions:
-                    due_date = _parse_subscription_date(
-                        sub.get("subscription_due_date") or sub.get("date", "")
+
+async def check_subscription_renewals(bot: Bot):
+    """
+    Автосписання підписок на сьогодні та нагадування про завтрашні.
+
+    Читаються лише аркуші, які індекс дат списання називає для вікна
+    сьогодні–завтра; раз на SUBSCRIPTION_INDEX_REBUILD_DAYS (і за порожнього
+    індексу) скануються всі аркуші, і індекс перебудовується.
+
+    Три фази: аркуші читаються пачками по SUBSCRIPTION_READ_BATCH одним
+    values:batchGet, зміни обчислюються в пам'яті, а кожен аркуш зі
+    списаннями отримує один batch_update та один append_rows. До
+    SUBSCRIPTION_SWEEP_CONCURRENCY звернень до Sheets виконуються одночасно.
+    Повідомлення надсилаються однією розсилкою broadcast_service наприкінці.
+    """
+    logger.info("📅 Running scheduled task: subscription renewals")
+    started = time.monotonic()
+    try:
+        worksheets = {
+            ws.title: ws
+            for ws in await asyncio.to_thread(sheets_service.spreadsheet.worksheets)
+            if ws.title not in NON_USER_SHEETS
+        }
+        today = datetime.now().date()
+        index = sheets_service.subscription_index
+        full_scan = await asyncio.to_thread(
+            index.needs_rebuild, config.SUBSCRIPTION_INDEX_REBUILD_DAYS * 86400
+        )
+        if full_scan:
+            titles = list(worksheets)
+        else:
+            # Запас у день з кожного боку покриває різницю часових поясів у датах
+            due = await asyncio.to_thread(
+                index.due_sheets, today - timedelta(days=1), today + timedelta(days=2)
+            )
+            titles = [title for title in due if title in worksheets]
+        batch = config.SUBSCRIPTION_READ_BATCH
+        chunks = [titles[i:i + batch] for i in range(0, len(titles), batch)]
+
+        slots = asyncio.Semaphore(config.SUBSCRIPTION_SWEEP_CONCURRENCY)
+        stats: Counter = Counter()
+        # Усі повідомлення йдуть однією розсилкою після запису змін
+        messages: List[Tuple[int, str]] = []
+
+        async def sweep(chunk: List[str]):
+            async with slots:
+                try:
+                    values = await asyncio.to_thread(sheets_service.batch_get_values, chunk)
+                except Exception as exc:
+                    stats["failed_sheets"] += len(chunk)
+                    logger.error("Error reading subscription sheets: %s", exc, exc_info=True)
+                    return
+
+            for sheet_title in chunk:
+                try:
+                    sheet_values = values.get(sheet_title, [])
+                    # Звіряємо індекс з прочитаними даними: ручні правки таблиці
+                    # виправляються тут, а нові дати списання запише apply_transaction_changes
+                    await asyncio.to_thread(
+                        sheets_service.index_subscriptions,
+                        sheet_title,
+                        sheets_service.select_subscriptions(
+                            sheets_service.transactions_from_values(sheet_values)
+                        ),
                     )
-                    if not due_date:
-                        continue
-
-                    name = _subscription_name(sub)
-                    amount = abs(float(sub.get("amount", 0) or 0))
-                    charge_amount = amount
-                    original_amount, original_currency = _original_amount_info(sub)
-                    original_line = _format_original_message(original_amount, original_currency)
-                    if original_amount and original_currency:
-                        try:
-                            converted = await exchange_service.convert_to_uah(
-                                original_amount, original_currency
-                            )
-                        except Exception as exc:
-                            logger.warning(
-                                "Не вдалося оновити курс %s для %s: %s",
-                                original_currency,
-                                sheet_title,
-                                exc,
-                            )
-                        else:
-                            if converted:
-                                charge_amount = converted
-                                original_line = _format_original_message(
-                                    original_amount, original_currency
-                                )
-                    category = sub.get("category", "Підписки")
-                    row_index = sub.get("_row")
-                    user_id_raw = sub.get("user_id")
-                    try:
-                        user_id = int(str(user_id_raw))
-                    except (TypeError, ValueError):
-                        user_id = None
-
-                    if due_date == today and user_id:
-                        # створюємо витрату
-                        charge_value = -abs(charge_amount)
-                        try:
-                            sheets_service.append_transaction(
-                                user_id=user_id,
-                                nickname=sheet_title,
-                                amount=charge_value,
-                                category=category,
-                                note=f"{SUBSCRIPTION_NOTE_PREFIX}{name} (авто)",
-                                is_subscription=False,
-                                subscription_name=name,
-                                subscription_due_date=due_date.strftime("%d.%m.%Y"),
-                                legacy_titles=[sheet_title],
+                    plan = await _plan_renewals(sheet_title, sheet_values, today)
+                    if plan.new_transactions:
+                        async with slots:
+                            await asyncio.to_thread(
+                                sheets_service.apply_transaction_changes,
+                                worksheets[sheet_title],
+                                values[sheet_title],
+                                plan.field_updates,
+                                plan.new_transactions,
+                                plan.nickname,
                             )
-                            auto_charges += 1
-                            next_due = _next_charge_date(due_date)
-                            sheets_service.update_transaction_fields(
-                                sheet_title,
-                                row_index,
-                                {
-                                    'subscription_due_date': next_due.strftime("%d.%m.%Y"),
-                                    'amount': charge_value,
-                                },
-                                legacy_titles=[sheet_title],
-                            )
-                            await bot.send_message(
-                                chat_id=user_id,
-                                text=(
-                                    "🤖 <b>Автосписання виконано</b>\n\n"
-                                    f"{name}: {format_currency(charge_amount)}\n"
-                                    f"Наступна дата: {next_due.strftime('%d.%m.%Y')}"
-                                    + (f"\nБазова сума: {original_line}" if original_line else "")
-                                ),
-                            )
-                        except Exception as exc:
-                            logger.error("Failed to auto-charge %s: %s", sheet_title, exc, exc_info=True)
-
-                    elif due_date == tomorrow and user_id:
-                        notifications += 1
-                        await bot.send_message(
-                            chat_id=user_id,
-                            text=(
-                                "⏰ <b>Наближається підписка</b>\n\n"
-                                f"Завтра буде списання за <b>{name}</b>\n"
-                                f"Сума: {amount:.2f} UAH"
-                            ),
-                        )
-            except Exception as exc:
-                logger.error("Error checking subscriptions for %s: %s", sheet_title, exc, exc_info=True)
-
-        logger.info("✅ Subscription reminders: %s, auto-charges: %s", notifications, auto_charges)
+                        stats["auto_charges"] += len(plan.new_transactions)
+                        messages.extend(plan.charge_messages)
+                    messages.extend(plan.reminder_messages)
+                except Exception as exc:
+                    stats["failed_sheets"] += 1
+                    logger.error("Error checking subscriptions for %s: %s", sheet_title, exc, exc_info=True)
+
+        await asyncio.gather(*(sweep(chunk) for chunk in chunks))
+        if full_scan and not stats["failed_sheets"]:
+            await asyncio.to_thread(index.retain_sheets, worksheets)
+            await asyncio.to_thread(index.mark_built)
+        delivery = await broadcast_service.send(bot, messages, name="subscriptions")
+        logger.info(
+            "✅ Subscription sweep (%s): %s of %s sheets in %.1fs (%s reads) – "
+            "messages sent: %s/%s, auto-charges: %s, failed sheets: %s",
+            "full scan" if full_scan else "index",
+            len(titles),
+            len(worksheets),
+            time.monotonic() - started,
+            len(chunks),
+            delivery.sent,
+            delivery.total,
+            stats["auto_charges"],
+            stats["failed_sheets"],
+        )
     except Exception as exc:
         logger.error("Error in subscription renewals task: %s", exc, exc_info=True)
 
 
+# ----------------------- КУРСИ ВАЛЮТ ----------------------- #
+
+async def refresh_exchange_rates(bot: Bot):
+    """Оновлює курси до закінчення TTL, щоб запити не бачили застарілих"""
+    await exchange_service.refresh()
+
+
+async def fill_rate_history(bot: Bot):
+    """Доповнює історію курсів архівом ПриватБанку (перший запуск – за весь період)"""
+    logger.info("💱 Running scheduled task: exchange rate history")
+    try:
+        yesterday = date.today() - timedelta(days=1)
+        start = yesterday - timedelta(days=config.RATE_HISTORY_BACKFILL_DAYS - 1)
+        await exchange_service.backfill_history(start, yesterday)
+    except Exception as exc:
+        logger.error("Error in rate history task: %s", exc, exc_info=True)
+
+
+# ----------------------- AI-АНАЛІЗ ----------------------- #
+
+async def precompute_ai_insights(bot: Bot):
+    """
+    Вночі готує 30-денний AI-аналіз для користувачів з транзакціями за
+    останні AI_PRECOMPUTE_ACTIVE_DAYS днів. Результат лягає в кеш ai_service,
+    тож запит з тими самими даними вдень відповідає без виклику моделі.
+    """
+    logger.info("🤖 Running scheduled task: AI insights precompute")
+    if not ai_service.enabled:
+        return
+    try:
+        titles = [
+            ws.title
+            for ws in await asyncio.to_thread(sheets_service.spreadsheet.worksheets)
+            if USER_SHEET_PATTERN.fullmatch(ws.title)
+        ]
+    except Exception as exc:
+        logger.error("Error listing worksheets for AI precompute: %s", exc, exc_info=True)
+        return
+
+    start, end = resolve_period_bounds("30")
+    active_since = (end - timedelta(days=config.AI_PRECOMPUTE_ACTIVE_DAYS)).strftime("%Y-%m-%d")
+    slots = asyncio.Semaphore(config.AI_PRECOMPUTE_CONCURRENCY)
+    stats: Counter = Counter()
+    started = time.monotonic()
+
+    async def precompute(sheet_title: str):
+        async with slots:
+            if stats["breaker_open"]:
+                stats["skipped"] += 1
+                return
+            ctx = SheetContext(sheet_title=sheet_title, legacy_titles=[], display_name=sheet_title)
+            try:
+                payload = await prepare_analysis(ctx, start, end)
+                # period_end – дата останньої транзакції періоду
+                if payload is None or payload[0]["period_end"] < active_since:
+                    stats["inactive"] += 1
+                    return
+                analysis_context, ai_transactions, _ = payload
+                if await ai_service.precompute_analysis(ai_transactions, analysis_context):
+                    stats["computed"] += 1
+                else:
+                    stats["cached"] += 1
+            except CircuitOpenError:
+                # Модель недоступна – решту користувачів не читаємо даремно
+                stats["breaker_open"] += 1
+            except Exception as exc:
+                stats["failed"] += 1
+                logger.warning("AI precompute failed for %s: %r", sheet_title, exc)
+
+    await asyncio.gather(*(precompute(title) for title in titles))
+    logger.info(
+        "✅ AI precompute: %s users in %.1fs – computed %s, cached %s, inactive %s, failed %s, skipped %s",
+        len(titles),
+        time.monotonic() - started,
+        stats["computed"],
+        stats["cached"],
+        stats["inactive"],
+        stats["failed"] + stats["breaker_open"],
+        stats["skipped"],
+    )
+
+
 # ----------------------- ІНШІ ЗАДАЧІ ----------------------- #
 
 async def cleanup_old_data(bot: Bot):
@@ -231,13 +401,28 @@ async def generate_weekly_report(bot: Bot):
 def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler(timezone="Europe/Kiev")
 
-    for reminder_time in config.REMINDER_TIMES:
-        scheduler.add_job(
-            send_daily_reminders,
-            trigger=CronTrigger(hour=reminder_time["hour"], minute=reminder_time["minute"]),
-            kwargs={'bot': bot},
-            id=f"reminder_{reminder_time['hour']}_{reminder_time['minute']}",
-        )
+    scheduler.add_job(
+        dispatch_reminders,
+        trigger=IntervalTrigger(seconds=config.REMINDER_TICK_SECONDS),
+        kwargs={'bot': bot},
+        id="reminders",
+        next_run_time=datetime.now(timezone.utc),
+    )
+
+    scheduler.add_job(
+        refresh_exchange_rates,
+        trigger=IntervalTrigger(seconds=config.EXCHANGE_RATES_REFRESH_SECONDS),
+        kwargs={'bot': bot},
+        id="exchange_rates_refresh",
+        next_run_time=datetime.now(timezone.utc),
+    )
+
+    scheduler.add_job(
+        fill_rate_history,
+        trigger=CronTrigger(hour=1, minute=0),
+        kwargs={'bot': bot},
+        id="rate_history_fill",
+    )
 
     scheduler.add_job(
         check_subscription_renewals,
@@ -246,6 +431,13 @@ def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
         id="subscription_check",
     )
 
+    scheduler.add_job(
+        precompute_ai_insights,
+        trigger=CronTrigger(hour=config.AI_PRECOMPUTE_HOUR, minute=30),
+        kwargs={'bot': bot},
+        id="ai_precompute",
+    )
+
     scheduler.add_job(
         generate_weekly_report,
         trigger=CronTrigger(day_of_week="sun", hour=18, minute=0),
@@ -5,8 +5,21 @@
 Сервіси додатку
 """
 
-from .sheets_service import sheets_service
-from .ai_service import ai_service
-from .export_service import export_service
+import importlib
 
-__all__ = ['sheets_service', 'ai_service', 'export_service']
\ No newline at end of file
+# Сервіси імпортуються ліниво: важкі залежності (pandas, Gemini)
+# не повинні завантажуватися при імпорті будь-якого підмодуля пакета
+_LAZY_SERVICES = {
+    'sheets_service': '.sheets_service',
+    'ai_service': '.ai_service',
+    'export_service': '.export_service',
+}
+
+__all__ = ['sheets_service', 'ai_service', 'export_service']
+
+
+def __getattr__(name):
+    module_name = _LAZY_SERVICES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
\ No newline at end of file
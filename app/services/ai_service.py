@@ -8,11 +8,18 @@
 import asyncio
 import logging
 import re
-from typing import Any, Dict, List
-
-from google import generativeai as genai
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 from app.config.settings import config
+from app.utils.cache import LRUCache, make_fingerprint
+from app.utils.prompt_compaction import compact_transactions, estimate_tokens, format_amount
+from app.utils.resilience import (
+    BoundedExecutor,
+    CircuitBreaker,
+    CircuitOpenError,
+    QueueFullError,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,19 +27,64 @@ logger = logging.getLogger(__name__)
 class AIService:
     """Основний сервіс для AI-аналізу."""
 
+    MODEL_NAME = "gemini-2.5-flash"
+    # Жорсткий бюджет токенів усього промпту для кожного типу запиту
+    PROMPT_TOKEN_BUDGETS = {"analysis": 4000, "recommendations": 2000, "prediction": 1500}
+    MIN_TRANSACTIONS_TOKENS = 200
+
     def __init__(self):
-        if config.GEMINI_API_KEY and config.ENABLE_AI_ANALYSIS:
+        # Клієнт Gemini (google.generativeai) важкий – створюється при першому виклику
+        self._model = None
+        self._init_lock = threading.Lock()
+        self.enabled = bool(config.GEMINI_API_KEY and config.ENABLE_AI_ANALYSIS)
+        if not self.enabled:
+            logger.warning("AI analysis is disabled")
+        # Готові відповіді за відбитком вхідних даних (тип запиту, агрегати, транзакції)
+        self._responses = LRUCache(
+            max_items=config.AI_CACHE_MAX_ITEMS, ttl=config.AI_CACHE_TTL_SECONDS
+        )
+        # Повільний Gemini не займає спільний пул asyncio.to_thread
+        self._executor = BoundedExecutor(
+            "gemini",
+            max_concurrency=config.AI_MAX_CONCURRENCY,
+            max_queue=config.AI_MAX_QUEUE,
+            timeout=config.AI_CALL_TIMEOUT_SECONDS,
+            breaker=CircuitBreaker(
+                failure_threshold=config.AI_BREAKER_FAILURES,
+                reset_timeout=config.AI_BREAKER_RESET_SECONDS,
+                name="gemini",
+            ),
+        )
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._init_model()
+        return self._model
+
+    def _init_model(self):
+        with self._init_lock:
+            if self._model is not None:
+                return
             try:
+                from google import generativeai as genai
+
                 genai.configure(api_key=config.GEMINI_API_KEY)
-                self.model = genai.GenerativeModel("gemini-2.5-flash")
-                self.enabled = True
+                self._model = genai.GenerativeModel(self.MODEL_NAME)
                 logger.info("✅ Gemini AI initialized")
             except Exception as exc:
                 logger.error("⚠️ Failed to initialize Gemini: %s", exc)
                 self.enabled = False
-        else:
-            self.enabled = False
-            logger.warning("AI analysis is disabled")
+                raise
+
+    def warm_up(self):
+        """Попередньо ініціалізує клієнт Gemini."""
+        if not self.enabled:
+            return
+        try:
+            self._init_model()
+        except Exception:
+            pass
 
     async def analyze_finances(
         self, transactions: List[dict], context: Dict[str, Any]
@@ -41,16 +93,83 @@ class AIService:
         if not self.enabled:
             return "🤖 AI-аналіз тимчасово недоступний."
 
-        transactions_str = self._format_transactions(transactions)
-        prompt = self._build_analysis_prompt(transactions_str, context)
+        key = self._fingerprint("analysis", transactions, context)
+        cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+
+        prompt = self._analysis_prompt(transactions, context)
+
+        try:
+            return await self._generate(key, prompt)
+        except Exception as exc:
+            logger.error("AI analysis error: %r", exc)
+            return self._error_text(
+                exc, "⚠️ На жаль, не вдалося побудувати AI-аналітику. Спробуй пізніше."
+            )
+
+    async def precompute_analysis(
+        self, transactions: List[dict], context: Dict[str, Any]
+    ) -> bool:
+        """
+        Заздалегідь кешує результат analyze_finances для тих самих даних.
+        True – виконано новий виклик моделі; помилки передаються викликачу.
+        """
+        if not self.enabled:
+            return False
+
+        key = self._fingerprint("analysis", transactions, context)
+        if key in self._responses:
+            return False
+
+        prompt = self._analysis_prompt(transactions, context)
+        text = await self._executor.run(self._call_model, prompt)
+        self._responses.set(key, text, ttl=config.AI_PRECOMPUTE_TTL_SECONDS)
+        return True
+
+    async def stream_finances_analysis(
+        self, transactions: List[dict], context: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """
+        Те саме, що analyze_finances, але віддає текст частинами в міру генерації.
+        Кеш спільний: збережена відповідь віддається одним фрагментом.
+        """
+        if not self.enabled:
+            yield "🤖 AI-аналіз тимчасово недоступний."
+            return
+
+        key = self._fingerprint("analysis", transactions, context)
+        cached = self._responses.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        prompt = self._analysis_prompt(transactions, context)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+
+        def on_chunk(text: str):
+            loop.call_soon_threadsafe(chunks.put_nowait, text)
+
+        task = asyncio.create_task(self._executor.run(self._stream_model, prompt, on_chunk))
+        # Фрагменти з потоку ставляться в чергу раніше, ніж завершиться задача
+        task.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        parts = []
+        while (chunk := await chunks.get()) is not None:
+            parts.append(chunk)
+            yield chunk
 
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            clean_text = re.sub(r"[*#]+", "", response.text)
-            return clean_text.strip()
+            await task
         except Exception as exc:
-            logger.error("AI analysis error: %s", exc)
-            return "⚠️ На жаль, не вдалося побудувати AI-аналітику. Спробуй пізніше."
+            logger.error("AI analysis stream error: %r", exc)
+            prefix = "\n\n" if parts else ""
+            yield prefix + self._error_text(
+                exc, "⚠️ На жаль, не вдалося побудувати AI-аналітику. Спробуй пізніше."
+            )
+            return
+        self._responses.set(key, "".join(parts).strip())
 
     async def get_budget_recommendations(
         self, transactions: List[dict], income: float
@@ -59,67 +178,151 @@ class AIService:
         if not self.enabled:
             return "🤖 AI-рекомендації тимчасово недоступні."
 
-        transactions_str = self._format_transactions(transactions)
-        prompt = f"""
-        Проаналізуй витрати користувача та підготуй короткі рекомендації.
+        key = self._fingerprint("recommendations", transactions, {"income": income})
+        cached = self._responses.get(key)
+        if cached is not None:
+            return cached
 
-        Щомісячний дохід: {income} UAH
+        def build(transactions_str: str) -> str:
+            return f"""
+            Проаналізуй витрати користувача та підготуй короткі рекомендації.
 
-        Транзакції:
-        {transactions_str}
+            Щомісячний дохід: {income} UAH
 
-        Надішли 4 поради:
-        1. Як оптимізувати найбільшу категорію.
-        2. Де можна скоротити витрати без втрати якості життя.
-        3. Яку частину доходу варто перекинути до резерву.
-        4. Які довгострокові кроки варто закласти вже зараз.
+            Транзакції (date | amount currency | category | note):
+            {transactions_str}
 
-        Будь конкретним і не перевищуй 500 символів.
-        """
+            Надішли 4 поради:
+            1. Як оптимізувати найбільшу категорію.
+            2. Де можна скоротити витрати без втрати якості життя.
+            3. Яку частину доходу варто перекинути до резерву.
+            4. Які довгострокові кроки варто закласти вже зараз.
+
+            Будь конкретним і не перевищуй 500 символів.
+            """
+
+        prompt = self._compact_prompt("recommendations", transactions, build)
 
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            return re.sub(r"[*#]+", "", response.text).strip()
+            return await self._generate(key, prompt)
         except Exception as exc:
-            logger.error("Recommendations error: %s", exc)
-            return "⚠️ Немає змоги отримати рекомендації прямо зараз."
+            logger.error("Recommendations error: %r", exc)
+            return self._error_text(exc, "⚠️ Немає змоги отримати рекомендації прямо зараз.")
 
     async def predict_expenses(self, transactions: List[dict]) -> str:
         """AI-прогноз витрат на основі останніх транзакцій."""
         if not self.enabled:
             return "🤖 Прогноз зараз недоступний."
 
-        transactions_str = self._format_transactions(transactions[-30:])
-        prompt = f"""
-        Є історія останніх витрат користувача. Побудуй короткий прогноз на
-        найближчий тиждень і поради, як утримати бюджет у межах плану.
+        recent = transactions[-30:]
+        key = self._fingerprint("prediction", recent)
+        cached = self._responses.get(key)
+        if cached is not None:
+            return cached
 
-        {transactions_str}
+        def build(transactions_str: str) -> str:
+            return f"""
+            Є історія останніх витрат користувача. Побудуй короткий прогноз на
+            найближчий тиждень і поради, як утримати бюджет у межах плану.
 
-        Структура відповіді:
-        1. Ймовірний обсяг витрат.
-        2. Категорії, які зростатимуть найшвидше.
-        3. Що варто контролювати або обмежити.
-        """
+            {transactions_str}
+
+            Структура відповіді:
+            1. Ймовірний обсяг витрат.
+            2. Категорії, які зростатимуть найшвидше.
+            3. Що варто контролювати або обмежити.
+            """
+
+        prompt = self._compact_prompt("prediction", recent, build)
 
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            return re.sub(r"[*#]+", "", response.text).strip()
+            return await self._generate(key, prompt)
         except Exception as exc:
-            logger.error("Prediction error: %s", exc)
-            return "⚠️ Наразі не можу спрогнозувати витрати."
-
-    def _format_transactions(self, transactions: List[dict]) -> str:
-        """Готує транзакції у форматі: date | amount currency | category | note."""
-        lines = []
-        for item in transactions:
-            date = item.get("date", "")
-            amount = self._format_amount(item.get("amount"))
-            currency = item.get("currency") or config.DEFAULT_CURRENCY
-            category = item.get("category", "")
-            note = (item.get("note") or "").strip()
-            lines.append(f"{date} | {amount} {currency} | {category} | {note}")
-        return "\n".join(lines)
+            logger.error("Prediction error: %r", exc)
+            return self._error_text(exc, "⚠️ Наразі не можу спрогнозувати витрати.")
+
+    async def _generate(self, key: str, prompt: str) -> str:
+        """Викликає модель і кешує очищену відповідь (помилки не кешуються)."""
+        text = await self._executor.run(self._call_model, prompt)
+        self._responses.set(key, text)
+        return text
+
+    def _stream_model(self, prompt: str, on_chunk: Callable[[str], None]):
+        # Виконується в потоці AI-пулу; кожен фрагмент передається в event loop
+        for chunk in self.model.generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Фрагмент без тексту (наприклад, лише причина завершення)
+                continue
+            text = re.sub(r"[*#]+", "", text)
+            if text:
+                on_chunk(text)
+
+    def _call_model(self, prompt: str) -> str:
+        # Виконується в потоці AI-пулу, включно з ледачою ініціалізацією клієнта
+        response = self.model.generate_content(prompt)
+        return re.sub(r"[*#]+", "", response.text).strip()
+
+    @staticmethod
+    def _error_text(exc: Exception, default: str) -> str:
+        if isinstance(exc, QueueFullError):
+            return "⏳ Зараз забагато запитів до AI. Спробуй ще раз за хвилину."
+        if isinstance(exc, CircuitOpenError):
+            return "🤖 AI-сервіс тимчасово не відповідає. Спробуй трохи пізніше."
+        if isinstance(exc, asyncio.TimeoutError):
+            return "⌛ AI відповідає надто довго. Спробуй пізніше або обери коротший період."
+        return default
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+    def _fingerprint(
+        self,
+        kind: str,
+        transactions: List[dict],
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Відбиток запиту з тих самих полів транзакцій, що потрапляють у промпт."""
+        rows = [
+            (
+                item.get("date", ""),
+                format_amount(item.get("amount")),
+                item.get("currency") or config.DEFAULT_CURRENCY,
+                item.get("category", ""),
+                item.get("note") or "",
+            )
+            for item in transactions
+        ]
+        return make_fingerprint(self.MODEL_NAME, kind, extra or {}, rows)
+
+    def _analysis_prompt(self, transactions: List[dict], context: Dict[str, Any]) -> str:
+        return self._compact_prompt(
+            "analysis", transactions,
+            lambda transactions_str: self._build_analysis_prompt(transactions_str, context),
+        )
+
+    def _compact_prompt(
+        self, kind: str, transactions: List[dict], build: Callable[[str], str]
+    ) -> str:
+        """
+        Будує промпт у межах PROMPT_TOKEN_BUDGETS[kind]: транзакціям дістається
+        те, що лишається після решти тексту, і вони стискаються під цей обсяг.
+        """
+        overhead = estimate_tokens(self._strip_indent(build("")))
+        budget = max(self.PROMPT_TOKEN_BUDGETS[kind] - overhead, self.MIN_TRANSACTIONS_TOKENS)
+        transactions_str = compact_transactions(transactions, budget, config.DEFAULT_CURRENCY)
+        prompt = self._strip_indent(build(transactions_str))
+        logger.info(
+            "AI %s prompt: %s transactions, ~%s tokens",
+            kind, len(transactions), estimate_tokens(prompt),
+        )
+        return prompt
+
+    @staticmethod
+    def _strip_indent(prompt: str) -> str:
+        """Прибирає відступи коду з промпту – вони лише додають токени."""
+        return "\n".join(line.strip() for line in prompt.strip().splitlines())
 
     def _build_analysis_prompt(
         self, transactions_str: str, context: Dict[str, Any]
@@ -143,17 +346,13 @@ class AIService:
         Проаналізуй транзакції українського користувача за конкретний період 
         і дай структурований, чіткий та максимально корисний аналіз.
 
-        Це охоплює період: {context.get('period_start')} → {context.get('period_end')}
-        {context.get('period_note')}
-
-        Ось формат транзакцій (табличні рядки):
-        date | amount currency | category | note
-
         Дані:
         Період: {context.get('period_start')} → {context.get('period_end')}
         Моя валюта: {currency}
         Кількість транзакцій: {context.get('transactions_count')}
-        Нижче наведені останні {context.get('limited_count')} транзакцій за період:
+        Транзакції за період (date | amount currency | category | note).
+        Дрібні витрати можуть бути підсумовані по днях/тижнях і категоріях
+        (у note – «транзакцій: N»), доходи та великі витрати – окремими рядками:
 
         {transactions_str}
 
@@ -204,15 +403,6 @@ class AIService:
         Говори українською.
         """
 
-    @staticmethod
-    def _format_amount(value: Any) -> str:
-        try:
-            number = float(value or 0)
-        except (TypeError, ValueError):
-            return "0"
-        formatted = f"{number:.2f}".rstrip("0").rstrip(".")
-        return formatted or "0"
-
 
 # Singleton
 ai_service = AIService()
@@ -0,0 +1,150 @@
+# ============================================
+# FILE: app/services/broadcast_service.py
+# ============================================
+"""
+Розсилки повідомлень у Telegram: глобальний темп, обмежена кількість
+одночасних відправок і облік доставки
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+from app.config.settings import config
+from app.services.sheets_service import sheets_service
+from app.utils.resilience import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед повтором після мережевої помилки чи 5xx
+TRANSIENT_RETRY_DELAY = 1.0
+
+
+@dataclass
+class BroadcastStats:
+    """Підсумок однієї розсилки"""
+    name: str
+    total: int = 0
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    blocked_ids: List[int] = field(default_factory=list)
+
+    def as_row(self) -> list:
+        return [
+            self.name, self.total, self.sent, self.blocked,
+            self.failed, self.retries, round(self.elapsed, 1),
+        ]
+
+
+class BroadcastService:
+    """
+    Надсилає пакети повідомлень (chat_id, текст).
+
+    Усі розсилки ділять один TokenBucket, тож разом не перевищують
+    BROADCAST_RATE_PER_SECOND. Відповідь 429 (retry_after) зупиняє весь
+    темп на вказаний час, а повідомлення повторюється. Користувачі, що
+    заблокували бота (403), одним запитом прибираються з reminder_settings.
+    Підсумок кожної розсилки пишеться в лог, а розсилок щонайменше на
+    BROADCAST_STATS_MIN_RECIPIENTS отримувачів – ще й на аркуш broadcast_stats.
+    """
+
+    def __init__(
+        self,
+        rate: float = config.BROADCAST_RATE_PER_SECOND,
+        concurrency: int = config.BROADCAST_CONCURRENCY,
+        max_retries: int = config.BROADCAST_MAX_RETRIES,
+        stats_min_recipients: int = config.BROADCAST_STATS_MIN_RECIPIENTS,
+    ):
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.stats_min_recipients = stats_min_recipients
+        self.last_stats: Optional[BroadcastStats] = None
+
+    async def send(
+        self,
+        bot: Bot,
+        messages: Iterable[Tuple[int, str]],
+        name: str = "broadcast",
+    ) -> BroadcastStats:
+        messages = list(messages)
+        stats = BroadcastStats(name=name, total=len(messages))
+        if not messages:
+            return stats
+
+        started = time.monotonic()
+        pending: Iterator[Tuple[int, str]] = iter(messages)
+
+        # Фіксована кількість воркерів з одного ітератора замість задачі на повідомлення
+        async def worker():
+            for chat_id, text in pending:
+                await self._deliver(bot, chat_id, text, stats)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(messages)))))
+        stats.elapsed = time.monotonic() - started
+
+        if stats.blocked_ids:
+            try:
+                await asyncio.to_thread(sheets_service.remove_reminder_users, stats.blocked_ids)
+            except Exception as exc:
+                logger.error("Failed to remove blocked users from reminders: %s", exc)
+        await self._record(stats)
+        return stats
+
+    async def _deliver(self, bot: Bot, chat_id: int, text: str, stats: BroadcastStats):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                stats.retries += 1
+            await self.bucket.acquire()
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+                stats.sent += 1
+                return
+            except TelegramRetryAfter as exc:
+                logger.warning("Telegram flood control, pausing broadcast for %ss", exc.retry_after)
+                self.bucket.pause(exc.retry_after)
+            except TelegramForbiddenError:
+                stats.blocked += 1
+                stats.blocked_ids.append(chat_id)
+                return
+            except (TelegramNetworkError, TelegramServerError) as exc:
+                logger.warning("Transient error sending to %s: %s", chat_id, exc)
+                if attempt < self.max_retries:
+                    await asyncio.sleep(TRANSIENT_RETRY_DELAY)
+            except Exception as exc:
+                logger.error("Failed to send message to %s: %s", chat_id, exc)
+                stats.failed += 1
+                return
+        logger.error("Giving up on message to %s after %s retries", chat_id, self.max_retries)
+        stats.failed += 1
+
+    async def _record(self, stats: BroadcastStats):
+        self.last_stats = stats
+        logger.info(
+            "📨 Broadcast '%s': %s/%s sent in %.1fs – blocked: %s, failed: %s, retries: %s",
+            stats.name, stats.sent, stats.total, stats.elapsed,
+            stats.blocked, stats.failed, stats.retries,
+        )
+        if stats.total < self.stats_min_recipients:
+            return
+        try:
+            await asyncio.to_thread(sheets_service.append_broadcast_stats, stats.as_row())
+        except Exception as exc:
+            logger.warning("Failed to record broadcast stats: %s", exc)
+
+
+# Singleton
+broadcast_service = BroadcastService()
@@ -0,0 +1,396 @@
+# ============================================
+# FILE: app/services/chart_engine.py
+# ============================================
+"""
+Рушій рендерингу графіків на заготовлених фігурах matplotlib.
+
+Для кожного типу графіка фігура, осі, шрифти, стилі та кольори
+налаштовуються один раз. Під час рендеру оновлюються лише дані артистів
+(ydata ліній, висоти стовпців, кути секторів) на повторно використаному
+Agg-полотні, без tight_layout та bbox_inches='tight'.
+"""
+
+import io
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+import matplotlib
+matplotlib.use('Agg')  # Для серверного використання
+from matplotlib import font_manager
+from matplotlib import dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle, Wedge
+import seaborn as sns
+import numpy as np
+
+from app.utils.downsampling import minmax_downsample
+
+logger = logging.getLogger(__name__)
+
+CHART_DPI = 150
+PLACEHOLDER_DPI = 100
+EXPENSE_COLOR = '#e74c3c'
+INCOME_COLOR = '#27ae60'
+BALANCE_COLOR = '#3498db'
+TREND_COLOR = '#9b59b6'
+
+# Налаштування стилю
+sns.set_style("whitegrid")
+matplotlib.rcParams['figure.figsize'] = (10, 6)
+matplotlib.rcParams['figure.dpi'] = 100
+
+# Для підтримки кирилиці
+try:
+    font_path = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+    prop = font_manager.FontProperties(fname=font_path)
+    matplotlib.rcParams['font.family'] = prop.get_name()
+except Exception:
+    logger.warning("Could not load DejaVu font, cyrillic may not display correctly")
+
+
+@lru_cache(maxsize=16)
+def pie_colors(count: int):
+    return sns.color_palette("husl", count)
+
+
+class _ChartTemplate(ABC):
+    """Фігура з полотном Agg та фіксованими полями"""
+
+    figsize = (12, 6)
+    dpi = CHART_DPI
+    margins = dict(left=0.08, right=0.97, top=0.9, bottom=0.16)
+
+    def __init__(self):
+        self.figure = Figure(figsize=self.figsize, dpi=self.dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.figure.subplots_adjust(**self.margins)
+        # Ширина області графіка в пікселях – межа кількості точок на лінії
+        self.plot_width_px = int(
+            self.figsize[0] * self.dpi * (self.margins['right'] - self.margins['left'])
+        )
+        self.setup()
+
+    @abstractmethod
+    def setup(self):
+        """Одноразове налаштування осей і артистів шаблону"""
+
+    def to_png(self) -> bytes:
+        buffer = io.BytesIO()
+        self.canvas.print_png(buffer)
+        return buffer.getvalue()
+
+    def _autoscale(self):
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def _setup_date_axis(self):
+        self.ax.xaxis_date()
+        locator = mdates.AutoDateLocator(minticks=4, maxticks=10)
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m.%y'))
+        self.ax.tick_params(axis='x', labelrotation=30)
+
+
+class PieTemplate(_ChartTemplate):
+    """Кругова діаграма: до MAX_SLICES секторів з підписами та відсотками"""
+
+    figsize = (10, 8)
+    margins = dict(left=0.05, right=0.95, top=0.88, bottom=0.05)
+    MAX_SLICES = 8
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def setup(self):
+        ax = self.ax
+        ax.set(frame_on=False, xticks=[], yticks=[], xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+        ax.set_aspect('equal')
+        ax.grid(False)
+        self.title = ax.set_title("", fontsize=14, fontweight='bold', pad=20)
+        self.wedges = []
+        self.labels = []
+        self.pct_texts = []
+        for _ in range(self.MAX_SLICES):
+            wedge = Wedge((0, 0), 1, 0, 0, linewidth=0)
+            ax.add_patch(wedge)
+            self.wedges.append(wedge)
+            self.labels.append(ax.text(0, 0, "", fontsize=10, va='center'))
+            self.pct_texts.append(ax.text(
+                0, 0, "", ha='center', va='center',
+                color='white', fontsize=9, fontweight='bold'
+            ))
+
+    def render(self, labels: Sequence[str], values: Sequence[float], title: str) -> bytes:
+        total = float(sum(values)) or 1.0
+        colors = pie_colors(len(values))
+        theta1 = 90.0
+        for idx, wedge in enumerate(self.wedges):
+            visible = idx < len(values)
+            wedge.set_visible(visible)
+            self.labels[idx].set_visible(visible)
+            self.pct_texts[idx].set_visible(visible)
+            if not visible:
+                continue
+            fraction = float(values[idx]) / total
+            theta2 = theta1 + 360.0 * fraction
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            wedge.set_facecolor(colors[idx])
+
+            middle = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label = self.labels[idx]
+            label.set_text(labels[idx])
+            label.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct = self.pct_texts[idx]
+            pct.set_text(f"{fraction * 100:.1f}%")
+            pct.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            theta1 = theta2
+        self.title.set_text(title)
+        return self.to_png()
+
+
+class LineTemplate(_ChartTemplate):
+    """Денна динаміка витрат і доходів"""
+
+    def setup(self):
+        ax = self.ax
+        self.expense_line, = ax.plot([], [], marker='o', linewidth=2,
+                                     label='Витрати', color=EXPENSE_COLOR, markersize=4)
+        self.income_line, = ax.plot([], [], marker='o', linewidth=2,
+                                    label='Доходи', color=INCOME_COLOR, markersize=4)
+        ax.set_xlabel('Дата', fontsize=12)
+        ax.set_ylabel('Сума (UAH)', fontsize=12)
+        self.title = ax.set_title("", fontsize=14, fontweight='bold')
+        ax.legend(fontsize=11)
+        ax.grid(True, alpha=0.3)
+        self._setup_date_axis()
+
+    def render(self, dates, expenses, incomes, title: str) -> bytes:
+        x = mdates.date2num(dates)
+        self.expense_line.set_data(*minmax_downsample(x, expenses, self.plot_width_px))
+        self.income_line.set_data(*minmax_downsample(x, incomes, self.plot_width_px))
+        # Маркери лише коли точок небагато – інакше вони зливаються
+        marker = 'o' if len(x) <= 120 else ''
+        self.expense_line.set_marker(marker)
+        self.income_line.set_marker(marker)
+        self.title.set_text(title)
+        self._autoscale()
+        return self.to_png()
+
+
+class BalanceTemplate(_ChartTemplate):
+    """Історія балансу з заливкою до нуля"""
+
+    def setup(self):
+        ax = self.ax
+        self.line, = ax.plot([], [], linewidth=2.5, color=BALANCE_COLOR, marker='')
+        self.fill = ax.fill_between([0, 1], [0, 0], alpha=0.3, color=BALANCE_COLOR)
+        ax.set_xlabel('Дата', fontsize=12)
+        self.ylabel = ax.set_ylabel('Баланс (UAH)', fontsize=12)
+        ax.set_title('Історія балансу', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        # Додаємо горизонтальну лінію на 0
+        ax.axhline(y=0, color='red', linestyle='--', linewidth=1, alpha=0.5)
+        self._setup_date_axis()
+
+    def render(self, dates, balances, currency: str) -> bytes:
+        x, y = minmax_downsample(mdates.date2num(dates), balances, self.plot_width_px)
+        self.line.set_data(x, y)
+        polygon = np.column_stack([
+            np.concatenate([x, x[::-1]]),
+            np.concatenate([y, np.zeros_like(y)]),
+        ])
+        self.fill.set_verts([polygon])
+        self.ylabel.set_text(f'Баланс ({currency})')
+        self._autoscale()
+        return self.to_png()
+
+
+class BarComparisonTemplate(_ChartTemplate):
+    """Доходи vs витрати по місяцях (до MAX_GROUPS груп)"""
+
+    margins = dict(left=0.08, right=0.97, top=0.9, bottom=0.22)
+    MAX_GROUPS = 6
+    WIDTH = 0.35
+
+    def setup(self):
+        ax = self.ax
+        positions = np.arange(self.MAX_GROUPS)
+        zeros = np.zeros(self.MAX_GROUPS)
+        self.income_bars = list(ax.bar(positions - self.WIDTH / 2, zeros, self.WIDTH,
+                                       label='Доходи', color=INCOME_COLOR, alpha=0.8))
+        self.expense_bars = list(ax.bar(positions + self.WIDTH / 2, zeros, self.WIDTH,
+                                        label='Витрати', color=EXPENSE_COLOR, alpha=0.8))
+        self.value_texts = [
+            ax.text(0, 0, "", ha='center', va='bottom', fontsize=8)
+            for _ in range(2 * self.MAX_GROUPS)
+        ]
+        ax.set_xlabel('Місяць', fontsize=12)
+        self.ylabel = ax.set_ylabel('Сума (UAH)', fontsize=12)
+        ax.set_title('Порівняння доходів та витрат', fontsize=14, fontweight='bold')
+        ax.legend(fontsize=11)
+        ax.grid(True, alpha=0.3, axis='y')
+
+    def render(self, labels: Sequence[str], incomes, expenses, currency: str) -> bytes:
+        count = min(len(labels), self.MAX_GROUPS)
+        bars = self.income_bars + self.expense_bars
+        heights = list(incomes[:count]) + [0.0] * (self.MAX_GROUPS - count)
+        heights += list(expenses[:count]) + [0.0] * (self.MAX_GROUPS - count)
+        for idx, (bar, height, text) in enumerate(zip(bars, heights, self.value_texts)):
+            visible = (idx % self.MAX_GROUPS) < count
+            bar.set_visible(visible)
+            bar.set_height(height)
+            text.set_visible(visible and height > 0)
+            if visible and height > 0:
+                text.set_position((bar.get_x() + bar.get_width() / 2., height))
+                text.set_text(f'{height:,.0f}')
+        ax = self.ax
+        ax.set_xticks(range(count))
+        ax.set_xticklabels(labels[:count], rotation=45, ha='right')
+        ax.set_xlim(-0.6, count - 0.4)
+        top = max(heights) if heights else 0
+        ax.set_ylim(0, top * 1.1 if top > 0 else 1)
+        self.ylabel.set_text(f'Сума ({currency})')
+        return self.to_png()
+
+
+class CategoryTrendTemplate(_ChartTemplate):
+    """Тижневі витрати категорії з лінією тренду"""
+
+    margins = dict(left=0.08, right=0.97, top=0.9, bottom=0.16)
+
+    def setup(self):
+        ax = self.ax
+        self.bars: List[Rectangle] = []
+        self.trend_line, = ax.plot([], [], "r--", linewidth=2, label='Тренд', alpha=0.7)
+        ax.set_xlabel('Тиждень', fontsize=12)
+        ax.set_ylabel('Сума (UAH)', fontsize=12)
+        self.title = ax.set_title("", fontsize=14, fontweight='bold')
+        self.legend = ax.legend()
+        ax.grid(True, alpha=0.3, axis='y')
+
+    def _ensure_bars(self, count: int):
+        while len(self.bars) < count:
+            bar = Rectangle((len(self.bars) - 0.4, 0), 0.8, 0, color=TREND_COLOR, alpha=0.7)
+            self.ax.add_patch(bar)
+            self.bars.append(bar)
+
+    def render(self, labels: Sequence[str], amounts, title: str) -> bytes:
+        count = len(amounts)
+        self._ensure_bars(count)
+        for idx, bar in enumerate(self.bars):
+            bar.set_visible(idx < count)
+            bar.set_height(amounts[idx] if idx < count else 0)
+
+        has_trend = count > 2
+        if has_trend:
+            positions = np.arange(count)
+            slope, intercept = np.polyfit(positions, amounts, 1)
+            self.trend_line.set_data(positions, slope * positions + intercept)
+        self.trend_line.set_visible(has_trend)
+        self.legend.set_visible(has_trend)
+
+        ax = self.ax
+        ax.set_xticks(range(count))
+        ax.set_xticklabels(labels, rotation=45)
+        ax.set_xlim(-0.6, count - 0.4)
+        top = max(amounts) if count else 0
+        ax.set_ylim(0, top * 1.1 if top > 0 else 1)
+        self.title.set_text(title)
+        return self.to_png()
+
+
+class PlaceholderTemplate(_ChartTemplate):
+    """Заглушка з текстом по центру"""
+
+    figsize = (8, 6)
+    dpi = PLACEHOLDER_DPI
+    margins = dict(left=0, right=1, top=1, bottom=0)
+
+    def setup(self):
+        self.ax.axis('off')
+        self.text = self.ax.text(
+            0.5, 0.5, "",
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=self.ax.transAxes,
+            fontsize=16,
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5)
+        )
+
+    def render(self, message: str) -> bytes:
+        self.text.set_text(message)
+        return self.to_png()
+
+
+class ChartEngine:
+    """Пул заготовлених фігур: по кілька екземплярів на кожен тип графіка"""
+
+    TEMPLATES = {
+        'pie': PieTemplate,
+        'line': LineTemplate,
+        'balance': BalanceTemplate,
+        'bar_comparison': BarComparisonTemplate,
+        'category_trend': CategoryTrendTemplate,
+        'placeholder': PlaceholderTemplate,
+    }
+
+    def __init__(self, max_idle_per_kind: int = 2):
+        self.max_idle_per_kind = max_idle_per_kind
+        self._idle: Dict[str, List[_ChartTemplate]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _acquire(self, kind: str):
+        with self._lock:
+            template = self._idle[kind].pop() if self._idle[kind] else None
+        if template is None:
+            template = self.TEMPLATES[kind]()
+        yield template
+        # Після помилки стан фігури невідомий – такий шаблон не повертаємо в пул
+        with self._lock:
+            if len(self._idle[kind]) < self.max_idle_per_kind:
+                self._idle[kind].append(template)
+
+    def prepare(self):
+        """Створює по одній фігурі кожного типу заздалегідь"""
+        for kind in self.TEMPLATES:
+            with self._acquire(kind):
+                pass
+
+    def render_pie(self, labels, values, title: str) -> bytes:
+        with self._acquire('pie') as template:
+            return template.render(labels, values, title)
+
+    def render_line(self, dates, expenses, incomes, title: str) -> bytes:
+        with self._acquire('line') as template:
+            return template.render(dates, expenses, incomes, title)
+
+    def render_balance(self, dates, balances, currency: str) -> bytes:
+        with self._acquire('balance') as template:
+            return template.render(dates, balances, currency)
+
+    def render_bar_comparison(self, labels, incomes, expenses, currency: str) -> bytes:
+        with self._acquire('bar_comparison') as template:
+            return template.render(labels, incomes, expenses, currency)
+
+    def render_category_trend(self, labels, amounts, title: str) -> bytes:
+        with self._acquire('category_trend') as template:
+            return template.render(labels, amounts, title)
+
+    def render_placeholder(self, message: str) -> bytes:
+        with self._acquire('placeholder') as template:
+            return template.render(message)
+
+
+# Singleton
+chart_engine = ChartEngine()
@@ -5,36 +5,71 @@
 Сервіс для генерації графіків та візуалізації
 """
 
+import asyncio
+import html
 import io
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
 from collections import defaultdict
 
-import matplotlib
-matplotlib.use('Agg')  # Для серверного використання
-import matplotlib.pyplot as plt
-from matplotlib import font_manager
-import seaborn as sns
-import numpy as np
-
 from app.config.settings import config
+from app.utils.cache import DiskCache, LRUCache, make_cache_key, ttl_epoch
+from app.utils.formatters import format_currency
 from app.utils.helpers import parse_sheet_datetime
+from app.utils.process_pool import process_pool
+from app.utils.sparklines import block_sparkline, braille_line, horizontal_bar
 
 logger = logging.getLogger(__name__)
 
-# Налаштування стилю
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (10, 6)
-plt.rcParams['figure.dpi'] = 100
+# Рушій графіків (matplotlib, seaborn, numpy) важкий – імпортується при першому графіку
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _get_engine():
+    """Повертає пул заготовлених фігур, імпортуючи рушій при першому виклику"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from app.services.chart_engine import chart_engine
+                _engine = chart_engine
+    return _engine
+
+
+def _render_in_worker(chart_type: str, transactions: List[Dict], currency: str) -> "ChartImage":
+    """Точка входу процесу-воркера"""
+    return ChartService.render(chart_type, transactions, currency)
+
+# Тексти заглушок "немає даних"
+NO_DATA_MESSAGE = "Немає даних для відображення"
+NOT_ENOUGH_DATA_MESSAGE = "Недостатньо даних"
+NO_PERIOD_DATA_MESSAGE = "Немає даних за останні {days} днів"
+PLACEHOLDER_PERIODS = (30, 90)
+
+# Текстовий попередній перегляд (без matplotlib)
+TEXT_SPARKLINE_WIDTH = 30
+TEXT_BALANCE_ROWS = 3
+TEXT_TOP_CATEGORIES = 5
 
-# Для підтримки кирилиці
-try:
-    font_path = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
-    prop = font_manager.FontProperties(fname=font_path)
-    plt.rcParams['font.family'] = prop.get_name()
-except:
-    logger.warning("Could not load DejaVu font, cyrillic may not display correctly")
+
+@dataclass
+class ChartImage:
+    """PNG графіка; placeholder – текст заглушки, якщо замість графіка вона"""
+    image: bytes
+    placeholder: Optional[str] = None
+
+
+class _PlaceholderBuffer(io.BytesIO):
+    """PNG заглушки разом з її текстом"""
+
+    def __init__(self, image: bytes, message: str):
+        super().__init__(image)
+        self.message = message
 
 
 class ChartService:
@@ -51,7 +86,7 @@ class ChartService:
             filtered = [t for t in transactions if float(t.get('amount', 0)) > 0]
         
         if not filtered:
-            return ChartService._create_no_data_chart("Немає даних для відображення")
+            return ChartService._create_no_data_chart(NO_DATA_MESSAGE)
         
         # Групуємо по категоріях
         category_totals = defaultdict(float)
@@ -75,117 +110,52 @@ class ChartService:
         labels = [cat for cat, _ in data]
         values = [val for _, val in data]
         
-        # Кольори
-        colors = sns.color_palette("husl", len(labels))
-        
-        # Створюємо графік
-        fig, ax = plt.subplots(figsize=(10, 8))
-        
-        wedges, texts, autotexts = ax.pie(
-            values,
-            labels=labels,
-            autopct='%1.1f%%',
-            colors=colors,
-            startangle=90,
-            textprops={'fontsize': 10}
-        )
-        
-        # Покращуємо читабельність
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(9)
-            autotext.set_weight('bold')
-        
         title = "Витрати по категоріях" if chart_type == "expense" else "Доходи по категоріях"
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        
-        plt.tight_layout()
-        
-        # Зберігаємо в буфер
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        plt.close(fig)
-        
-        return buffer
+        return io.BytesIO(_get_engine().render_pie(labels, values, title))
     
     @staticmethod
     def create_line_chart(transactions: List[Dict], period_days: int = 30) -> io.BytesIO:
         """Створює лінійний графік витрат та доходів за період"""
         
         if not transactions:
-            return ChartService._create_no_data_chart("Немає даних для відображення")
+            return ChartService._create_no_data_chart(NO_DATA_MESSAGE)
         
-        # Фільтруємо за період
-        cutoff_date = datetime.now() - timedelta(days=period_days)
-        filtered = []
+        # Фільтруємо за період (дати з таблиці – у UTC)
+        now = datetime.now(timezone.utc)
+        cutoff_date = now - timedelta(days=period_days)
+        day_numbers = []
+        amounts = []
         for t in transactions:
             parsed = parse_sheet_datetime(t.get('date'))
-            if not parsed:
-                continue
-            if parsed >= cutoff_date:
-                filtered.append((t, parsed))
-        
-        if not filtered:
-            return ChartService._create_no_data_chart(f"Немає даних за останні {period_days} днів")
-        
-        # Групуємо по датах
-        daily_expense = defaultdict(float)
-        daily_income = defaultdict(float)
-        
-        for t, parsed in filtered:
-            date = parsed.date()
-            amount = float(t.get('amount', 0))
-            
-            if amount < 0:
-                daily_expense[date] += abs(amount)
-            else:
-                daily_income[date] += amount
-        
-        # Створюємо повний діапазон дат
-        all_dates = []
-        current_date = cutoff_date.date()
-        end_date = datetime.now().date()
-        
-        while current_date <= end_date:
-            all_dates.append(current_date)
-            current_date += timedelta(days=1)
-        
-        expenses = [daily_expense.get(d, 0) for d in all_dates]
-        incomes = [daily_income.get(d, 0) for d in all_dates]
-        
-        # Створюємо графік
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        ax.plot(all_dates, expenses, marker='o', linewidth=2, 
-                label='Витрати', color='#e74c3c', markersize=4)
-        ax.plot(all_dates, incomes, marker='o', linewidth=2, 
-                label='Доходи', color='#27ae60', markersize=4)
-        
-        ax.set_xlabel('Дата', fontsize=12)
-        ax.set_ylabel('Сума (UAH)', fontsize=12)
-        ax.set_title(f'Динаміка фінансів за {period_days} днів', fontsize=14, fontweight='bold')
-        ax.legend(fontsize=11)
-        ax.grid(True, alpha=0.3)
-        
-        # Форматування дат на осі X
-        fig.autofmt_xdate()
-        
-        plt.tight_layout()
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        plt.close(fig)
-        
-        return buffer
+            if parsed and parsed >= cutoff_date:
+                day_numbers.append(parsed.date().toordinal())
+                amounts.append(float(t.get('amount', 0)))
+        
+        if not day_numbers:
+            return ChartService._create_no_data_chart(NO_PERIOD_DATA_MESSAGE.format(days=period_days))
+        
+        import numpy as np
+        
+        # Групуємо по днях повного діапазону дат одним проходом
+        start_date = cutoff_date.date()
+        days_count = now.date().toordinal() - start_date.toordinal() + 1
+        day_index = np.asarray(day_numbers) - start_date.toordinal()
+        values = np.asarray(amounts, dtype=float)
+        expenses = np.bincount(day_index, weights=np.where(values < 0, -values, 0.0),
+                               minlength=days_count)[:days_count]
+        incomes = np.bincount(day_index, weights=np.where(values > 0, values, 0.0),
+                              minlength=days_count)[:days_count]
+        all_dates = np.datetime64(start_date, 'D') + np.arange(days_count)
+        
+        title = f'Динаміка фінансів за {period_days} днів'
+        return io.BytesIO(_get_engine().render_line(all_dates, expenses, incomes, title))
     
     @staticmethod
     def create_bar_comparison(transactions: List[Dict], currency: str = "UAH") -> io.BytesIO:
         """Створює порівняльну діаграму доходів vs витрат по місяцях"""
         
         if not transactions:
-            return ChartService._create_no_data_chart("Немає даних для відображення")
+            return ChartService._create_no_data_chart(NO_DATA_MESSAGE)
         
         # Групуємо по місяцях
         monthly_data = defaultdict(lambda: {'income': 0, 'expense': 0})
@@ -206,105 +176,50 @@ class ChartService:
         sorted_months = sorted(monthly_data.keys())[-6:]
         
         if not sorted_months:
-            return ChartService._create_no_data_chart("Недостатньо даних")
+            return ChartService._create_no_data_chart(NOT_ENOUGH_DATA_MESSAGE)
         
         months_labels = [datetime.strptime(m, '%Y-%m').strftime('%B %Y') for m in sorted_months]
         incomes = [monthly_data[m]['income'] for m in sorted_months]
         expenses = [monthly_data[m]['expense'] for m in sorted_months]
         
-        # Створюємо графік
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        x = range(len(months_labels))
-        width = 0.35
-        
-        bars1 = ax.bar([i - width/2 for i in x], incomes, width, 
-                       label='Доходи', color='#27ae60', alpha=0.8)
-        bars2 = ax.bar([i + width/2 for i in x], expenses, width, 
-                       label='Витрати', color='#e74c3c', alpha=0.8)
-        
-        ax.set_xlabel('Місяць', fontsize=12)
-        ax.set_ylabel(f'Сума ({currency})', fontsize=12)
-        ax.set_title('Порівняння доходів та витрат', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels(months_labels, rotation=45, ha='right')
-        ax.legend(fontsize=11)
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Додаємо значення над стовпцями
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                if height > 0:
-                    ax.text(bar.get_x() + bar.get_width()/2., height,
-                           f'{height:,.0f}',
-                           ha='center', va='bottom', fontsize=8)
-        
-        plt.tight_layout()
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        plt.close(fig)
-        
-        return buffer
+        return io.BytesIO(
+            _get_engine().render_bar_comparison(months_labels, incomes, expenses, currency)
+        )
     
     @staticmethod
     def create_balance_history(transactions: List[Dict], currency: str = "UAH") -> io.BytesIO:
         """Створює графік історії балансу"""
         
         if not transactions:
-            return ChartService._create_no_data_chart("Немає даних для відображення")
+            return ChartService._create_no_data_chart(NO_DATA_MESSAGE)
         
-        # Сортуємо за датою
-        valid = []
+        stamps = []
+        balances = []
         for t in transactions:
             parsed = parse_sheet_datetime(t.get('date'))
             if parsed:
-                valid.append((t, parsed))
-        sorted_transactions = sorted(valid, key=lambda x: x[1])
-        
-        dates = []
-        balances = []
-        
-        for t, parsed in sorted_transactions:
-            date = parsed
-            balance = float(t.get('balance', 0))
-            dates.append(date)
-            balances.append(balance)
-        
-        # Створюємо графік
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        ax.plot(dates, balances, linewidth=2.5, color='#3498db', marker='')
-        ax.fill_between(dates, balances, alpha=0.3, color='#3498db')
+                stamps.append(parsed.timestamp())
+                balances.append(float(t.get('balance', 0)))
         
-        ax.set_xlabel('Дата', fontsize=12)
-        ax.set_ylabel(f'Баланс ({currency})', fontsize=12)
-        ax.set_title('Історія балансу', fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3)
+        if not stamps:
+            return ChartService._create_no_data_chart(NO_DATA_MESSAGE)
         
-        # Додаємо горизонтальну лінію на 0
-        ax.axhline(y=0, color='red', linestyle='--', linewidth=1, alpha=0.5)
+        import numpy as np
         
-        # Форматування дат
-        fig.autofmt_xdate()
+        # Сортуємо за датою; довгу історію проріджує шаблон під ширину графіка
+        stamps = np.asarray(stamps)
+        order = np.argsort(stamps, kind='stable')
+        dates = (stamps[order] * 1_000_000).astype(np.int64).astype('datetime64[us]')
+        balances = np.asarray(balances, dtype=float)[order]
         
-        plt.tight_layout()
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        plt.close(fig)
-        
-        return buffer
+        return io.BytesIO(_get_engine().render_balance(dates, balances, currency))
     
     @staticmethod
     def create_category_trend(transactions: List[Dict], category: str, period_days: int = 90) -> io.BytesIO:
         """Створює тренд витрат по конкретній категорії"""
         
         # Фільтруємо за категорією та періодом
-        cutoff_date = datetime.now() - timedelta(days=period_days)
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=period_days)
         filtered = []
         for t in transactions:
             if t.get('category') != category:
@@ -333,55 +248,223 @@ class ChartService:
         week_labels = [datetime.strptime(w, '%Y-%m-%d').strftime('%d.%m') for w in sorted_weeks]
         amounts = [weekly_data[w] for w in sorted_weeks]
         
-        # Створюємо графік
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        ax.bar(week_labels, amounts, color='#9b59b6', alpha=0.7)
-        
-        # Додаємо лінію тренду
-        if len(amounts) > 2:
-            z = np.polyfit(range(len(amounts)), amounts, 1)
-            p = np.poly1d(z)
-            ax.plot(week_labels, p(range(len(amounts))), "r--", 
-                   linewidth=2, label='Тренд', alpha=0.7)
-        
-        ax.set_xlabel('Тиждень', fontsize=12)
-        ax.set_ylabel('Сума (UAH)', fontsize=12)
-        ax.set_title(f'Витрати по категорії: {category}', fontsize=14, fontweight='bold')
-        ax.legend()
-        ax.grid(True, alpha=0.3, axis='y')
+        # Лінію тренду будує шаблон, якщо тижнів більше двох
+        title = f'Витрати по категорії: {category}'
+        return io.BytesIO(_get_engine().render_category_trend(week_labels, amounts, title))
+    
+    @staticmethod
+    def render(chart_type: str, transactions: List[Dict], currency: str = "UAH") -> ChartImage:
+        """Рендерить графік за типом (pie_expense, line_30, balance_history, ...) у PNG"""
+        if chart_type == "pie_expense":
+            buffer = ChartService.create_pie_chart(transactions, "expense")
+        elif chart_type == "pie_income":
+            buffer = ChartService.create_pie_chart(transactions, "income")
+        elif chart_type == "line_30":
+            buffer = ChartService.create_line_chart(transactions, 30)
+        elif chart_type == "line_90":
+            buffer = ChartService.create_line_chart(transactions, 90)
+        elif chart_type == "bar_comparison":
+            buffer = ChartService.create_bar_comparison(transactions, currency)
+        else:
+            buffer = ChartService.create_balance_history(transactions, currency)
+        placeholder = buffer.message if isinstance(buffer, _PlaceholderBuffer) else None
+        return ChartImage(image=buffer.getvalue(), placeholder=placeholder)
+    
+    @staticmethod
+    async def render_many(
+        chart_types: Sequence[str],
+        transactions: List[Dict],
+        currency: str = "UAH",
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> Dict[str, ChartImage]:
+        """
+        Рендерить кілька графіків паралельно у процесах-воркерах
+        (або в потоках, якщо воркери не запущені).
+        on_progress(готово, всього) викликається після кожного графіка.
+        """
+        async def run(chart_type: str):
+            image = await process_pool.run(_render_in_worker, chart_type, transactions, currency)
+            return chart_type, image
+        
+        results: Dict[str, ChartImage] = {}
+        for finished in asyncio.as_completed([run(chart_type) for chart_type in chart_types]):
+            chart_type, image = await finished
+            results[chart_type] = image
+            if on_progress:
+                await on_progress(len(results), len(chart_types))
+        return results
+    
+    @staticmethod
+    def create_text_preview(transactions: List[Dict], currency: str = "UAH",
+                            period_days: int = 30) -> str:
+        """Текстові міні-графіки (HTML): витрати по днях, частки категорій, баланс"""
         
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        if not transactions:
+            return ""
         
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=150)
-        buffer.seek(0)
-        plt.close(fig)
+        start_date = (datetime.now(timezone.utc) - timedelta(days=period_days - 1)).date()
+        start = start_date.toordinal()
+        daily = [0.0] * period_days
+        categories = defaultdict(float)
+        history = []
         
-        return buffer
+        for t in transactions:
+            parsed = parse_sheet_datetime(t.get('date'))
+            if not parsed:
+                continue
+            try:
+                amount = float(t.get('amount', 0) or 0)
+                if t.get('balance') not in ("", None):
+                    history.append((parsed, float(t['balance'])))
+            except (TypeError, ValueError):
+                continue
+            day = parsed.date().toordinal() - start
+            if amount < 0 and 0 <= day < period_days:
+                daily[day] -= amount
+                categories[t.get('category') or config.DEFAULT_CATEGORY] -= amount
+        
+        lines = [f"📈 <b>Тренди за {period_days} днів:</b>"]
+        
+        total = sum(daily)
+        if total > 0:
+            lines.append(f"Витрати по днях (макс. {format_currency(max(daily), currency)}):")
+            lines.append(f"<code>{block_sparkline(daily, TEXT_SPARKLINE_WIDTH)}</code>")
+            top = sorted(categories.items(), key=lambda item: item[1], reverse=True)
+            for category, amount in top[:TEXT_TOP_CATEGORIES]:
+                share = amount / total
+                lines.append(
+                    f"<code>{horizontal_bar(share)} {share * 100:3.0f}%</code> {html.escape(category)}"
+                )
+        
+        if len(history) >= 2:
+            history.sort(key=lambda item: item[0])
+            rows = braille_line([b for _, b in history], TEXT_SPARKLINE_WIDTH, TEXT_BALANCE_ROWS)
+            lines.append(
+                f"💳 Баланс: {format_currency(history[0][1], currency)} → "
+                f"{format_currency(history[-1][1], currency)}"
+            )
+            lines.append("<code>" + "\n".join(rows) + "</code>")
+        
+        return "\n".join(lines) if len(lines) > 1 else ""
+    
+    @staticmethod
+    def warm_up():
+        """Завантажує рушій, готує фігури та рендерить заглушки заздалегідь"""
+        _get_engine().prepare()
+        ChartService.prerender_placeholders()
+    
+    @staticmethod
+    def known_placeholder_messages() -> List[str]:
+        """Скінченний набір заглушок, які показують стандартні графіки"""
+        messages = [NO_DATA_MESSAGE, NOT_ENOUGH_DATA_MESSAGE]
+        messages.extend(NO_PERIOD_DATA_MESSAGE.format(days=days) for days in PLACEHOLDER_PERIODS)
+        return messages
+    
+    @staticmethod
+    def prerender_placeholders():
+        """Рендерить усі стандартні заглушки заздалегідь"""
+        for message in ChartService.known_placeholder_messages():
+            ChartService._placeholder_image(message)
+        logger.info("Chart placeholders pre-rendered: %s", len(_placeholder_images))
     
     @staticmethod
     def _create_no_data_chart(message: str) -> io.BytesIO:
+        """Повертає заглушку, коли немає даних (рендериться один раз)"""
+        return _PlaceholderBuffer(ChartService._placeholder_image(message), message)
+    
+    @staticmethod
+    def _placeholder_image(message: str) -> bytes:
+        image = _placeholder_images.get(message)
+        if image is None:
+            image = ChartService._render_no_data_chart(message)
+            _placeholder_images.set(message, image)
+        return image
+    
+    @staticmethod
+    def _render_no_data_chart(message: str) -> bytes:
         """Створює заглушку, коли немає даних"""
-        fig, ax = plt.subplots(figsize=(8, 6))
-        
-        ax.text(0.5, 0.5, message, 
-               horizontalalignment='center',
-               verticalalignment='center',
-               transform=ax.transAxes,
-               fontsize=16,
-               bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        ax.axis('off')
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
-        buffer.seek(0)
-        plt.close(fig)
-        
-        return buffer
+        return _get_engine().render_placeholder(message)
+
+
+# Готові заглушки: текст -> PNG. Заглушки з довільним текстом (назва категорії) обмежені LRU.
+_placeholder_images = LRUCache(max_items=64)
+
+
+@dataclass
+class RenderedChart:
+    """Відрендерений графік та його Telegram file_id (якщо вже відправлявся)"""
+    image: bytes
+    file_id: Optional[str] = None
+    placeholder: Optional[str] = None
+
+
+class ChartCache:
+    """
+    Кеш готових графіків за ключем (користувач, тип, період, версія даних).
+
+    PNG зберігаються в LRU з бюджетом пам'яті; витіснені записи переходять
+    на диск, якщо задано CHART_CACHE_DIR. Telegram file_id тримаються окремо –
+    повторний запит з тими самими даними відправляється без рендеру й upload.
+
+    Версія даних змінюється лише при записах бота, тож ручні правки таблиці
+    стають видні, коли ключ старіє – не пізніше ніж через ttl секунд.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = config.CHART_CACHE_MAX_BYTES,
+        disk_dir: Optional[str] = config.CHART_CACHE_DIR,
+        disk_max_bytes: int = config.CHART_CACHE_DISK_MAX_BYTES,
+        max_file_ids: int = config.CHART_FILE_ID_CACHE_SIZE,
+        ttl: int = config.CHART_CACHE_TTL_SECONDS,
+    ):
+        self.ttl = ttl
+        # Версії даних живуть у пам'яті процесу, тож ключі диска прив'язані до запуску
+        self._boot_token = uuid.uuid4().hex[:8]
+        self._disk = DiskCache(disk_dir, disk_max_bytes, suffix=".png") if disk_dir else None
+        self._images = LRUCache(max_bytes=max_bytes, on_evict=self._spill_to_disk)
+        self._file_ids = LRUCache(max_items=max_file_ids)
+        # Ключі, під якими лежить заглушка: її file_id спільний для всіх
+        self._placeholders = LRUCache(max_items=max_file_ids)
+
+    def make_key(self, nickname: str, chart_type: str, period: str, version: int) -> str:
+        return make_cache_key(
+            self._boot_token, nickname, chart_type, period, version, ttl_epoch(self.ttl)
+        )
+
+    def get(self, key: str) -> Optional[RenderedChart]:
+        file_id = self._file_ids.get(key)
+        image = self._images.get(key)
+        if image is None and self._disk is not None:
+            image = self._disk.get(key)
+            if image is not None:
+                self._images.set(key, image)
+        if image is None and file_id is None:
+            return None
+        return RenderedChart(image=image or b"", file_id=file_id, placeholder=self._placeholders.get(key))
+
+    def put(self, key: str, chart: ChartImage) -> RenderedChart:
+        self._images.set(key, chart.image)
+        if chart.placeholder:
+            self._placeholders.set(key, chart.placeholder)
+        return RenderedChart(image=chart.image, placeholder=chart.placeholder)
+
+    def remember_file_id(self, key: str, file_id: Optional[str]):
+        if file_id:
+            self._file_ids.set(key, file_id)
+
+    def forget_file_id(self, key: str):
+        self._file_ids.pop(key)
+
+    def placeholder_key(self, message: str) -> str:
+        """Ключ file_id заглушки – спільний для всіх користувачів"""
+        return make_cache_key("placeholder", message)
+
+    def _spill_to_disk(self, key: str, image: bytes):
+        if self._disk is not None:
+            self._disk.set(key, image)
 
 
 # Singleton
 chart_service = ChartService()
+chart_cache = ChartCache()
@@ -6,25 +6,52 @@
 """
 
 import asyncio
+import json
 import logging
+import os
 import time
-from typing import Dict, Optional
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
 
 import aiohttp
+import numpy as np
+
+from app.config.settings import config
+from app.utils.rate_table import RateTable
 
 logger = logging.getLogger(__name__)
 
 
 class ExchangeService:
-    """Отримує та кешує курси валют з ПриватБанку."""
+    """
+    Отримує та кешує курси валют з ПриватБанку.
+
+    Застарілі курси (старші за TTL) віддаються одразу, а оновлення йде у
+    фоні; чекати на мережу доводиться лише коли курсів немає взагалі.
+    Останні курси зберігаються на диск, тож після перезапуску вони доступні
+    ще до першого запиту до API. Запити йдуть через одну довготривалу сесію.
+    """
 
     PRIVAT_API_URL = "https://api.privatbank.ua/p24api/pubinfo?json&exchange&coursid=11"
+    PRIVAT_ARCHIVE_URL = "https://api.privatbank.ua/p24api/exchange_rates?json&date={date}"
+    REQUEST_TIMEOUT = 10
 
-    def __init__(self, ttl_seconds: int = 600):
+    def __init__(
+        self,
+        ttl_seconds: int = config.EXCHANGE_RATES_TTL_SECONDS,
+        cache_file: Optional[str] = config.EXCHANGE_RATES_FILE,
+    ):
         self._ttl = ttl_seconds
+        self._cache_file = Path(cache_file) if cache_file else None
         self._rates: Dict[str, float] = {}
+        # Час epoch, а не monotonic – переживає перезапуск разом з файлом
         self._last_fetch: float = 0.0
         self._lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._history: Optional[RateTable] = None
+        self._load_from_disk()
 
     async def convert_to_uah(self, amount: float, currency: str) -> Optional[float]:
         """Конвертує передану суму у гривні, використовуючи поточний курс."""
@@ -49,43 +76,196 @@ class ExchangeService:
         await self._ensure_rates()
         return self._rates.get(currency)
 
+    @property
+    def age(self) -> Optional[float]:
+        """Вік курсів у секундах (None – курсів ще немає)"""
+        if not self._rates:
+            return None
+        return max(0.0, time.time() - self._last_fetch)
+
     async def _ensure_rates(self):
-        now = time.time()
-        if self._rates and (now - self._last_fetch) < self._ttl:
+        if not self._rates:
+            await self.refresh(max_age=self._ttl)
             return
+        if self.age >= self._ttl and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self.refresh(max_age=self._ttl))
 
+    async def refresh(self, max_age: Optional[float] = None) -> bool:
+        """
+        Завантажує свіжі курси. Якщо max_age задано і курси молодші –
+        запит не виконується (кілька одночасних викликів роблять один запит).
+        """
         async with self._lock:
             # повторна перевірка, поки ми чекали на lock
-            now = time.time()
-            if self._rates and (now - self._last_fetch) < self._ttl:
-                return
+            if max_age is not None and self._rates and self.age < max_age:
+                return True
 
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(self.PRIVAT_API_URL, timeout=10) as resp:
-                        resp.raise_for_status()
-                        payload = await resp.json()
+                session = self._get_session()
+                async with session.get(self.PRIVAT_API_URL) as resp:
+                    resp.raise_for_status()
+                    payload = await resp.json(content_type=None)
             except Exception as exc:
                 logger.warning("Не вдалося отримати курс ПриватБанку: %s", exc)
-                return
+                return False
 
-            rates = {}
-            for item in payload:
-                code = (item.get("ccy") or "").upper()
-                if not code:
-                    continue
+            rates = self._parse_rates(payload)
+            if not rates:
+                return False
+
+            self._rates = rates
+            self._last_fetch = time.time()
+            logger.info("Курси ПриватБанку оновлено: %s", list(rates.keys()))
+            self._save_to_disk()
+            await self._record_history(date.today(), rates)
+            return True
+
+    @staticmethod
+    def _parse_rates(payload) -> Dict[str, float]:
+        rates = {}
+        for item in payload or []:
+            code = (item.get("ccy") or "").upper()
+            if not code:
+                continue
+            try:
+                rate = float(item.get("sale"))
+            except (TypeError, ValueError):
+                continue
+            if rate <= 0:
+                continue
+            rates[code] = rate
+        return rates
+
+    # ---------- Історія курсів ----------
+
+    @property
+    def history(self) -> RateTable:
+        if self._history is None:
+            self._history = RateTable(config.RATE_HISTORY_DB)
+        return self._history
+
+    def convert_many(
+        self,
+        amounts: Sequence[float],
+        currencies: Sequence[str],
+        dates: Sequence[Any],
+    ) -> np.ndarray:
+        """
+        Суми в гривнях за курсом на дату кожної операції, лише з локальної
+        історії (без мережі). NaN – курсу на цю дату немає.
+        """
+        return self.history.convert_many(amounts, currencies, dates)
+
+    async def fetch_archive(self, day: date) -> Dict[str, float]:
+        """Архівні курси продажу ПриватБанку за день"""
+        url = self.PRIVAT_ARCHIVE_URL.format(date=day.strftime("%d.%m.%Y"))
+        async with self._get_session().get(url) as resp:
+            resp.raise_for_status()
+            payload = await resp.json(content_type=None)
+
+        rates = {}
+        for item in (payload or {}).get("exchangeRate") or []:
+            code = (item.get("currency") or "").upper()
+            if not code or code == "UAH":
+                continue
+            # Комерційного курсу для частини валют немає – тоді курс НБУ
+            for field in ("saleRate", "saleRateNB"):
                 try:
-                    rate = float(item.get("sale"))
+                    rate = float(item.get(field))
                 except (TypeError, ValueError):
                     continue
-                if rate <= 0:
-                    continue
-                rates[code] = rate
+                if rate > 0:
+                    rates[code] = rate
+                    break
+        return rates
 
-            if rates:
-                self._rates = rates
-                self._last_fetch = time.time()
-                logger.info("Курси ПриватБанку оновлено: %s", list(rates.keys()))
+    async def backfill_history(self, start: date, end: date) -> int:
+        """
+        Завантажує архівні курси за дні з [start, end], яких ще немає в історії.
+        Повертає кількість доданих днів.
+        """
+        missing = self.history.missing_days(start, end)
+        if not missing:
+            return 0
+
+        slots = asyncio.Semaphore(config.RATE_HISTORY_FETCH_CONCURRENCY)
+
+        async def fetch(day: date):
+            async with slots:
+                try:
+                    return day, await self.fetch_archive(day)
+                except Exception as exc:
+                    logger.warning("Не вдалося отримати архівні курси за %s: %s", day, exc)
+                    return day, {}
+
+        results = await asyncio.gather(*(fetch(day) for day in missing))
+        rows = [
+            (currency, day, rate)
+            for day, rates in results
+            for currency, rate in rates.items()
+        ]
+        await asyncio.to_thread(self.history.upsert_many, rows)
+        filled = sum(1 for _, rates in results if rates)
+        logger.info("Історія курсів: додано %s з %s днів", filled, len(missing))
+        return filled
+
+    async def _record_history(self, day: date, rates: Dict[str, float]):
+        try:
+            await asyncio.to_thread(self.history.upsert, day, rates)
+        except Exception as exc:
+            logger.warning("Не вдалося записати курси в історію: %s", exc)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Сесія створюється всередині event loop і тримає з'єднання між запитами
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+            )
+        return self._session
+
+    async def close(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    # ---------- Диск ----------
+
+    def _load_from_disk(self):
+        if self._cache_file is None:
+            return
+        try:
+            data = json.loads(self._cache_file.read_text(encoding="utf-8"))
+            rates = {str(code).upper(): float(rate) for code, rate in data["rates"].items()}
+            fetched_at = float(data["fetched_at"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            logger.warning("Не вдалося прочитати збережені курси %s: %s", self._cache_file, exc)
+            return
+        if rates:
+            self._rates = rates
+            self._last_fetch = fetched_at
+            logger.info("Курси завантажено з диска (вік %.0f с)", self.age)
+
+    def _save_to_disk(self):
+        if self._cache_file is None:
+            return
+        tmp_path = self._cache_file.with_suffix(self._cache_file.suffix + ".tmp")
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(
+                json.dumps({"fetched_at": self._last_fetch, "rates": self._rates}),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, self._cache_file)
+        except OSError as exc:
+            logger.warning("Не вдалося зберегти курси на диск: %s", exc)
 
 
 # Singleton
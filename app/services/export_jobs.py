@@ -0,0 +1,114 @@
+# ============================================
+# FILE: app/services/export_jobs.py
+# ============================================
+"""
+Фонові задачі експорту: обмежена кількість одночасних задач,
+одна задача на користувача та кеш готових файлів
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config.settings import config
+from app.utils.cache import LRUCache, make_cache_key, ttl_epoch
+
+logger = logging.getLogger(__name__)
+
+
+class ExportJobManager:
+    """
+    Запускає задачі експорту у фоні.
+
+    Одночасно виконується не більше max_jobs задач, решта чекає в черзі;
+    користувач не може запустити другу задачу, поки не завершилась перша.
+    Готові файли кешуються за ключем (користувач, формат, версія даних, період),
+    а Telegram file_id дозволяє повторно надіслати файл без генерації й upload.
+    Ручні правки таблиці версію не змінюють – їх видно, щойно ключ застаріє
+    (не пізніше ніж через ttl секунд).
+    """
+
+    def __init__(
+        self,
+        max_jobs: int = config.EXPORT_MAX_CONCURRENT_JOBS,
+        max_cache_bytes: int = config.EXPORT_CACHE_MAX_BYTES,
+        max_file_ids: int = config.EXPORT_FILE_ID_CACHE_SIZE,
+        ttl: int = config.EXPORT_CACHE_TTL_SECONDS,
+    ):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiting = 0
+        # Версії даних живуть у пам'яті процесу, тож ключі прив'язані до запуску
+        self._boot_token = uuid.uuid4().hex[:8]
+        self._files = LRUCache(max_bytes=max_cache_bytes, sizeof=lambda item: len(item[0]))
+        self._file_ids = LRUCache(max_items=max_file_ids)
+
+    # ---------- Задачі ----------
+
+    def is_running(self, nickname: str) -> bool:
+        task = self._tasks.get(nickname)
+        return task is not None and not task.done()
+
+    def start(
+        self,
+        nickname: str,
+        job: Callable[[], Awaitable[None]],
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> bool:
+        """Запускає задачу у фоні; False, якщо в користувача вже є активна задача"""
+        if self.is_running(nickname):
+            return False
+        self._tasks[nickname] = asyncio.create_task(self._run(nickname, job, on_queued))
+        return True
+
+    async def _run(self, nickname, job, on_queued):
+        try:
+            if self._slots.locked():
+                self._waiting += 1
+                try:
+                    if on_queued:
+                        await on_queued(self._waiting)
+                    await self._slots.acquire()
+                finally:
+                    self._waiting -= 1
+            else:
+                await self._slots.acquire()
+            try:
+                await job()
+            finally:
+                self._slots.release()
+        except Exception as exc:
+            logger.error(f"Export job failed for {nickname}: {exc}", exc_info=True)
+        finally:
+            self._tasks.pop(nickname, None)
+
+    # ---------- Кеш файлів ----------
+
+    def make_key(self, nickname: str, format_type: str, version: int, scope: str = "all") -> str:
+        return make_cache_key(
+            self._boot_token, nickname, format_type, version, scope, ttl_epoch(self.ttl)
+        )
+
+    def get_file(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Повертає (вміст, назва файлу) з кешу"""
+        return self._files.get(key)
+
+    def put_file(self, key: str, data: bytes, filename: str):
+        self._files.set(key, (data, filename))
+
+    def get_file_id(self, key: str) -> Optional[str]:
+        return self._file_ids.get(key)
+
+    def remember_file_id(self, key: str, file_id: Optional[str]):
+        if file_id:
+            self._file_ids.set(key, file_id)
+
+    def forget_file_id(self, key: str):
+        self._file_ids.pop(key)
+
+
+# Singleton
+export_jobs = ExportJobManager()
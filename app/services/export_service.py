@@ -2,119 +2,410 @@
 Сервіс для експорту даних
 """
 
+import asyncio
+import csv
+import importlib.util
 import io
+import itertools
 import logging
+import tempfile
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Dict
-import pandas as pd
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from app.config.settings import config
+from app.utils.formatters import format_csv_number
+from app.utils.helpers import parse_sheet_datetime
+from app.utils.process_pool import process_pool
+
+# openpyxl, reportlab та pyarrow важкі, тому імпортуються всередині методів експорту
 
 logger = logging.getLogger(__name__)
 
+# Формат експорту -> розширення файлу
+EXPORT_EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx', 'pdf': 'pdf'}
+
+# pyarrow – необов'язкова залежність: без неї формат Parquet не пропонується
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+if PARQUET_AVAILABLE:
+    EXPORT_EXTENSIONS['parquet'] = 'parquet'
+else:
+    logger.warning("pyarrow not installed, Parquet export disabled")
+EXPORT_COLUMNS = ('date', 'amount', 'category', 'note', 'balance', 'currency')
+EXPORT_DATE_FORMAT = '%Y-%m-%d %H:%M'
+# Скільки рядків накопичуємо перед записом у файл
+EXPORT_CHUNK_ROWS = 1000
+EXCEL_HEADERS = ('Дата', 'Сума', 'Категорія', 'Опис', 'Баланс', 'Валюта')
+# Ширину колонок Excel оцінюємо за першими рядками, а не за всією історією
+EXCEL_WIDTH_SAMPLE_ROWS = 200
+EXCEL_MAX_COLUMN_WIDTH = 60
+# Parquet: рядків в одній групі (row group)
+PARQUET_BATCH_ROWS = 50_000
+# PDF: транзакції розбиваються на таблиці по PDF_TABLE_CHUNK_ROWS рядків
+PDF_TABLE_CHUNK_ROWS = 500
+PDF_NOTE_MAX_CHARS = 30
+PDF_TOP_CATEGORIES = 10
+PDF_SUMMARY_MONTHS = 12
+PDF_FONT_PATHS = {
+    'DejaVuSans': '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    'DejaVuSans-Bold': '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+}
+
+
+class ExportRow(NamedTuple):
+    """Типізований рядок експорту"""
+    date: Optional[datetime]
+    amount: Optional[float]
+    category: str
+    note: str
+    balance: Optional[float]
+    currency: str
+
+
+def _to_float(value) -> Optional[float]:
+    if value in ("", None):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    # get_all_transactions уже віддає ISO без часового поясу – швидкий шлях
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = None
+        if parsed is not None and parsed.tzinfo is None:
+            return parsed
+    parsed = parse_sheet_datetime(value)
+    return parsed.replace(tzinfo=None) if parsed else None
+
+
+def iter_export_rows(transactions: Iterable[Dict]) -> Iterator[ExportRow]:
+    """Перетворює транзакції з таблиці на типізовані рядки експорту по одному"""
+    for t in transactions:
+        yield ExportRow(
+            date=_to_datetime(t.get('date')),
+            amount=_to_float(t.get('amount')),
+            category=_to_text(t.get('category')),
+            note=_to_text(t.get('note')),
+            balance=_to_float(t.get('balance')),
+            currency=_to_text(t.get('currency')),
+        )
+
+
+def _csv_cells(row: ExportRow) -> tuple:
+    return (
+        row.date.strftime(EXPORT_DATE_FORMAT) if row.date else "",
+        format_csv_number(row.amount),
+        row.category,
+        row.note,
+        format_csv_number(row.balance),
+        row.currency,
+    )
+
+
+def _excel_cells(row: ExportRow) -> tuple:
+    return (
+        row.date.strftime(EXPORT_DATE_FORMAT) if row.date else None,
+        row.amount,
+        row.category,
+        row.note,
+        row.balance,
+        row.currency,
+    )
+
+
+def _column_widths(headers, rows: List[tuple]) -> List[int]:
+    """Ширина колонок за заголовками та вибіркою рядків"""
+    widths = [len(header) for header in headers]
+    for cells in rows:
+        for idx, value in enumerate(cells):
+            if value is not None:
+                widths[idx] = max(widths[idx], len(str(value)))
+    return [min(width + 2, EXCEL_MAX_COLUMN_WIDTH) for width in widths]
+
+
+def _pdf_fonts() -> Tuple[str, str]:
+    """Реєструє шрифт з кирилицею; якщо його немає – стандартний Helvetica"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    
+    try:
+        registered = pdfmetrics.getRegisteredFontNames()
+        for name, path in PDF_FONT_PATHS.items():
+            if name not in registered:
+                pdfmetrics.registerFont(TTFont(name, path))
+        return 'DejaVuSans', 'DejaVuSans-Bold'
+    except Exception as exc:
+        logger.warning(f"DejaVu fonts unavailable, cyrillic may not display in PDF: {exc}")
+        return 'Helvetica', 'Helvetica-Bold'
+
+
+def build_pdf_report(transactions: List[Dict], nickname: str, balance: float, currency: str) -> bytes:
+    """
+    Будує PDF-звіт: сторінка підсумків з агрегатів і таблиці транзакцій
+    по PDF_TABLE_CHUNK_ROWS рядків із заголовком на кожній сторінці.
+    Виконується у процесі-воркері, тому повертає байти.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    
+    font, bold_font = _pdf_fonts()
+    styles = getSampleStyleSheet()
+    for style_name in ('Title', 'Heading2', 'Normal'):
+        styles[style_name].fontName = bold_font if style_name != 'Normal' else font
+    
+    table_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), font),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    header = ['Дата', 'Сума', 'Категорія', 'Опис']
+    
+    # Один прохід: таблиці транзакцій пачками + агрегати для підсумку
+    tables = []
+    chunk = [header]
+    count = 0
+    income = expense = 0.0
+    first_date = last_date = None
+    by_category = defaultdict(float)
+    by_month = defaultdict(lambda: [0.0, 0.0])
+    
+    for row in iter_export_rows(transactions):
+        amount = row.amount or 0.0
+        count += 1
+        if amount >= 0:
+            income += amount
+        else:
+            expense -= amount
+            by_category[row.category or config.DEFAULT_CATEGORY] -= amount
+        if row.date:
+            first_date = row.date if first_date is None else min(first_date, row.date)
+            last_date = row.date if last_date is None else max(last_date, row.date)
+            by_month[row.date.strftime('%Y-%m')][0 if amount >= 0 else 1] += abs(amount)
+        
+        note = row.note[:PDF_NOTE_MAX_CHARS] + '...' if len(row.note) > PDF_NOTE_MAX_CHARS else row.note
+        chunk.append([
+            row.date.strftime(EXPORT_DATE_FORMAT) if row.date else '',
+            '' if row.amount is None else f"{row.amount:.2f}",
+            row.category,
+            note,
+        ])
+        if len(chunk) > PDF_TABLE_CHUNK_ROWS:
+            tables.append(chunk)
+            chunk = [header]
+    if len(chunk) > 1:
+        tables.append(chunk)
+    
+    elements = [
+        Paragraph(f"<b>Фінансовий звіт: {nickname}</b>", styles['Title']),
+        Spacer(1, 12),
+        Paragraph(
+            f"<b>Поточний баланс:</b> {balance:.2f} {currency}<br/>"
+            f"<b>Дата звіту:</b> {datetime.now().strftime(EXPORT_DATE_FORMAT)}",
+            styles['Normal']
+        ),
+        Spacer(1, 20),
+        Paragraph("Підсумок", styles['Heading2']),
+    ]
+    period = (
+        f"{first_date.strftime('%Y-%m-%d')} – {last_date.strftime('%Y-%m-%d')}"
+        if first_date else "—"
+    )
+    elements.append(Paragraph(
+        f"<b>Період:</b> {period}<br/>"
+        f"<b>Транзакцій:</b> {count}<br/>"
+        f"<b>Доходи:</b> {income:.2f} {currency}<br/>"
+        f"<b>Витрати:</b> {expense:.2f} {currency}<br/>"
+        f"<b>Різниця:</b> {income - expense:.2f} {currency}",
+        styles['Normal']
+    ))
+    
+    if by_category:
+        top = sorted(by_category.items(), key=lambda item: item[1], reverse=True)[:PDF_TOP_CATEGORIES]
+        data = [['Категорія', 'Витрати', 'Частка']] + [
+            [category, f"{amount:.2f}", f"{amount / expense * 100:.1f}%"] for category, amount in top
+        ]
+        elements += [Spacer(1, 16), Paragraph("Витрати по категоріях", styles['Heading2']),
+                     Table(data, colWidths=[200, 100, 80], style=table_style)]
+    
+    if by_month:
+        months = sorted(by_month)[-PDF_SUMMARY_MONTHS:]
+        data = [['Місяць', 'Доходи', 'Витрати']] + [
+            [month, f"{by_month[month][0]:.2f}", f"{by_month[month][1]:.2f}"] for month in months
+        ]
+        elements += [Spacer(1, 16), Paragraph("По місяцях", styles['Heading2']),
+                     Table(data, colWidths=[120, 100, 100], style=table_style)]
+    
+    if tables:
+        elements += [PageBreak(), Paragraph("Транзакції", styles['Heading2'])]
+        # Невеликі таблиці верстаються швидко; заголовок повторюється на кожній сторінці
+        for data in tables:
+            elements.append(Table(data, colWidths=[120, 70, 100, 200], repeatRows=1, style=table_style))
+    
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(elements)
+    logger.info(f"Exported {count} transactions to PDF")
+    return buffer.getvalue()
+
 
 class ExportService:
     """Сервіс для експорту даних у різні формати"""
     
     @staticmethod
-    def export_to_csv(transactions: List[Dict]) -> io.BytesIO:
-        """Експортує транзакції в CSV"""
-        df = pd.DataFrame(transactions)
+    def warm_up():
+        """Попередньо імпортує бібліотеки експорту"""
+        import openpyxl  # noqa: F401
+        import reportlab.platypus  # noqa: F401
+        if PARQUET_AVAILABLE:
+            import pyarrow.parquet  # noqa: F401
+    
+    @staticmethod
+    async def build(format_type: str, transactions: List[Dict], nickname: str,
+                    balance: float, currency: str) -> IO[bytes]:
+        """Формує файл потрібного формату поза event loop"""
+        if format_type == 'csv':
+            return await asyncio.to_thread(ExportService.export_to_csv, transactions)
+        if format_type == 'excel':
+            return await asyncio.to_thread(ExportService.export_to_excel, transactions)
+        if format_type == 'pdf':
+            return await ExportService.export_to_pdf_async(transactions, nickname, balance, currency)
+        if format_type == 'parquet':
+            return await asyncio.to_thread(ExportService.export_to_parquet, transactions)
+        raise ValueError(f"Unknown export format: {format_type}")
+    
+    @staticmethod
+    def export_to_csv(transactions: Iterable[Dict]) -> IO[bytes]:
+        """
+        Експортує транзакції в CSV (utf-8-sig, ті самі колонки).
+
+        Рядки пишуться пачками по EXPORT_CHUNK_ROWS у SpooledTemporaryFile:
+        невеликий файл лишається в пам'яті, великий – переходить на диск.
+        Повертає файл, перемотаний на початок; закриває його викликач.
+        """
+        output = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_BYTES)
+        output.write(b'\xef\xbb\xbf')  # BOM, як у utf-8-sig
         
-        # Очищаємо та форматуємо дані
-        if not df.empty:
-            df = df[['date', 'amount', 'category', 'note', 'balance', 'currency']]
-            df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d %H:%M')
+        chunk = io.StringIO()
+        writer = csv.writer(chunk, lineterminator='\n')
+        writer.writerow(EXPORT_COLUMNS)
         
-        buffer = io.BytesIO()
-        df.to_csv(buffer, index=False, encoding='utf-8-sig')
-        buffer.seek(0)
+        count = 0
+        for row in iter_export_rows(transactions):
+            writer.writerow(_csv_cells(row))
+            count += 1
+            if count % EXPORT_CHUNK_ROWS == 0:
+                output.write(chunk.getvalue().encode('utf-8'))
+                chunk.seek(0)
+                chunk.truncate()
+        output.write(chunk.getvalue().encode('utf-8'))
+        output.seek(0)
         
-        logger.info(f"Exported {len(transactions)} transactions to CSV")
-        return buffer
+        logger.info(f"Exported {count} transactions to CSV")
+        return output
     
     @staticmethod
-    def export_to_excel(transactions: List[Dict]) -> io.BytesIO:
-        """Експортує транзакції в Excel"""
-        df = pd.DataFrame(transactions)
+    def export_to_excel(transactions: Iterable[Dict]) -> IO[bytes]:
+        """
+        Експортує транзакції в Excel через write-only книгу openpyxl.
+
+        Рядки пишуться одразу з ітератора; ширина колонок оцінюється за
+        першими EXCEL_WIDTH_SAMPLE_ROWS рядками. Повертає перемотаний файл.
+        """
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
         
-        if not df.empty:
-            df = df[['date', 'amount', 'category', 'note', 'balance', 'currency']]
-            df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d %H:%M')
-            
-            # Перейменовуємо колонки українською
-            df.columns = ['Дата', 'Сума', 'Категорія', 'Опис', 'Баланс', 'Валюта']
+        rows = (_excel_cells(row) for row in iter_export_rows(transactions))
+        sample = list(itertools.islice(rows, EXCEL_WIDTH_SAMPLE_ROWS))
         
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Транзакції', index=False)
-            
-            # Автоматична ширина колонок
-            worksheet = writer.sheets['Транзакції']
-            for idx, col in enumerate(df.columns):
-                max_length = max(df[col].astype(str).map(len).max(), len(col)) + 2
-                worksheet.column_dimensions[chr(65 + idx)].width = max_length
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Транзакції')
+        # У write-only режимі ширини задаються до першого рядка
+        for idx, width in enumerate(_column_widths(EXCEL_HEADERS, sample), start=1):
+            worksheet.column_dimensions[get_column_letter(idx)].width = width
         
-        buffer.seek(0)
-        logger.info(f"Exported {len(transactions)} transactions to Excel")
-        return buffer
-    
-    @staticmethod
-    def export_to_pdf(transactions: List[Dict], nickname: str, balance: float, currency: str) -> io.BytesIO:
-        """Експортує транзакції в PDF з красивим форматуванням"""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        elements = []
-        styles = getSampleStyleSheet()
+        worksheet.append(EXCEL_HEADERS)
+        count = 0
+        for cells in itertools.chain(sample, rows):
+            worksheet.append(cells)
+            count += 1
         
-        # Заголовок
-        title = Paragraph(f"<b>Фінансовий звіт: {nickname}</b>", styles['Title'])
-        elements.append(title)
-        elements.append(Spacer(1, 12))
+        output = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_BYTES)
+        workbook.save(output)
+        output.seek(0)
         
-        # Інфо про баланс
-        balance_text = Paragraph(
-            f"<b>Поточний баланс:</b> {balance:.2f} {currency}<br/>"
-            f"<b>Дата звіту:</b> {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-            styles['Normal']
-        )
-        elements.append(balance_text)
-        elements.append(Spacer(1, 20))
+        logger.info(f"Exported {count} transactions to Excel")
+        return output
+    
+    @staticmethod
+    def export_to_parquet(transactions: Iterable[Dict]) -> IO[bytes]:
+        """
+        Експортує транзакції в Parquet з типізованою схемою.
+
+        Колонки збираються напряму з рядків експорту (без pandas) пачками по
+        PARQUET_BATCH_ROWS; категорія та валюта кодуються словником.
+        Повертає перемотаний файл.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
         
-        # Таблиця транзакцій
-        if transactions:
-            data = [['Дата', 'Сума', 'Категорія', 'Опис']]
-            
-            for t in transactions:
-                date = datetime.fromisoformat(t['date']).strftime('%Y-%m-%d %H:%M')
-                amount = f"{t['amount']:.2f}"
-                category = t['category']
-                note = t['note'][:30] + '...' if len(t['note']) > 30 else t['note']
-                data.append([date, amount, category, note])
-            
-            table = Table(data, colWidths=[120, 70, 100, 200])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(table)
+        category_type = pa.dictionary(pa.int32(), pa.string())
+        schema = pa.schema([
+            ('date', pa.timestamp('ms')),
+            ('amount', pa.float64()),
+            ('category', category_type),
+            ('note', pa.string()),
+            ('balance', pa.float64()),
+            ('currency', category_type),
+        ])
         
-        doc.build(elements)
-        buffer.seek(0)
+        output = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_BYTES)
+        rows = iter_export_rows(transactions)
+        count = 0
+        with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+            while batch := list(itertools.islice(rows, PARQUET_BATCH_ROWS)):
+                dates, amounts, categories, notes, balances, currencies = zip(*batch)
+                writer.write_table(pa.Table.from_arrays([
+                    pa.array(dates, type=pa.timestamp('ms')),
+                    pa.array(amounts, type=pa.float64()),
+                    pa.array(categories, type=pa.string()).dictionary_encode(),
+                    pa.array(notes, type=pa.string()),
+                    pa.array(balances, type=pa.float64()),
+                    pa.array(currencies, type=pa.string()).dictionary_encode(),
+                ], schema=schema))
+                count += len(batch)
+        output.seek(0)
         
-        logger.info(f"Exported {len(transactions)} transactions to PDF")
-        return buffer
+        logger.info(f"Exported {count} transactions to Parquet")
+        return output
+    
+    @staticmethod
+    def export_to_pdf(transactions: List[Dict], nickname: str, balance: float, currency: str) -> io.BytesIO:
+        """Експортує транзакції в PDF у поточному потоці"""
+        return io.BytesIO(build_pdf_report(transactions, nickname, balance, currency))
+    
+    @staticmethod
+    async def export_to_pdf_async(transactions: List[Dict], nickname: str,
+                                  balance: float, currency: str) -> io.BytesIO:
+        """Експортує транзакції в PDF у процесі-воркері, не блокуючи event loop"""
+        pdf = await process_pool.run(build_pdf_report, transactions, nickname, balance, currency)
+        return io.BytesIO(pdf)
 
 
 # Singleton
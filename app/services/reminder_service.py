@@ -0,0 +1,129 @@
+# ============================================
+# FILE: app/services/reminder_service.py
+# ============================================
+"""
+Нагадування за індивідуальним розкладом користувачів
+"""
+
+import asyncio
+import logging
+import time as clock
+from datetime import datetime, time
+from typing import Optional
+
+import pytz
+from aiogram import Bot
+
+from app.config.settings import config
+from app.services.broadcast_service import broadcast_service
+from app.services.sheets_service import sheets_service
+from app.utils.reminder_schedule import REMINDER_TZ, ReminderQueue, ReminderSchedule
+
+logger = logging.getLogger(__name__)
+
+REMINDER_TEXT = (
+    "🔔 <b>Нагадування</b>\n\n"
+    "Не забудь записати сьогоднішні витрати та доходи!"
+)
+
+
+class ReminderService:
+    """
+    Тримає розклади з reminder_settings у ReminderQueue і щохвилини
+    надсилає нагадування тим, чий час настав.
+
+    Таблиця перечитується раз на REMINDER_RELOAD_SECONDS; зміни з бота
+    потрапляють у чергу одразу. Хто вже записав транзакцію сьогодні
+    (за індексом активності), нагадування не отримує.
+    """
+
+    def __init__(
+        self,
+        spread_minutes: int = config.REMINDER_SPREAD_MINUTES,
+        reload_seconds: int = config.REMINDER_RELOAD_SECONDS,
+    ):
+        self.spread_minutes = spread_minutes
+        self.reload_seconds = reload_seconds
+        self.default_times = tuple(
+            sorted(time(item["hour"], item["minute"]) for item in config.REMINDER_TIMES)
+        )
+        self._queue = ReminderQueue(spread_minutes)
+        self._loaded_at: Optional[float] = None
+        # Момент останнього pop_due: спрацювання після нього ще не надіслані
+        self._last_dispatch: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    def default_schedule(self) -> ReminderSchedule:
+        return ReminderSchedule(times=self.default_times)
+
+    async def load(self, now: Optional[datetime] = None):
+        """Синхронізує чергу з reminder_settings, не втрачаючи спрацювань, що вже настали"""
+        now = now or datetime.now(pytz.UTC)
+        rows = await asyncio.to_thread(sheets_service.get_reminder_schedules)
+        self._queue.reload(
+            {
+                user_id: ReminderSchedule.from_settings(times_text, weekdays_text, self.default_times)
+                for user_id, times_text, weekdays_text in rows
+            },
+            since=self._last_dispatch or now,
+        )
+        self._loaded_at = clock.monotonic()
+        logger.info("Loaded reminder schedules for %s users", len(self._queue))
+
+    async def _ensure_loaded(self):
+        if self._loaded_at is None or clock.monotonic() - self._loaded_at >= self.reload_seconds:
+            await self.load()
+
+    async def dispatch_due(self, bot: Bot, now: Optional[datetime] = None) -> int:
+        """Надсилає нагадування, чий час настав; повертає кількість надісланих"""
+        async with self._lock:
+            now = now or datetime.now(pytz.UTC)
+            await self._ensure_loaded()
+            due = self._queue.pop_due(now)
+            self._last_dispatch = now
+        if not due:
+            return 0
+
+        today = now.astimezone(REMINDER_TZ).date()
+        active = await asyncio.to_thread(sheets_service.activity_index.active_since, today, due)
+        recipients = [user_id for user_id in due if user_id not in active]
+        if active:
+            logger.info("Skipping reminders for %s users active today", len(active))
+        if not recipients:
+            return 0
+
+        stats = await broadcast_service.send(
+            bot, ((user_id, REMINDER_TEXT) for user_id in recipients), name="reminder"
+        )
+        # Заблокованих broadcast_service уже прибрав з таблиці
+        for user_id in stats.blocked_ids:
+            self._queue.remove(user_id)
+        return stats.sent
+
+    # ---------- Зміни з бота ----------
+
+    async def get_schedule(self, user_id: int) -> Optional[ReminderSchedule]:
+        """Розклад користувача або None, якщо нагадування вимкнені"""
+        await self._ensure_loaded()
+        return self._queue.get(user_id)
+
+    async def enable(self, user_id: int):
+        await asyncio.to_thread(sheets_service.add_reminder_user, user_id)
+        await self._ensure_loaded()
+        if user_id not in self._queue:
+            self._queue.schedule(user_id, self.default_schedule(), datetime.now(pytz.UTC))
+
+    async def disable(self, user_id: int):
+        await asyncio.to_thread(sheets_service.remove_reminder_user, user_id)
+        await self._ensure_loaded()
+        self._queue.remove(user_id)
+
+    async def set_schedule(self, user_id: int, schedule: ReminderSchedule):
+        times, weekdays = schedule.settings_row()
+        await asyncio.to_thread(sheets_service.set_reminder_schedule, user_id, times, weekdays)
+        await self._ensure_loaded()
+        self._queue.schedule(user_id, schedule, datetime.now(pytz.UTC))
+
+
+# Singleton
+reminder_service = ReminderService()
@@ -7,15 +7,18 @@
 
 import logging
 import re
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Any
+from datetime import date, datetime
+from typing import List, Dict, Iterable, Optional, Tuple, Any
 import gspread
 from gspread.exceptions import WorksheetNotFound, APIError
 from gspread.utils import rowcol_to_a1
 import json
 
 from app.config.settings import config
-from app.utils.helpers import parse_sheet_datetime
+from app.utils.helpers import locate_date_range, parse_sheet_datetime
+from app.utils.activity_index import ActivityIndex
+from app.utils.reminder_schedule import REMINDER_TZ
+from app.utils.subscription_index import SubscriptionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +40,8 @@ class SheetsService:
     TRANSACTION_RECORD_TYPE = 'transaction'
     GOAL_RECORD_TYPE = 'goal'
     DEFAULT_GOAL_DEADLINE = "Без дедлайну"
+    # Порожні times/weekdays – типовий розклад (config.REMINDER_TIMES, щодня)
+    REMINDER_COLUMNS = ["user_id", "status", "times", "weekdays"]
     
     def __init__(self):
         try:
@@ -55,6 +60,69 @@ class SheetsService:
             logger.error(f"Failed to connect to Google Sheets: {e}")
             logger.error("Ensure GOOGLE_SERVICE_ACCOUNT_JSON and SPREADSHEET_ID are correctly set.")
             raise
+        
+        # Лічильники версій даних користувачів (для кешів графіків, експорту тощо)
+        self._data_versions: Dict[str, int] = {}
+        self._subscription_index: Optional[SubscriptionIndex] = None
+        self._activity_index: Optional[ActivityIndex] = None
+    
+    # ---------- Індекс дат списання підписок ----------
+    
+    @property
+    def subscription_index(self) -> SubscriptionIndex:
+        if self._subscription_index is None:
+            self._subscription_index = SubscriptionIndex(config.SUBSCRIPTION_INDEX_DB)
+        return self._subscription_index
+    
+    def _update_index(self, action: str, *args):
+        # Індекс – лише підказка для планувальника, його збій не ламає запис у таблицю
+        try:
+            getattr(self.subscription_index, action)(*args)
+        except Exception as e:
+            logger.warning(f"Subscription index {action} failed: {e}")
+    
+    @property
+    def activity_index(self) -> ActivityIndex:
+        if self._activity_index is None:
+            self._activity_index = ActivityIndex(config.ACTIVITY_INDEX_DB)
+        return self._activity_index
+    
+    def _touch_activity(self, user_id: int):
+        try:
+            self.activity_index.touch(int(user_id), datetime.now(REMINDER_TZ).date())
+        except Exception as e:
+            logger.warning(f"Activity index update failed: {e}")
+    
+    @staticmethod
+    def _due_date(value: Any) -> Optional[date]:
+        parsed = parse_sheet_datetime(value)
+        return parsed.date() if parsed else None
+    
+    def _index_field_updates(self, nickname: str, row_index: int, values: Dict[str, Any]):
+        if 'Is_Subscription' in values and str(values['Is_Subscription']).upper() != 'TRUE':
+            self._update_index('remove', nickname, row_index)
+        elif 'subscription_due_date' in values:
+            due = self._due_date(values['subscription_due_date'])
+            if due:
+                self._update_index('upsert', nickname, row_index, due)
+            else:
+                self._update_index('remove', nickname, row_index)
+    
+    def index_subscriptions(self, nickname: str, subscriptions: List[Dict]):
+        """Оновлює індекс аркуша за щойно прочитаними підписками"""
+        entries = []
+        for sub in subscriptions:
+            due = self._due_date(sub.get('subscription_due_date') or sub.get('date'))
+            if due and sub.get('_row'):
+                entries.append((sub['_row'], due))
+        self._update_index('replace_sheet', nickname, entries)
+    
+    def get_data_version(self, nickname: str) -> int:
+        """Повертає поточну версію даних аркуша користувача"""
+        return self._data_versions.get(nickname, 0)
+    
+    def _bump_data_version(self, nickname: str):
+        self._data_versions[nickname] = self._data_versions.get(nickname, 0) + 1
     
     def _ensure_required_columns(self, ws) -> List[str]:
         headers = ws.row_values(1)
@@ -119,18 +187,22 @@ class SheetsService:
             if column_name in headers:
                 updates.append((row_index, column_name, column_value))
         self._batch_update_cells(ws, headers, updates)
+        self._bump_data_version(nickname)
+        self._index_field_updates(nickname, row_index, values)
         if recalculate or 'amount' in values:
             self.recalculate_balances(nickname, legacy_titles)
     
     def _get_goal_rows(self, ws, headers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         headers = headers or self._ensure_required_columns(ws)
         all_values = ws.get_all_values(value_render_option='UNFORMATTED_VALUE')
+        return self._goal_rows_from_values(all_values)
+    
+    def _goal_rows_from_values(self, all_values: List[List[Any]]) -> List[Dict[str, Any]]:
+        """Вибирає рядки цілей з уже завантажених значень аркуша"""
         if len(all_values) < 2:
             return []
         
-        sheet_headers = all_values[0]
-        if sheet_headers != headers:
-            headers = sheet_headers
+        headers = all_values[0]
         try:
             record_type_idx = headers.index('record_type')
         except ValueError:
@@ -218,6 +290,7 @@ class SheetsService:
                         ws.update_title(nickname)
                         self._ensure_required_columns(ws)
                         logger.info(f"Renamed worksheet '{legacy}' -> '{nickname}'")
+                        self._update_index('rename_sheet', legacy, nickname)
                         return ws
                     except WorksheetNotFound:
                         continue
@@ -284,12 +357,19 @@ class SheetsService:
             'subscription_original_currency': subscription_original_currency or ""
         })
         ws.append_row(row)
+        self._bump_data_version(nickname)
         
         try:
             row_count = len(ws.get_all_values())
         except Exception:
             row_count = len(ws.col_values(1))
         
+        if is_subscription:
+            due = self._due_date(subscription_due_date)
+            if due:
+                self._update_index('upsert', nickname, row_count, due)
+        self._touch_activity(user_id)
+        
         logger.info(f"✅ Added transaction for {nickname}: {amount} {currency}")
         return row_count
 
@@ -362,6 +442,7 @@ class SheetsService:
             updates.append((row_idx, 'balance', running_balance))
         
         self._batch_update_cells(ws, headers, updates)
+        self._bump_data_version(nickname)
     
     def update_balance(self, nickname: str, new_balance: float, currency: str, legacy_titles: Optional[List[str]] = None):
         """Оновлює баланс користувача"""
@@ -402,8 +483,38 @@ class SheetsService:
             (target_row, 'currency', currency)
         ]
         self._batch_update_cells(ws, headers, updates)
+        self._bump_data_version(nickname)
         logger.info(f"✅ Updated balance for {nickname}: {new_balance} {currency}")
     
+    def _rows_to_transactions(self, headers: List[str], rows: List[List[Any]], first_row: int) -> List[Dict]:
+        """Конвертує рядки аркуша в словники транзакцій (рядки цілей пропускаються)"""
+        column_map = self._header_index_map(headers)
+        record_type_idx = column_map.get('record_type', 0) - 1 if column_map.get('record_type') else None
+        
+        transactions = []
+        for row_idx, row in enumerate(rows, start=first_row):
+            if record_type_idx is not None and record_type_idx >= 0:
+                row_type = ''
+                if record_type_idx < len(row):
+                    row_type = str(row[record_type_idx]).strip().lower()
+                if row_type and row_type != self.TRANSACTION_RECORD_TYPE:
+                    continue
+            transaction = {}
+            for col_idx, header in enumerate(headers):
+                if col_idx < len(row):
+                    transaction[header] = row[col_idx]
+                else:
+                    transaction[header] = None
+            transaction['_row'] = row_idx
+            normalized_date = parse_sheet_datetime(transaction.get('date'))
+            if normalized_date:
+                transaction['date'] = normalized_date.replace(tzinfo=None).isoformat()
+            due_date = parse_sheet_datetime(transaction.get('subscription_due_date'))
+            if due_date:
+                transaction['subscription_due_date'] = due_date.replace(tzinfo=None).isoformat()
+            transactions.append(transaction)
+        return transactions
+    
     def get_all_transactions(self, nickname: str, legacy_titles: Optional[List[str]] = None) -> List[Dict]:
         """Отримує всі транзакції користувача"""
         ws = self.get_or_create_worksheet(nickname, legacy_titles)
@@ -416,34 +527,7 @@ class SheetsService:
                 logger.warning(f"No transactions for {nickname}")
                 return []
             
-            headers = all_values[0]
-            rows = all_values[1:]
-            column_map = self._header_index_map(headers)
-            record_type_idx = column_map.get('record_type', 0) - 1 if column_map.get('record_type') else None
-            
-            # Конвертуємо в список словників
-            transactions = []
-            for row_idx, row in enumerate(rows, start=2):
-                if record_type_idx is not None and record_type_idx >= 0:
-                    row_type = ''
-                    if record_type_idx < len(row):
-                        row_type = str(row[record_type_idx]).strip().lower()
-                    if row_type and row_type != self.TRANSACTION_RECORD_TYPE:
-                        continue
-                transaction = {}
-                for col_idx, header in enumerate(headers):
-                    if col_idx < len(row):
-                        transaction[header] = row[col_idx]
-                    else:
-                        transaction[header] = None
-                transaction['_row'] = row_idx
-                normalized_date = parse_sheet_datetime(transaction.get('date'))
-                if normalized_date:
-                    transaction['date'] = normalized_date.replace(tzinfo=None).isoformat()
-                due_date = parse_sheet_datetime(transaction.get('subscription_due_date'))
-                if due_date:
-                    transaction['subscription_due_date'] = due_date.replace(tzinfo=None).isoformat()
-                transactions.append(transaction)
+            transactions = self._rows_to_transactions(all_values[0], all_values[1:], first_row=2)
             
             logger.info(f"✅ Loaded {len(transactions)} transactions for {nickname}")
             
@@ -468,10 +552,174 @@ class SheetsService:
                 transactions.append(record)
             return transactions
     
+    def get_transactions_in_range(
+        self,
+        nickname: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        legacy_titles: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Отримує транзакції з датою в [start, end] (наївні дати, як у get_all_transactions).
+        
+        Спершу читається лише стовпчик дат, за ним визначаються межі діапазону,
+        а з таблиці завантажуються тільки рядки між ними.
+        """
+        ws = self.get_or_create_worksheet(nickname, legacy_titles)
+        headers = self._ensure_required_columns(ws)
+        date_col = self._header_index_map(headers)['date']
+        
+        column = ws.col_values(date_col, value_render_option='UNFORMATTED_VALUE')
+        dates = []
+        for value in column[1:]:
+            parsed = parse_sheet_datetime(value)
+            dates.append(parsed.replace(tzinfo=None) if parsed else None)
+        
+        bounds = locate_date_range(dates, start, end)
+        if bounds is None:
+            logger.info(f"No transactions in range for {nickname}")
+            return []
+        
+        first_row, last_row = bounds[0] + 2, bounds[1] + 2
+        rows = ws.get(
+            f"A{first_row}:{rowcol_to_a1(last_row, len(headers))}",
+            value_render_option='UNFORMATTED_VALUE'
+        )
+        transactions = []
+        for transaction in self._rows_to_transactions(headers, rows, first_row):
+            date = dates[transaction['_row'] - 2]
+            if date is None:
+                continue
+            if (start is None or date >= start) and (end is None or date <= end):
+                transactions.append(transaction)
+        
+        logger.info(
+            f"✅ Loaded {len(transactions)} transactions for {nickname} "
+            f"(rows {first_row}-{last_row} of {len(column)})"
+        )
+        return transactions
+    
+    @staticmethod
+    def _range_for_title(title: str) -> str:
+        """A1-діапазон усього аркуша: назва в апострофах, внутрішні апострофи подвоєні"""
+        return "'" + title.replace("'", "''") + "'"
+    
+    def batch_get_values(self, titles: List[str]) -> Dict[str, List[List[Any]]]:
+        """Значення кількох аркушів одним запитом values:batchGet"""
+        if not titles:
+            return {}
+        response = self.spreadsheet.values_batch_get(
+            [self._range_for_title(title) for title in titles],
+            params={'valueRenderOption': 'UNFORMATTED_VALUE'},
+        )
+        value_ranges = response.get('valueRanges', [])
+        # Відповідь іде в порядку запиту
+        return {
+            title: value_range.get('values', [])
+            for title, value_range in zip(titles, value_ranges)
+        }
+    
+    def transactions_from_values(self, values: List[List[Any]]) -> List[Dict]:
+        """Транзакції з уже прочитаних значень аркуша (перший рядок – заголовки)"""
+        if len(values) < 2:
+            return []
+        return self._rows_to_transactions(values[0], values[1:], first_row=2)
+    
+    def apply_transaction_changes(
+        self,
+        ws,
+        values: List[List[Any]],
+        field_updates: Dict[int, Dict[str, Any]],
+        new_transactions: List[Dict[str, Any]],
+        nickname: Optional[str] = None,
+    ):
+        """
+        Записує зміни в аркуш, вже прочитаний у values: поля існуючих рядків
+        і нові транзакції в кінці. Баланси перераховуються в пам'яті (як у
+        recalculate_balances), тож пишуться лише змінені клітинки – одним
+        batch_update, а нові рядки – одним append_rows.
+
+        nickname – ключ версії даних, за яким кешуються графіки й експорти;
+        для аркуша зі старою назвою він відрізняється від ws.title.
+        """
+        headers = values[0] if values else []
+        if any(column not in headers for column in self.REQUIRED_COLUMNS):
+            headers = self._ensure_required_columns(ws)
+        column_map = self._header_index_map(headers)
+        amount_idx = column_map['amount'] - 1
+        balance_idx = column_map['balance'] - 1
+        currency_idx = column_map['currency'] - 1
+        record_type_idx = column_map['record_type'] - 1
+        
+        def cell(row, idx):
+            return row[idx] if idx < len(row) else ""
+        
+        running_balance = 0.0
+        currency = config.DEFAULT_CURRENCY
+        updates = []
+        for row_idx, row in enumerate(values[1:], start=2):
+            row_type = str(cell(row, record_type_idx)).strip().lower()
+            if row_type and row_type != self.TRANSACTION_RECORD_TYPE:
+                continue
+            amount = field_updates.get(row_idx, {}).get('amount', cell(row, amount_idx))
+            running_balance += self._safe_float(amount, 0.0)
+            if round(self._safe_float(cell(row, balance_idx), 0.0) - running_balance, 2) != 0:
+                updates.append((row_idx, 'balance', running_balance))
+            currency = cell(row, currency_idx) or currency
+        
+        for row_idx, fields in field_updates.items():
+            updates.extend((row_idx, column_name, value) for column_name, value in fields.items())
+        
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        new_rows = []
+        for transaction in new_transactions:
+            running_balance += self._safe_float(transaction.get('amount'), 0.0)
+            new_rows.append(self._build_row(headers, {
+                'record_type': self.TRANSACTION_RECORD_TYPE,
+                'date': timestamp,
+                'currency': currency,
+                **transaction,
+                'balance': running_balance,
+            }))
+        
+        self._batch_update_cells(ws, headers, updates)
+        if new_rows:
+            ws.append_rows(new_rows)
+        self._bump_data_version(nickname or ws.title)
+        for row_idx, fields in field_updates.items():
+            self._index_field_updates(ws.title, row_idx, fields)
+        logger.info(
+            f"Applied {len(updates)} cell updates and {len(new_rows)} new rows to {ws.title}"
+        )
+    
+    def get_transactions_and_goals(
+        self,
+        nickname: str,
+        legacy_titles: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Транзакції та цілі користувача за одне читання аркуша (без міграції старих цілей)"""
+        ws = self.get_or_create_worksheet(nickname, legacy_titles)
+        all_values = ws.get_all_values(value_render_option='UNFORMATTED_VALUE')
+        if len(all_values) < 2:
+            return [], []
+        
+        transactions = self._rows_to_transactions(all_values[0], all_values[1:], first_row=2)
+        goals = self._goal_rows_from_values(all_values)
+        for goal in goals:
+            goal['completed'] = self._normalize_completed(goal.get('completed'))
+        logger.info(f"Loaded {len(transactions)} transactions and {len(goals)} goals for {nickname}")
+        return transactions, goals
+    
+    @staticmethod
+    def select_subscriptions(transactions: List[Dict]) -> List[Dict]:
+        """Вибирає підписки з уже завантажених транзакцій"""
+        return [t for t in transactions if str(t.get('Is_Subscription', '')).upper() == 'TRUE']
+    
     def get_subscriptions(self, nickname: str, legacy_titles: Optional[List[str]] = None) -> List[Dict]:
         """Отримує всі підписки користувача"""
         transactions = self.get_all_transactions(nickname, legacy_titles)
-        subscriptions = [t for t in transactions if str(t.get('Is_Subscription', '')).upper() == 'TRUE']
+        subscriptions = self.select_subscriptions(transactions)
+        self.index_subscriptions(nickname, subscriptions)
         logger.info(f"Found {len(subscriptions)} subscriptions for {nickname}")
         return subscriptions
     
@@ -486,6 +734,7 @@ class SheetsService:
         """Оновлює значення в транзакції"""
         ws = self.get_or_create_worksheet(nickname, legacy_titles)
         ws.update_cell(row_index, column_index, value)
+        self._bump_data_version(nickname)
         logger.info(f"Updated transaction at row {row_index}, col {column_index}")
         if column_index == 3:  # amount column
             self.recalculate_balances(nickname, legacy_titles)
@@ -494,6 +743,8 @@ class SheetsService:
         """Видаляє транзакцію"""
         ws = self.get_or_create_worksheet(nickname, legacy_titles)
         ws.delete_rows(row_index)
+        self._bump_data_version(nickname)
+        self._update_index('remove_row', nickname, row_index)
         logger.info(f"Deleted transaction at row {row_index} for {nickname}")
         self.recalculate_balances(nickname, legacy_titles)
     
@@ -520,8 +771,8 @@ class SheetsService:
         try:
             return self.spreadsheet.worksheet(worksheet_title)
         except WorksheetNotFound:
-            ws = self.spreadsheet.add_worksheet(title=worksheet_title, rows=1000, cols=2)
-            ws.append_row(["user_id", "status"])
+            ws = self.spreadsheet.add_worksheet(title=worksheet_title, rows=1000, cols=4)
+            ws.append_row(self.REMINDER_COLUMNS)
             return ws
     
     def add_reminder_user(self, user_id: int):
@@ -548,6 +799,101 @@ class SheetsService:
         user_ids = ws.col_values(1)[1:]  # Skip header
         return [int(uid) for uid in user_ids if uid]
 
+    def get_reminder_schedules(self) -> List[Tuple[int, str, str]]:
+        """(user_id, час, дні тижня) усіх користувачів з нагадуваннями; порожньо – типові"""
+        ws = self.get_reminders_worksheet()
+        schedules = []
+        for row in ws.get_all_values()[1:]:
+            row = list(row) + [""] * (len(self.REMINDER_COLUMNS) - len(row))
+            if row[0].strip().isdigit():
+                schedules.append((int(row[0]), row[2], row[3]))
+        return schedules
+
+    def set_reminder_schedule(self, user_id: int, times: str, weekdays: str):
+        """Зберігає власний розклад (вмикає нагадування, якщо вони вимкнені)"""
+        ws = self.get_reminders_worksheet()
+        # Аркуші, створені до появи розкладів, мають лише два стовпці
+        if ws.row_values(1)[:len(self.REMINDER_COLUMNS)] != self.REMINDER_COLUMNS:
+            if ws.col_count < len(self.REMINDER_COLUMNS):
+                ws.add_cols(len(self.REMINDER_COLUMNS) - ws.col_count)
+            ws.update("A1:D1", [self.REMINDER_COLUMNS])
+        user_ids = ws.col_values(1)
+        if str(user_id) in user_ids:
+            row = user_ids.index(str(user_id)) + 1
+            ws.update(f"C{row}:D{row}", [[times, weekdays]])
+        else:
+            ws.append_row([str(user_id), "enabled", times, weekdays])
+        logger.info(f"User {user_id} set reminders at {times or 'default'} on {weekdays or 'all days'}")
+
+    def remove_reminder_users(self, user_ids: Iterable[int]) -> int:
+        """Пакетно вимикає нагадування: усі рядки видаляються одним запитом"""
+        targets = {str(uid) for uid in user_ids}
+        if not targets:
+            return 0
+        ws = self.get_reminders_worksheet()
+        rows = [
+            idx for idx, value in enumerate(ws.col_values(1), start=1)
+            if idx > 1 and value in targets
+        ]
+        if not rows:
+            return 0
+        # Знизу вгору, щоб видалення не зсувало ще не видалені рядки
+        self.spreadsheet.batch_update({"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": ws.id, "dimension": "ROWS", "startIndex": row - 1, "endIndex": row,
+            }}}
+            for row in sorted(rows, reverse=True)
+        ]})
+        logger.info(f"Disabled reminders for {len(rows)} users")
+        return len(rows)
+
+    def get_broadcast_stats_worksheet(self):
+        """Отримує або створює аркуш статистики розсилок"""
+        worksheet_title = "broadcast_stats"
+        try:
+            return self.spreadsheet.worksheet(worksheet_title)
+        except WorksheetNotFound:
+            ws = self.spreadsheet.add_worksheet(title=worksheet_title, rows=1000, cols=8)
+            ws.append_row([
+                "timestamp", "name", "total", "sent", "blocked", "failed", "retries", "elapsed_seconds",
+            ])
+            return ws
+
+    def append_broadcast_stats(self, row: List[Any]):
+        """Додає рядок статистики однієї розсилки"""
+        ws = self.get_broadcast_stats_worksheet()
+        ws.append_row([datetime.now().strftime("%Y-%m-%d %H:%M:%S")] + list(row))
+
+    def get_export_checkpoints_worksheet(self):
+        """Отримує або створює аркуш з позначками останнього експорту"""
+        worksheet_title = "export_checkpoints"
+        try:
+            return self.spreadsheet.worksheet(worksheet_title)
+        except WorksheetNotFound:
+            ws = self.spreadsheet.add_worksheet(title=worksheet_title, rows=1000, cols=2)
+            ws.append_row(["nickname", "exported_until"])
+            return ws
+    
+    def get_export_checkpoint(self, nickname: str) -> Optional[datetime]:
+        """Дата останньої транзакції, що потрапила в попередній експорт"""
+        ws = self.get_export_checkpoints_worksheet()
+        for row in ws.get_all_values()[1:]:
+            if row and row[0] == nickname:
+                parsed = parse_sheet_datetime(row[1] if len(row) > 1 else None)
+                return parsed.replace(tzinfo=None) if parsed else None
+        return None
+    
+    def set_export_checkpoint(self, nickname: str, exported_until: datetime):
+        """Зберігає позначку останнього експорту користувача"""
+        ws = self.get_export_checkpoints_worksheet()
+        value = exported_until.strftime("%Y-%m-%d %H:%M:%S")
+        nicknames = ws.col_values(1)
+        if nickname in nicknames:
+            ws.update(f"B{nicknames.index(nickname) + 1}", [[value]])
+        else:
+            ws.append_row([nickname, value])
+        logger.info(f"Export checkpoint for {nickname}: {value}")
+
     def _goal_sheet_title(self, nickname: str) -> str:
         """Формує безпечну назву аркуша для цілей користувача"""
         base = nickname or "anonymous"
@@ -819,11 +1165,15 @@ class SheetsService:
         ws.append_row(row)
         logger.info(f"Budget set: {category} - {budget_amount}")
 
-    def get_category_budgets(self, nickname: str) -> List[Dict]:
-        """Отримує всі бюджети користувача"""
+    def get_category_budgets(self, nickname: str, legacy_titles: Optional[List[str]] = None) -> List[Dict]:
+        """Отримує всі бюджети користувача (за потреби – під старими назвами)"""
         ws = self.get_budgets_worksheet()
         all_budgets = ws.get_all_records()
-        return [b for b in all_budgets if b.get('nickname') == nickname]
+        for title in [nickname, *(legacy_titles or [])]:
+            budgets = [b for b in all_budgets if b.get('nickname') == title]
+            if budgets:
+                return budgets
+        return []
 
     def delete_category_budget(self, nickname: str, category: str):
         """Видаляє бюджет категорії"""
@@ -22,5 +22,6 @@ __all__ = [
     'split_long_message',
     'get_period_dates',
     'filter_transactions_by_period',
+    'locate_date_range',
     'get_emoji_for_category',
 ]
\ No newline at end of file
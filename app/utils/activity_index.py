@@ -0,0 +1,68 @@
+# ============================================
+# FILE: app/utils/activity_index.py
+# ============================================
+"""
+Індекс останньої активності користувачів (SQLite): день останньої транзакції
+"""
+
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+
+class ActivityIndex:
+    """
+    user_id → день, коли користувач востаннє записав транзакцію.
+
+    Дозволяє не читати таблицю, щоб дізнатися, хто вже активний сьогодні
+    (наприклад, щоб не надсилати їм нагадування).
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS last_activity ("
+                "user_id INTEGER PRIMARY KEY, day TEXT NOT NULL)"
+            )
+
+    def touch(self, user_id: int, day: date):
+        """Фіксує активність; пізніший день не перезаписується ранішим"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO last_activity (user_id, day) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET day = MAX(day, excluded.day)",
+                (int(user_id), day.isoformat()),
+            )
+
+    def last_active(self, user_id: int) -> Optional[date]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT day FROM last_activity WHERE user_id = ?", (int(user_id),)
+            ).fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def active_since(self, day: date, user_ids: Iterable[int]) -> Set[int]:
+        """Хто з user_ids мав активність у день day або пізніше"""
+        ids = [int(user_id) for user_id in user_ids]
+        active: Set[int] = set()
+        # Обмеження SQLite на кількість параметрів у запиті
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT user_id FROM last_activity WHERE day >= ? AND user_id IN ({placeholders})",
+                    [day.isoformat(), *chunk],
+                ).fetchall()
+            active.update(user_id for (user_id,) in rows)
+        return active
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
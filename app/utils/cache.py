@@ -0,0 +1,214 @@
+# ============================================
+# FILE: app/utils/cache.py
+# ============================================
+"""
+Прості кеші в пам'яті та на диску
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Формує стабільний текстовий ключ з частин"""
+    return "|".join(str(part) for part in parts)
+
+
+def ttl_epoch(ttl: Optional[float], now: Optional[float] = None) -> int:
+    """
+    Номер інтервалу тривалістю ttl. Доданий до ключа кешу, він старить
+    запис не пізніше ніж через ttl (0 або None – ніколи)
+    """
+    if not ttl:
+        return 0
+    return int((time.time() if now is None else now) // ttl)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(float(value), 2)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def make_fingerprint(*parts: Any) -> str:
+    """
+    SHA-256 від нормалізованих частин: порядок ключів словників не важливий,
+    числа порівнюються з точністю до копійок, рядки обрізаються від пробілів
+    """
+    payload = json.dumps(
+        [_normalize(part) for part in parts],
+        sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """LRU-кеш з обмеженням за кількістю записів, розміром у байтах та TTL"""
+
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = len,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, _, expires_at = entry
+            if expires_at is not None and time.monotonic() > expires_at:
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """ttl перекриває TTL кешу для цього запису"""
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        evicted = []
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Запис більший за весь бюджет – не кешуємо в пам'яті
+                evicted.append((key, value))
+            else:
+                self._data[key] = (value, size, expires_at)
+                self._bytes += size
+                evicted.extend(self._shrink())
+        if self._on_evict:
+            for evicted_key, evicted_value in evicted:
+                try:
+                    self._on_evict(evicted_key, evicted_value)
+                except Exception as exc:
+                    logger.warning("Cache eviction hook failed: %s", exc)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+        return entry[0] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        return entry
+
+    def _shrink(self):
+        evicted = []
+        while self._data and (
+            (self.max_items is not None and len(self._data) > self.max_items)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, (value, size, _) = self._data.popitem(last=False)
+            self._bytes -= size
+            evicted.append((key, value))
+        return evicted
+
+
+class DiskCache:
+    """Кеш байтових значень у локальній директорії з обмеженням розміру"""
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".bin"):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.suffix}"
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("Disk cache read failed for %s: %s", path.name, exc)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def set(self, key: Hashable, value: bytes):
+        path = self._path(key)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Disk cache write failed for %s: %s", path.name, exc)
+            return
+        self._shrink()
+
+    def _shrink(self):
+        with self._lock:
+            try:
+                files = [
+                    (entry.stat().st_mtime, entry.stat().st_size, entry)
+                    for entry in self.directory.glob(f"*{self.suffix}")
+                ]
+            except OSError:
+                return
+            total = sum(size for _, size, _ in files)
+            if total <= self.max_bytes:
+                return
+            for _, size, entry in sorted(files, key=lambda item: item[0]):
+                try:
+                    entry.unlink()
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
@@ -0,0 +1,43 @@
+# ============================================
+# FILE: app/utils/downsampling.py
+# ============================================
+"""
+Проріджування часових рядів перед побудовою графіків
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def minmax_downsample(x, y, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Залишає мінімум і максимум у кожному з `buckets` рівних інтервалів осі X.
+
+    Один інтервал відповідає приблизно одному пікселю ширини графіка, тому
+    лінія виглядає так само, як з усіма точками (піки та провали
+    зберігаються), а кількість точок не перевищує 2 * buckets + 2.
+    Очікує відсортований за X ряд; порядок точок зберігається.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if buckets < 1 or len(x) <= 2 * buckets + 2:
+        return x, y
+
+    span = x[-1] - x[0]
+    if span <= 0:
+        bucket = np.zeros(len(x), dtype=np.int64)
+    else:
+        bucket = ((x - x[0]) / span * buckets).astype(np.int64)
+        np.minimum(bucket, buckets - 1, out=bucket)
+
+    # Сортуємо за (інтервал, y): перший елемент групи – мінімум, останній – максимум
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.r_[True, np.diff(bucket[order]) != 0])
+    ends = np.r_[starts[1:], len(order)] - 1
+
+    keep = np.zeros(len(x), dtype=bool)
+    keep[order[starts]] = True
+    keep[order[ends]] = True
+    keep[0] = keep[-1] = True
+    return x[keep], y[keep]
@@ -19,6 +19,15 @@ def format_currency(amount: float, currency: str = "UAH") -> str:
     return f"{amount:,.2f} {currency}".replace(",", " ")
 
 
+def format_csv_number(value: Optional[float]) -> str:
+    """Число для CSV: цілі без '.0' (як писав pandas), решта – repr"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
 def format_date(date_value: Optional[str], date_format: str = DISPLAY_DATE_FORMAT) -> str:
     """Форматує дату в стандартному форматі бота"""
     if not date_value:
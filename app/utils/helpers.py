@@ -4,7 +4,7 @@
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Sequence, Tuple, Any
 import logging
 import pytz
 
@@ -99,6 +99,31 @@ def filter_transactions_by_period(transactions: List[Dict], period: str) -> List
     return results
 
 
+def locate_date_range(
+    dates: Sequence[Optional[datetime]],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Повертає індекси першого та останнього рядка з датою в [start, end].
+
+    Один лінійний прохід: рядки без дати (None) пропускаються, порядок
+    рядків не важливий (ручні правки таблиці). Між межами можуть
+    траплятися рядки поза діапазоном – їх відсіює викликач.
+    """
+    first = last = None
+    for idx, value in enumerate(dates):
+        if value is None:
+            continue
+        if (start is None or value >= start) and (end is None or value <= end):
+            if first is None:
+                first = idx
+            last = idx
+    if first is None:
+        return None
+    return first, last
+
+
 # ----------------------- ВІДОБРАЖЕННЯ ----------------------- #
 
 def get_emoji_for_category(category: str) -> str:
@@ -134,9 +159,14 @@ class SheetContext:
     display_name: str
 
 
+def user_sheet_title(user_id: int) -> str:
+    """Назва аркуша користувача (і ключ версії даних у кешах)"""
+    return f"user_{user_id}"
+
+
 def build_sheet_context(user) -> SheetContext:
     """Формує службовий контекст для конкретного користувача."""
-    sheet_title = f"user_{user.id}"
+    sheet_title = user_sheet_title(user.id)
     username = getattr(user, "username", None)
     candidates = [title for title in [username, "anonymous"] if title]
     legacy = []
@@ -0,0 +1,110 @@
+# ============================================
+# FILE: app/utils/message_stream.py
+# ============================================
+"""
+Поступовий показ тексту, що надходить частинами, у повідомленнях Telegram
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MAX_LENGTH = 4096
+# Не частіше одного редагування на секунду в чаті
+STREAM_EDIT_INTERVAL = 1.0
+STREAM_MAX_RETRIES = 3
+
+
+def split_point(text: str, limit: int) -> int:
+    """Місце розриву не далі limit: абзац, рядок, пробіл або жорсткий розріз"""
+    for separator in ("\n\n", "\n", " "):
+        idx = text.rfind(separator, 0, limit)
+        if idx > limit // 2:
+            return idx
+    return limit
+
+
+class MessageStreamer:
+    """
+    Редагує повідомлення в міру надходження тексту.
+
+    Редагування обмежені одним на min_interval секунд; коли текст перевищує
+    max_length, поточне повідомлення фіналізується і текст продовжується
+    в новому. Перший фрагмент показується одразу.
+    """
+
+    def __init__(
+        self,
+        message: Message,
+        header: str = "",
+        max_length: int = TELEGRAM_MAX_LENGTH,
+        min_interval: float = STREAM_EDIT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_length = max_length
+        self.min_interval = min_interval
+        self._anchor = message
+        self._message: Optional[Message] = message
+        self._clock = clock
+        self._text = header
+        self._shown: Optional[str] = None
+        self._last_edit: Optional[float] = None
+        self.messages_sent = 0
+
+    async def feed(self, chunk: str):
+        if not chunk:
+            return
+        self._text += chunk
+        while len(self._text) > self.max_length:
+            cut = split_point(self._text, self.max_length)
+            head, rest = self._text[:cut], self._text[cut:]
+            self._text = head
+            await self._flush(force=True)
+            # Решта піде новим повідомленням, щойно в ній з'явиться текст
+            self._message = None
+            self._shown = None
+            self._text = rest.lstrip()
+        await self._flush()
+
+    async def finish(self):
+        """Показує весь накопичений текст"""
+        await self._flush(force=True)
+
+    async def _flush(self, force: bool = False):
+        text = self._text.strip()
+        if not text or text == self._shown:
+            return
+        if self._last_edit is not None:
+            wait = self.min_interval - (self._clock() - self._last_edit)
+            if wait > 0:
+                if not force:
+                    return
+                await asyncio.sleep(wait)
+
+        if self._message is None:
+            self._message = await self._call(self._anchor.answer, text)
+            self.messages_sent += 1
+        else:
+            await self._call(self._message.edit_text, text)
+        self._shown = text
+        self._last_edit = self._clock()
+
+    @staticmethod
+    async def _call(method: Callable[[str], Awaitable], text: str):
+        for _ in range(STREAM_MAX_RETRIES):
+            try:
+                return await method(text)
+            except TelegramRetryAfter as exc:
+                logger.warning("Telegram flood control, retry after %ss", exc.retry_after)
+                await asyncio.sleep(exc.retry_after)
+            except TelegramBadRequest as exc:
+                if "message is not modified" in str(exc):
+                    return None
+                raise
+        return await method(text)
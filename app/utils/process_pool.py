@@ -0,0 +1,81 @@
+# ============================================
+# FILE: app/utils/process_pool.py
+# ============================================
+"""
+Спільний пул процесів для CPU-важких задач (графіки, PDF-звіти)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+class ProcessPool:
+    """
+    Пул процесів-воркерів, що запускається на старті бота.
+
+    Воркери створюються через fork, тож не перезапускають app.main, як spawn
+    при `python -m`. На момент старту клієнт Google Sheets і сесія бота вже
+    створені (при імпорті) і копіюються у воркери, але воркери виконують
+    лише чисті функції рендеру над переданими аргументами й не торкаються
+    успадкованих клієнтів, сокетів чи event loop.
+
+    Fork-безпеки це не гарантує. Пул стартує першим у on_startup – до
+    планувальника, пулу asyncio.to_thread і фонового прогріву, – але
+    фонові потоки, запущені при імпорті (Sentry SDK, якщо задано
+    SENTRY_DSN), на цей момент уже працюють: блокування, які вони тримали
+    під час fork, у воркері лишаються зайнятими. Якщо пул не запущено або
+    він зламався, задачі виконуються в потоках – повторний fork пізніше,
+    коли потоків ще більше, лише збільшив би цей ризик.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self, workers: int):
+        if workers <= 0 or self._executor is not None:
+            return
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+            )
+            # З fork усі воркери стартують на першому завданні – робимо це зараз
+            self._executor.submit(_worker_ready).result()
+            logger.info("Worker processes started: %s", workers)
+        except (OSError, ValueError, BrokenProcessPool) as exc:
+            logger.warning("Worker processes unavailable, using threads: %s", exc)
+            self.shutdown()
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Виконує func(*args) у воркері (або в потоці) і повертає результат"""
+        executor = self._executor
+        if executor is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            except BrokenProcessPool as exc:
+                logger.warning("Worker pool broken, falling back to threads: %s", exc)
+                self.shutdown()
+        return await asyncio.to_thread(func, *args)
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton
+process_pool = ProcessPool()
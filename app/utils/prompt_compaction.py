@@ -0,0 +1,159 @@
+# ============================================
+# FILE: app/utils/prompt_compaction.py
+# ============================================
+"""
+Стиснення транзакцій для AI-промптів під бюджет токенів
+"""
+
+import math
+from collections import defaultdict
+from datetime import date
+from statistics import median
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Груба оцінка для Gemini: латиниця ~4 символи на токен, кирилиця та інше ~2
+ASCII_CHARS_PER_TOKEN = 4
+OTHER_CHARS_PER_TOKEN = 2
+# Витрата, більша за OUTLIER_FACTOR медіан своєї категорії, лишається окремим рядком
+OUTLIER_FACTOR = 3.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Оцінює кількість токенів тексту (з запасом)"""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + other_chars / OTHER_CHARS_PER_TOKEN)
+
+
+def format_amount(value: Any) -> str:
+    try:
+        number = float(value or 0)
+    except (TypeError, ValueError):
+        return "0"
+    formatted = f"{number:.2f}".rstrip("0").rstrip(".")
+    return formatted or "0"
+
+
+def format_line(day: str, amount: Any, currency: str, category: str, note: str) -> str:
+    """Рядок промпту: date | amount currency | category | note"""
+    return f"{day} | {format_amount(amount)} {currency} | {category} | {note}"
+
+
+def _day(raw: str) -> str:
+    return raw[:10]
+
+
+def _week(raw: str) -> str:
+    try:
+        year, week, _ = date.fromisoformat(raw[:10]).isocalendar()
+    except ValueError:
+        return raw[:10]
+    return f"{year}-W{week:02d}"
+
+
+def _month(raw: str) -> str:
+    return raw[:7]
+
+
+# Рівні групування від найдетальнішого
+GROUPING_LEVELS: Sequence[Callable[[str], str]] = (_day, _week, _month)
+
+
+def _split_outliers(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Доходи та великі витрати – окремо, решта – на групування"""
+    by_category: Dict[str, List[float]] = defaultdict(list)
+    for row in rows:
+        if row["amount"] < 0:
+            by_category[row["category"]].append(-row["amount"])
+    medians = {category: median(values) for category, values in by_category.items()}
+
+    outliers, regular = [], []
+    for row in rows:
+        amount = row["amount"]
+        if amount >= 0 or -amount > OUTLIER_FACTOR * medians[row["category"]]:
+            outliers.append(row)
+        else:
+            regular.append(row)
+    return outliers, regular
+
+
+def _grouped_lines(rows: List[Dict[str, Any]], period: Callable[[str], str]) -> List[Tuple[str, str]]:
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[(period(row["date"]), row["category"], row["currency"])].append(row)
+
+    lines = []
+    for (label, category, currency), items in groups.items():
+        if len(items) == 1:
+            row = items[0]
+            lines.append((row["date"], format_line(row["date"], row["amount"], currency, category, row["note"])))
+        else:
+            total = sum(item["amount"] for item in items)
+            lines.append((items[0]["date"], format_line(label, total, currency, category, f"транзакцій: {len(items)}")))
+    return lines
+
+
+def _normalize(transactions: Sequence[Dict[str, Any]], default_currency: str) -> List[Dict[str, Any]]:
+    rows = []
+    for item in transactions:
+        try:
+            amount = float(item.get("amount") or 0)
+        except (TypeError, ValueError):
+            amount = 0.0
+        rows.append({
+            "date": str(item.get("date") or ""),
+            "amount": amount,
+            "currency": item.get("currency") or default_currency,
+            "category": item.get("category") or "",
+            "note": (item.get("note") or "").strip(),
+        })
+    return rows
+
+
+def compact_transactions(
+    transactions: Sequence[Dict[str, Any]],
+    max_tokens: int,
+    default_currency: str = "UAH",
+) -> str:
+    """
+    Повертає рядки транзакцій, що вміщаються в max_tokens.
+
+    Якщо всі транзакції не вміщаються, доходи та нетипово великі витрати
+    лишаються дослівно, а решта підсумовується по днях і категоріях
+    (далі – по тижнях і місяцях). Суми груп збігаються з вихідними.
+    В останню чергу відкидаються найстаріші рядки.
+    """
+    rows = _normalize(transactions, default_currency)
+    lines = [format_line(r["date"], r["amount"], r["currency"], r["category"], r["note"]) for r in rows]
+    text = "\n".join(lines)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    outliers, regular = _split_outliers(rows)
+    outlier_lines = [
+        (r["date"], format_line(r["date"], r["amount"], r["currency"], r["category"], r["note"]))
+        for r in outliers
+    ]
+    for period in GROUPING_LEVELS:
+        dated_lines = sorted(outlier_lines + _grouped_lines(regular, period), key=lambda item: item[0])
+        lines = [line for _, line in dated_lines]
+        text = "\n".join(lines)
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+    # Навіть помісячні підсумки не вміщаються – лишаємо найновіші рядки
+    kept: List[str] = []
+    used = estimate_tokens(f"... ще {len(lines)} старіших рядків пропущено") + 1
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    skipped = len(lines) - len(kept)
+    kept.reverse()
+    if skipped:
+        kept.insert(0, f"... ще {skipped} старіших рядків пропущено")
+    return "\n".join(kept)
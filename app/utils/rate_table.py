@@ -0,0 +1,181 @@
+# ============================================
+# FILE: app/utils/rate_table.py
+# ============================================
+"""
+Історичні курси валют до гривні по днях (SQLite) та векторна конвертація
+"""
+
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BASE_CURRENCY = "UAH"
+
+
+def _to_day(value: Any) -> str:
+    """Дата/datetime/ISO-рядок → 'YYYY-MM-DD' (порожній рядок – невідома дата)"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if value is None:
+        return ""
+    return str(value).strip()[:10]
+
+
+def _day_numbers(dates: Sequence[Any]) -> np.ndarray:
+    """Номери днів від епохи; невідомі дати – NaT (найменше int64)"""
+    try:
+        # ISO-рядки, date і datetime: перші 10 символів – це 'YYYY-MM-DD'
+        parsed = np.array(dates, dtype="U10").astype("datetime64[D]")
+    except ValueError:
+        # Є некоректні значення – розбираємо поелементно
+        parsed = np.array([_parse_day(_to_day(value)) for value in dates], dtype="datetime64[D]")
+    return parsed.astype(np.int64)
+
+
+def _parse_day(text: str) -> np.datetime64:
+    try:
+        return np.datetime64(text or "NaT", "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+class RateTable:
+    """
+    Таблиця (валюта, день) → курс продажу в гривнях.
+
+    Для конвертації береться курс на дату операції або, якщо його немає
+    (вихідні, пропуски), останній відомий до неї. Таблиця кожної валюти
+    тримається в пам'яті як відсортовані масиви numpy і оновлюється після
+    запису, тож convert_many не звертається до диска.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rates ("
+                "currency TEXT NOT NULL, day TEXT NOT NULL, rate REAL NOT NULL, "
+                "PRIMARY KEY (currency, day))"
+            )
+        self._arrays: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+
+    def upsert(self, day: Any, rates: Dict[str, float]):
+        """Записує курси за один день"""
+        day_text = _to_day(day)
+        self.upsert_many((currency, day_text, rate) for currency, rate in rates.items())
+
+    def upsert_many(self, rows: Iterable[Tuple[str, Any, float]]):
+        """Пакетний запис (валюта, день, курс); некоректні курси пропускаються"""
+        clean = [
+            (str(currency).upper(), _to_day(day), float(rate))
+            for currency, day, rate in rows
+            if currency and _to_day(day) and rate and float(rate) > 0
+        ]
+        if not clean:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rates (currency, day, rate) VALUES (?, ?, ?)", clean
+            )
+            self._arrays = None
+
+    def known_days(self, start: date, end: date) -> List[date]:
+        """Дні в [start, end], для яких є хоча б один курс"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT day FROM rates WHERE day BETWEEN ? AND ? ORDER BY day",
+                (start.isoformat(), end.isoformat()),
+            ).fetchall()
+        return [date.fromisoformat(day) for (day,) in rows]
+
+    def missing_days(self, start: date, end: date) -> List[date]:
+        """Дні в [start, end] без жодного курсу – кандидати на завантаження"""
+        known = set(self.known_days(start, end))
+        days = (start + timedelta(days=offset) for offset in range((end - start).days + 1))
+        return [day for day in days if day not in known]
+
+    def rate_on(self, currency: str, day: Any) -> Optional[float]:
+        rate = self.convert_many([1.0], [currency], [day])[0]
+        return None if np.isnan(rate) else float(rate)
+
+    def convert_many(
+        self,
+        amounts: Sequence[float],
+        currencies: Sequence[str],
+        dates: Sequence[Any],
+    ) -> np.ndarray:
+        """
+        Суми в гривнях за курсом на дату кожної операції.
+
+        Гривня не конвертується; NaN – немає курсу на цю дату чи раніше,
+        невідома валюта або дата.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        if not (len(amounts) == len(currencies) == len(dates)):
+            raise ValueError("amounts, currencies and dates must have the same length")
+
+        codes = np.asarray(currencies)
+        if codes.dtype.kind != "U":
+            codes = np.array([str(code or "") for code in currencies])
+        # Порівнюємо цілі індекси, а не рядки; порожня валюта – гривня
+        unique_codes, code_index = np.unique(codes, return_inverse=True)
+        names = [str(code).strip().upper() or BASE_CURRENCY for code in unique_codes]
+        result = np.full(len(amounts), np.nan)
+        if set(names) == {BASE_CURRENCY}:
+            result[:] = amounts
+            return result
+
+        days = _day_numbers(dates)
+        valid_day = days != np.iinfo(np.int64).min
+        arrays = self._load_arrays()
+        for position, code in enumerate(names):
+            if code == BASE_CURRENCY:
+                base = code_index == position
+                result[base] = amounts[base]
+                continue
+            table = arrays.get(code)
+            if table is None:
+                continue
+            table_days, table_rates = table
+            mask = (code_index == position) & valid_day
+            # Останній відомий курс не пізніше дати операції
+            idx = np.searchsorted(table_days, days[mask], side="right") - 1
+            found = idx >= 0
+            rates = np.full(len(idx), np.nan)
+            rates[found] = table_rates[idx[found]]
+            result[mask] = amounts[mask] * rates
+        return result
+
+    def _load_arrays(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            if self._arrays is not None:
+                return self._arrays
+            rows = self._conn.execute(
+                "SELECT currency, day, rate FROM rates ORDER BY currency, day"
+            ).fetchall()
+            grouped: Dict[str, Tuple[List[str], List[float]]] = {}
+            for currency, day, rate in rows:
+                days, rates = grouped.setdefault(currency, ([], []))
+                days.append(day)
+                rates.append(rate)
+            self._arrays = {
+                currency: (
+                    np.array(days, dtype="datetime64[D]").astype(np.int64),
+                    np.array(rates, dtype=float),
+                )
+                for currency, (days, rates) in grouped.items()
+            }
+            return self._arrays
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
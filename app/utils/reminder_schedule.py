@@ -0,0 +1,179 @@
+# ============================================
+# FILE: app/utils/reminder_schedule.py
+# ============================================
+"""
+Індивідуальні розклади нагадувань (час і дні тижня) та черга їх спрацювань
+"""
+
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import pytz
+
+REMINDER_TZ = pytz.timezone("Europe/Kiev")
+ALL_WEEKDAYS: FrozenSet[int] = frozenset(range(1, 8))
+WEEKDAY_NAMES = {1: "Пн", 2: "Вт", 3: "Ср", 4: "Чт", 5: "Пт", 6: "Сб", 7: "Нд"}
+MAX_REMINDER_TIMES = 5
+
+_TIME_PATTERN = re.compile(r"^(\d{1,2})[:.](\d{2})$")
+
+
+def parse_times(text: str) -> Tuple[time, ...]:
+    """'9:00, 20:30' → (09:00, 20:30); ValueError для некоректного часу"""
+    parsed = set()
+    for part in re.split(r"[,;\s]+", (text or "").strip()):
+        if not part:
+            continue
+        match = _TIME_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Некоректний час: {part}")
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if hour > 23 or minute > 59:
+            raise ValueError(f"Некоректний час: {part}")
+        parsed.add(time(hour, minute))
+    if len(parsed) > MAX_REMINDER_TIMES:
+        raise ValueError(f"Не більше {MAX_REMINDER_TIMES} нагадувань на день")
+    return tuple(sorted(parsed))
+
+
+def parse_weekdays(text: str) -> FrozenSet[int]:
+    """'12345' → пн–пт (ISO: 1 – понеділок); порожньо – щодня"""
+    days = frozenset(int(ch) for ch in str(text or "") if ch in "1234567")
+    return days or ALL_WEEKDAYS
+
+
+@dataclass(frozen=True)
+class ReminderSchedule:
+    """Час нагадувань (київський) і дні тижня, коли вони надсилаються"""
+    times: Tuple[time, ...]
+    weekdays: FrozenSet[int] = ALL_WEEKDAYS
+
+    @classmethod
+    def from_settings(
+        cls,
+        times_text: str,
+        weekdays_text: str,
+        default_times: Iterable[time],
+    ) -> "ReminderSchedule":
+        """Розклад з комірок reminder_settings; некоректний чи порожній час – типовий"""
+        try:
+            times = parse_times(times_text)
+        except ValueError:
+            times = ()
+        return cls(times=times or tuple(sorted(default_times)), weekdays=parse_weekdays(weekdays_text))
+
+    def format_times(self) -> str:
+        return ", ".join(t.strftime("%H:%M") for t in self.times)
+
+    def format_weekdays(self) -> str:
+        if self.weekdays == ALL_WEEKDAYS:
+            return "щодня"
+        return ", ".join(WEEKDAY_NAMES[day] for day in sorted(self.weekdays))
+
+    def settings_row(self) -> List[str]:
+        """Значення для комірок times і weekdays"""
+        return [
+            ",".join(t.strftime("%H:%M") for t in self.times),
+            "".join(str(day) for day in sorted(self.weekdays)),
+        ]
+
+    def next_after(self, moment: datetime, offset: timedelta = timedelta(0)) -> Optional[datetime]:
+        """Перше спрацювання (UTC) строго після moment; offset зсуває кожен час"""
+        if not self.times or not self.weekdays:
+            return None
+        local = moment.astimezone(REMINDER_TZ)
+        for days_ahead in range(8):
+            day = local.date() + timedelta(days=days_ahead)
+            if day.isoweekday() not in self.weekdays:
+                continue
+            for at in self.times:
+                fire_at = REMINDER_TZ.localize(datetime.combine(day, at)) + offset
+                if fire_at > moment:
+                    return fire_at.astimezone(pytz.UTC)
+        return None
+
+
+class ReminderQueue:
+    """
+    Черга найближчих спрацювань (min-heap за часом).
+
+    Для кожного користувача в купі лежить лише наступне спрацювання;
+    pop_due() віддає всіх, чий час настав, і одразу ставить їхнє наступне.
+    Зміна чи видалення розкладу не шукає запис у купі – старий запис
+    просто пропускається при вийманні (за номером покоління).
+
+    spread_minutes зсуває час кожного користувача на сталі 0..spread-1
+    хвилин (за user_id), щоб однаковий розклад не давав піку відправок.
+    """
+
+    def __init__(self, spread_minutes: int = 0):
+        self.spread_minutes = max(0, spread_minutes)
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._current: Dict[int, Tuple[int, ReminderSchedule]] = {}
+        self._generation = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._current
+
+    def offset_for(self, user_id: int) -> timedelta:
+        if not self.spread_minutes:
+            return timedelta(0)
+        return timedelta(minutes=user_id % self.spread_minutes)
+
+    def schedule(self, user_id: int, schedule: ReminderSchedule, now: datetime):
+        generation = next(self._generation)
+        self._current[user_id] = (generation, schedule)
+        fire_at = schedule.next_after(now, self.offset_for(user_id))
+        if fire_at is not None:
+            heapq.heappush(self._heap, (fire_at, generation, user_id))
+
+    def remove(self, user_id: int):
+        self._current.pop(user_id, None)
+
+    def reload(self, schedules: Dict[int, ReminderSchedule], since: datetime):
+        """
+        Замінює набір розкладів. Незмінені розклади зберігають уже заплановане
+        спрацювання (навіть якщо його час минув, а pop_due ще не викликали);
+        нові й змінені плануються від since – моменту останнього pop_due.
+        """
+        for user_id in [user_id for user_id in self._current if user_id not in schedules]:
+            self.remove(user_id)
+        for user_id, schedule in schedules.items():
+            if self.get(user_id) != schedule:
+                self.schedule(user_id, schedule, since)
+
+    def get(self, user_id: int) -> Optional[ReminderSchedule]:
+        entry = self._current.get(user_id)
+        return entry[1] if entry else None
+
+    def next_due(self) -> Optional[datetime]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """Користувачі, чий час настав (кожен один раз), з переплануванням"""
+        due: List[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, user_id = heapq.heappop(self._heap)
+            entry = self._current.get(user_id)
+            if entry is None or entry[0] != generation:
+                continue
+            due.append(user_id)
+            # Наступне – після now, тож пропущені за час простою не накопичуються
+            self.schedule(user_id, entry[1], now)
+        return due
+
+    def _drop_stale(self):
+        while self._heap:
+            _, generation, user_id = self._heap[0]
+            entry = self._current.get(user_id)
+            if entry is not None and entry[0] == generation:
+                return
+            heapq.heappop(self._heap)
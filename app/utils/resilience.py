@@ -0,0 +1,228 @@
+# ============================================
+# FILE: app/utils/resilience.py
+# ============================================
+"""
+Захист від повільних і недоступних зовнішніх сервісів:
+запобіжник (circuit breaker), виконавець з лімітами та обмежувач швидкості
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Запобіжник розімкнений – виклик не виконувався"""
+
+
+class QueueFullError(RuntimeError):
+    """Черга виконавця переповнена – виклик не виконувався"""
+
+
+class CircuitBreaker:
+    """
+    Після failure_threshold помилок поспіль розмикається на reset_timeout
+    секунд і відхиляє виклики. Потім пропускає один пробний виклик:
+    успіх замикає запобіжник, помилка – знову розмикає.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "upstream",
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Чи можна зараз виконати виклик"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.OPEN:
+                return False
+            # Пробний виклик, що так і не завершився, не блокує запобіжник назавжди
+            now = self._clock()
+            if self._trial_started is None or now - self._trial_started >= self.reset_timeout:
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Circuit '%s' closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._trial_started is not None
+            self._trial_started = None
+            if trial_failed or self._failures >= self.failure_threshold:
+                if trial_failed or self._opened_at is None:
+                    logger.warning(
+                        "Circuit '%s' opened after %s failures", self.name, self._failures
+                    )
+                self._opened_at = self._clock()
+
+
+class BoundedExecutor:
+    """
+    Окремий пул потоків для блокуючих викликів зовнішнього сервісу.
+
+    Одночасно виконується не більше max_concurrency викликів, ще max_queue
+    можуть чекати; решта одразу отримує QueueFullError. Кожен виклик має
+    дедлайн timeout (asyncio.TimeoutError), а помилки й таймаути рахує
+    запобіжник. Слот звільняється лише коли потік справді завершився,
+    тож завислі виклики не розростають пул.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        timeout: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.breaker = breaker
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Виклики, що виконуються або чекають слоту"""
+        return self._pending
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_concurrency + self.max_queue:
+            raise QueueFullError(f"{self.name} queue is full ({self._pending} pending)")
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout if self.timeout is not None else None
+        self._pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self._remaining(loop, deadline))
+                future = self._executor.submit(func, *args)
+                future.add_done_callback(lambda _: self._release_slot(loop))
+                result = await asyncio.wait_for(
+                    asyncio.wrap_future(future), self._remaining(loop, deadline)
+                )
+            except Exception:
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                raise
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+        finally:
+            self._pending -= 1
+
+    def _release_slot(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:
+            # Event loop уже закритий (зупинка бота)
+            pass
+
+    @staticmethod
+    def _remaining(loop, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(deadline - loop.time(), 0)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TokenBucket:
+    """
+    Глобальний ліміт швидкості: rate дозволів на секунду із запасом до
+    capacity. acquire() чекає на дозвіл, учасники обслуговуються по черзі.
+    pause() зупиняє видачу на вказаний час – так виконується вимога
+    сервісу «повторіть через N секунд» для всіх відправників одразу.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def try_acquire(self) -> float:
+        """Бере дозвіл і повертає 0 або, якщо дозволу немає, скільки секунд чекати"""
+        now = self._clock()
+        if now < self._updated:
+            # Пауза ще триває
+            return self._updated - now
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                wait = self.try_acquire()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Жодних дозволів протягом seconds, після паузи запас порожній"""
+        resume_at = self._clock() + seconds
+        if resume_at > self._updated:
+            self._updated = resume_at
+            self._tokens = 0.0
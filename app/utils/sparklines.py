@@ -0,0 +1,88 @@
+# ============================================
+# FILE: app/utils/sparklines.py
+# ============================================
+"""
+Текстові міні-графіки з символів Unicode (блоки та шрифт Брайля)
+"""
+
+from typing import Callable, List, Sequence
+
+BLOCKS = "▁▂▃▄▅▆▇█"
+EIGHTHS = " ▏▎▍▌▋▊▉█"
+BRAILLE_BASE = 0x2800
+# Біти крапок Брайля: [рядок крапки зверху вниз][стовпчик]
+BRAILLE_DOTS = (
+    (0x01, 0x08),
+    (0x02, 0x10),
+    (0x04, 0x20),
+    (0x40, 0x80),
+)
+
+
+def resample(values: Sequence[float], size: int,
+             reducer: Callable[[Sequence[float]], float] = max) -> List[float]:
+    """Стискає ряд до `size` значень, застосовуючи `reducer` до кожного відрізка"""
+    values = list(values)
+    if size <= 0 or len(values) <= size:
+        return values
+    length = len(values)
+    return [
+        reducer(values[i * length // size:(i + 1) * length // size])
+        for i in range(size)
+    ]
+
+
+def block_sparkline(values: Sequence[float], width: int = 0) -> str:
+    """Рядок зі стовпчиків ▁▂▃▄▅▆▇█; найменше значення ряду – ▁, найбільше – █"""
+    values = resample(values, width) if width else list(values)
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = high - low
+    if span == 0:
+        return (BLOCKS[-1] if high > 0 else BLOCKS[0]) * len(values)
+    top = len(BLOCKS) - 1
+    return "".join(BLOCKS[int((value - low) / span * top + 0.5)] for value in values)
+
+
+def horizontal_bar(fraction: float, width: int = 10) -> str:
+    """Горизонтальна смуга з точністю до 1/8 символу"""
+    fraction = min(max(fraction, 0.0), 1.0)
+    eighths = int(round(fraction * width * 8))
+    full, rest = divmod(eighths, 8)
+    bar = EIGHTHS[-1] * full + (EIGHTHS[rest] if rest else "")
+    return bar.ljust(width)
+
+
+def braille_line(values: Sequence[float], width: int = 30, rows: int = 3) -> List[str]:
+    """
+    Лінійний графік шрифтом Брайля: кожен символ – 2×4 крапки,
+    тобто `width` символів дають 2 * width точок по горизонталі.
+    Повертає рядки зверху вниз.
+    """
+    points = resample(values, width * 2, reducer=lambda chunk: chunk[-1])
+    if not points:
+        return []
+    height = rows * 4
+    low, high = min(points), max(points)
+    span = high - low
+
+    def level(value: float) -> int:
+        # 0 – нижня крапка, height - 1 – верхня
+        if span == 0:
+            return height // 2
+        return int((value - low) / span * (height - 1) + 0.5)
+
+    columns = (len(points) + 1) // 2
+    cells = [[0] * columns for _ in range(rows)]
+    previous = None
+    for x, value in enumerate(points):
+        current = level(value)
+        # Заповнюємо вертикальний проміжок, щоб лінія була суцільною
+        start, end = (current, current) if previous is None else sorted((previous, current))
+        for y in range(start, end + 1):
+            dot_row = height - 1 - y
+            cells[dot_row // 4][x // 2] |= BRAILLE_DOTS[dot_row % 4][x % 2]
+        previous = current
+
+    return ["".join(chr(BRAILLE_BASE + bits) for bits in row) for row in cells]
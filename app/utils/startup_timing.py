@@ -0,0 +1,68 @@
+# ============================================
+# FILE: app/utils/startup_timing.py
+# ============================================
+"""
+Вимірювання часу холодного старту (імпорти модулів, етапи запуску)
+"""
+
+import logging
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StartupStage:
+    label: str
+    seconds: float
+    new_modules: int
+    top_packages: List[str] = field(default_factory=list)
+
+
+class StartupTimer:
+    """Збирає тривалість етапів старту та кількість завантажених модулів"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: List[StartupStage] = []
+
+    @contextmanager
+    def measure(self, label: str):
+        modules_before = set(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            new_modules = set(sys.modules) - modules_before
+            # Пакети, що принесли найбільше модулів, – першими
+            counts = Counter(name.split(".")[0].lstrip("_") for name in new_modules)
+            packages = [name for name, _ in counts.most_common()]
+            self.stages.append(StartupStage(label, elapsed, len(new_modules), packages))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def report(self, title: str = "Startup timing") -> str:
+        lines = [f"⏱️ {title}: {self.elapsed():.2f}s since process start"]
+        for stage in sorted(self.stages, key=lambda s: s.seconds, reverse=True):
+            packages = ", ".join(stage.top_packages[:6])
+            if len(stage.top_packages) > 6:
+                packages += ", …"
+            lines.append(
+                f"   {stage.seconds * 1000:8.1f} ms  {stage.label:<28} "
+                f"+{stage.new_modules} modules" + (f" ({packages})" if packages else "")
+            )
+        return "\n".join(lines)
+
+    def log_report(self, title: str = "Startup timing"):
+        logger.info(self.report(title))
+
+
+# Singleton (час старту рахуємо від першого імпорту цього модуля)
+startup_timer = StartupTimer()
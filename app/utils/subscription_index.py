@@ -0,0 +1,142 @@
+# ============================================
+# FILE: app/utils/subscription_index.py
+# ============================================
+"""
+Індекс дат списання підписок (SQLite): які аркуші мають списання у вікні дат
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+
+class SubscriptionIndex:
+    """
+    Таблиця (дата списання, аркуш, рядок), відсортована індексом за датою.
+
+    Щоденна перевірка бере з неї лише аркуші зі списаннями у своєму вікні,
+    тож її вартість залежить від кількості підписок до списання, а не від
+    кількості користувачів. Індекс – лише підказка: рядки все одно
+    перевіряються за даними аркуша, а повне пересканування (mark_built)
+    виправляє розбіжності після ручних правок таблиці.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS subscription_due ("
+                "sheet TEXT NOT NULL, row INTEGER NOT NULL, due TEXT NOT NULL, "
+                "PRIMARY KEY (sheet, row))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS subscription_due_by_date ON subscription_due (due)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def upsert(self, sheet: str, row: int, due: date):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subscription_due (sheet, row, due) VALUES (?, ?, ?)",
+                (sheet, int(row), due.isoformat()),
+            )
+
+    def remove(self, sheet: str, row: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM subscription_due WHERE sheet = ? AND row = ?", (sheet, int(row))
+            )
+
+    def remove_row(self, sheet: str, row: int):
+        """Рядок видалено з аркуша: прибирає запис і зсуває нижчі рядки вгору"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM subscription_due WHERE sheet = ? AND row = ?", (sheet, int(row))
+            )
+            # Зсув по зростанню, щоб не порушити первинний ключ
+            shifted = self._conn.execute(
+                "SELECT row FROM subscription_due WHERE sheet = ? AND row > ? ORDER BY row",
+                (sheet, int(row)),
+            ).fetchall()
+            for (old_row,) in shifted:
+                self._conn.execute(
+                    "UPDATE subscription_due SET row = ? WHERE sheet = ? AND row = ?",
+                    (old_row - 1, sheet, old_row),
+                )
+
+    def replace_sheet(self, sheet: str, entries: Iterable[Tuple[int, date]]):
+        """Замінює всі записи аркуша актуальними (рядок, дата списання)"""
+        rows = [(sheet, int(row), due.isoformat()) for row, due in entries]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM subscription_due WHERE sheet = ?", (sheet,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO subscription_due (sheet, row, due) VALUES (?, ?, ?)", rows
+            )
+
+    def rename_sheet(self, old: str, new: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM subscription_due WHERE sheet = ?", (new,))
+            self._conn.execute(
+                "UPDATE subscription_due SET sheet = ? WHERE sheet = ?", (new, old)
+            )
+
+    def retain_sheets(self, sheets: Iterable[str]):
+        """Прибирає записи аркушів, яких більше немає"""
+        keep = set(sheets)
+        with self._lock, self._conn:
+            known = [name for (name,) in self._conn.execute(
+                "SELECT DISTINCT sheet FROM subscription_due"
+            )]
+            self._conn.executemany(
+                "DELETE FROM subscription_due WHERE sheet = ?",
+                [(name,) for name in known if name not in keep],
+            )
+
+    def due_between(self, start: date, end: date) -> List[Tuple[date, str, int]]:
+        """Записи з датою списання в [start, end], за зростанням дати"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT due, sheet, row FROM subscription_due "
+                "WHERE due BETWEEN ? AND ? ORDER BY due, sheet, row",
+                (start.isoformat(), end.isoformat()),
+            ).fetchall()
+        return [(date.fromisoformat(due), sheet, row) for due, sheet, row in rows]
+
+    def due_sheets(self, start: date, end: date) -> List[str]:
+        """Аркуші, що мають хоча б одне списання в [start, end]"""
+        sheets = []
+        for _, sheet, _ in self.due_between(start, end):
+            if sheet not in sheets:
+                sheets.append(sheet)
+        return sheets
+
+    def mark_built(self, built_at: Optional[float] = None):
+        """Фіксує завершене повне сканування"""
+        value = str(built_at if built_at is not None else time.time())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)", (value,)
+            )
+
+    @property
+    def built_at(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'built_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def needs_rebuild(self, max_age: float, now: Optional[float] = None) -> bool:
+        built_at = self.built_at
+        now = now if now is not None else time.time()
+        return built_at is None or now - built_at > max_age
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,37 @@
+#File: tests/test_activity_index.py
+
+"""
+Тести для індексу останньої активності
+"""
+from datetime import date
+
+import pytest
+
+from app.utils.activity_index import ActivityIndex
+
+
+@pytest.fixture
+def index():
+    activity = ActivityIndex(":memory:")
+    yield activity
+    activity.close()
+
+
+class TestActivityIndex:
+
+    def test_touch_keeps_latest_day(self, index):
+        index.touch(1, date(2024, 5, 6))
+        index.touch(1, date(2024, 5, 4))
+        assert index.last_active(1) == date(2024, 5, 6)
+        assert index.last_active(2) is None
+
+    def test_active_since(self, index):
+        index.touch(1, date(2024, 5, 6))
+        index.touch(2, date(2024, 5, 5))
+        assert index.active_since(date(2024, 5, 6), [1, 2, 3]) == {1}
+        assert index.active_since(date(2024, 5, 5), [2, 3]) == {2}
+
+    def test_active_since_many_ids(self, index):
+        for user_id in range(1200):
+            index.touch(user_id, date(2024, 5, 6))
+        assert len(index.active_since(date(2024, 5, 6), range(1500))) == 1200
@@ -0,0 +1,101 @@
+#File: tests/test_cache.py
+
+"""
+Тести для кешів
+"""
+from app.utils.cache import LRUCache, DiskCache, make_cache_key, make_fingerprint, ttl_epoch
+
+
+class TestLRUCache:
+
+    def test_get_missing(self):
+        cache = LRUCache(max_items=2)
+        assert cache.get("a") is None
+        assert cache.get("a", "default") == "default"
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_items=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_byte_budget(self):
+        evicted = []
+        cache = LRUCache(max_bytes=10, on_evict=lambda k, v: evicted.append(k))
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        cache.set("c", b"123")
+        assert cache.total_bytes <= 10
+        assert evicted == ["a"]
+
+    def test_oversized_value_not_stored(self):
+        evicted = []
+        cache = LRUCache(max_bytes=4, on_evict=lambda k, v: evicted.append(k))
+        cache.set("big", b"123456")
+        assert len(cache) == 0
+        assert evicted == ["big"]
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(ttl=10)
+        cache.set("a", 1)
+        now[0] = 105.0
+        assert cache.get("a") == 1
+        now[0] = 111.0
+        assert cache.get("a") is None
+
+    def test_per_entry_ttl(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(ttl=10)
+        cache.set("short", 1)
+        cache.set("long", 2, ttl=100)
+        now[0] = 150.0
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+        now[0] = 201.0
+        assert cache.get("long") is None
+
+
+class TestDiskCache:
+
+    def test_roundtrip(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=1024)
+        cache.set("key", b"data")
+        assert cache.get("key") == b"data"
+        assert cache.get("other") is None
+
+    def test_size_limit(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=10)
+        cache.set("a", b"123456")
+        cache.set("b", b"123456")
+        total = sum(p.stat().st_size for p in tmp_path.iterdir())
+        assert total <= 10
+
+
+def test_make_cache_key():
+    assert make_cache_key("user", "pie", 3) == "user|pie|3"
+
+
+def test_ttl_epoch():
+    assert ttl_epoch(300, now=299.0) == ttl_epoch(300, now=0.0)
+    assert ttl_epoch(300, now=300.0) == ttl_epoch(300, now=0.0) + 1
+    assert ttl_epoch(0, now=10_000.0) == 0
+
+
+class TestMakeFingerprint:
+
+    def test_key_order_and_rounding_ignored(self):
+        first = make_fingerprint("analysis", {"a": 1.0000001, "b": " x "})
+        second = make_fingerprint("analysis", {"b": "x", "a": 1})
+        assert first == second
+
+    def test_changes_with_data(self):
+        base = make_fingerprint("analysis", [{"amount": -100.0}])
+        assert base != make_fingerprint("analysis", [{"amount": -101.0}])
+        assert base != make_fingerprint("prediction", [{"amount": -100.0}])
@@ -0,0 +1,47 @@
+#File: tests/test_downsampling.py
+
+"""
+Тести для проріджування часових рядів
+"""
+import numpy as np
+from app.utils.downsampling import minmax_downsample
+
+
+class TestMinMaxDownsample:
+
+    def test_short_series_unchanged(self):
+        x = np.arange(10)
+        y = np.arange(10) * 2
+        new_x, new_y = minmax_downsample(x, y, buckets=10)
+        assert list(new_x) == list(x)
+        assert list(new_y) == list(y)
+
+    def test_output_bounded_by_buckets(self):
+        x = np.arange(100_000)
+        y = np.sin(x / 50.0)
+        new_x, new_y = minmax_downsample(x, y, buckets=200)
+        assert len(new_x) <= 2 * 200 + 2
+        assert len(new_x) == len(new_y)
+
+    def test_keeps_extremes_and_endpoints(self):
+        rng = np.random.default_rng(1)
+        x = np.arange(10_000)
+        y = rng.normal(size=10_000)
+        y[1234] = 100.0
+        y[8765] = -100.0
+        new_x, new_y = minmax_downsample(x, y, buckets=50)
+        assert new_y.max() == 100.0
+        assert new_y.min() == -100.0
+        assert new_x[0] == 0 and new_x[-1] == 9_999
+
+    def test_preserves_order(self):
+        x = np.arange(5_000)
+        y = np.cos(x / 7.0)
+        new_x, _ = minmax_downsample(x, y, buckets=30)
+        assert np.all(np.diff(new_x) > 0)
+
+    def test_constant_x(self):
+        x = np.zeros(100)
+        y = np.arange(100)
+        new_x, new_y = minmax_downsample(x, y, buckets=5)
+        assert set(new_y) == {0, 99}
@@ -3,8 +3,12 @@
 """
 Тести для форматерів
 """
+import csv
+import io
+
 import pytest
 from app.utils.formatters import (
+    format_csv_number,
     format_currency,
     format_date,
     split_long_message,
@@ -29,6 +33,29 @@ class TestFormatCurrency:
         assert "1 234 567.89" in result
 
 
+class TestFormatCsvNumber:
+
+    def test_whole_numbers_without_fraction(self):
+        assert format_csv_number(-150.0) == "-150"
+        assert format_csv_number(850.0) == "850"
+        assert format_csv_number(0.0) == "0"
+
+    def test_fractional_numbers(self):
+        assert format_csv_number(-150.5) == "-150.5"
+        assert format_csv_number(0.1) == "0.1"
+
+    def test_missing_value(self):
+        assert format_csv_number(None) == ""
+
+    def test_matches_pandas_export_row(self):
+        # Рядок, який давав старий експорт через pandas для тих самих даних
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(
+            ["2024-01-05 10:00", format_csv_number(-150.0), "a", "a", format_csv_number(850.0), "UAH"]
+        )
+        assert buffer.getvalue() == "2024-01-05 10:00,-150,a,a,850,UAH\n"
+
+
 class TestFormatDate:
     
     def test_format_date(self):
@@ -0,0 +1,38 @@
+#File: tests/test_helpers.py
+
+"""
+Тести для пошуку діапазону рядків за датою
+"""
+from datetime import datetime
+
+from app.utils.helpers import locate_date_range
+
+
+def _day(day: int) -> datetime:
+    return datetime(2026, 9, day, 12, 0)
+
+
+class TestLocateDateRange:
+
+    def test_sorted_dates(self):
+        dates = [_day(d) for d in range(1, 31)]
+        assert locate_date_range(dates, _day(10), _day(12)) == (9, 11)
+
+    def test_open_bounds(self):
+        dates = [_day(d) for d in range(1, 11)]
+        assert locate_date_range(dates) == (0, 9)
+        assert locate_date_range(dates, start=_day(8)) == (7, 9)
+        assert locate_date_range(dates, end=_day(2)) == (0, 1)
+
+    def test_skips_rows_without_date(self):
+        dates = [None, _day(1), None, _day(5), _day(6), None]
+        assert locate_date_range(dates, _day(2), _day(30)) == (3, 4)
+
+    def test_no_matches(self):
+        dates = [_day(1), _day(2)]
+        assert locate_date_range(dates, _day(10), _day(20)) is None
+        assert locate_date_range([None, None]) is None
+
+    def test_unsorted_dates_span_first_to_last_match(self):
+        dates = [_day(1), _day(20), _day(3), _day(15), _day(4)]
+        assert locate_date_range(dates, _day(10), _day(25)) == (1, 3)
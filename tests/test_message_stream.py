@@ -0,0 +1,126 @@
+#File: tests/test_message_stream.py
+
+"""
+Тести для поступового показу тексту в повідомленнях
+"""
+import asyncio
+
+from app.utils.message_stream import MessageStreamer, split_point
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeMessage:
+
+    def __init__(self, sent):
+        self.sent = sent
+        self.text = None
+        self.edits = []
+
+    async def edit_text(self, text):
+        self.text = text
+        self.edits.append(text)
+        return self
+
+    async def answer(self, text):
+        message = FakeMessage(self.sent)
+        message.text = text
+        self.sent.append(message)
+        return message
+
+
+class TestSplitPoint:
+
+    def test_prefers_paragraph(self):
+        text = "a" * 60 + "\n\n" + "b" * 60
+        assert split_point(text, 100) == 60
+
+    def test_falls_back_to_space(self):
+        text = "a" * 60 + " " + "b" * 60
+        assert split_point(text, 100) == 60
+
+    def test_hard_cut(self):
+        assert split_point("a" * 200, 100) == 100
+
+    def test_ignores_early_separator(self):
+        text = "a" * 10 + " " + "b" * 200
+        assert split_point(text, 100) == 100
+
+
+class TestMessageStreamer:
+
+    def test_first_chunk_shown_immediately(self):
+        sent = []
+        message = FakeMessage(sent)
+        streamer = MessageStreamer(message, header="H\n", clock=FakeClock())
+
+        asyncio.run(streamer.feed("Привіт"))
+
+        assert message.edits == ["H\nПривіт"]
+
+    def test_edits_are_rate_limited(self):
+        clock = FakeClock()
+        message = FakeMessage([])
+        streamer = MessageStreamer(message, min_interval=1.0, clock=clock)
+
+        async def scenario():
+            await streamer.feed("a")
+            clock.now = 0.3
+            await streamer.feed("b")
+            clock.now = 0.6
+            await streamer.feed("c")
+            clock.now = 1.1
+            await streamer.feed("d")
+
+        asyncio.run(scenario())
+
+        assert message.edits == ["a", "abcd"]
+
+    def test_finish_flushes_pending_text(self):
+        clock = FakeClock()
+        message = FakeMessage([])
+        streamer = MessageStreamer(message, min_interval=0.01, clock=clock)
+
+        async def scenario():
+            await streamer.feed("a")
+            await streamer.feed("b")
+            await streamer.finish()
+
+        asyncio.run(scenario())
+
+        assert message.edits[-1] == "ab"
+
+    def test_rollover_to_new_message(self):
+        sent = []
+        message = FakeMessage(sent)
+        streamer = MessageStreamer(message, max_length=20, min_interval=0, clock=FakeClock())
+
+        async def scenario():
+            await streamer.feed("перший абзац\n\nдругий абзац тексту")
+            await streamer.finish()
+
+        asyncio.run(scenario())
+
+        assert message.text == "перший абзац"
+        assert [m.text for m in sent] == ["другий абзац тексту"]
+        assert streamer.messages_sent == 1
+
+    def test_no_edit_without_changes(self):
+        message = FakeMessage([])
+        streamer = MessageStreamer(message, min_interval=0, clock=FakeClock())
+
+        async def scenario():
+            await streamer.feed("текст")
+            await streamer.feed("")
+            await streamer.finish()
+
+        asyncio.run(scenario())
+
+        assert message.edits == ["текст"]
@@ -0,0 +1,67 @@
+#File: tests/test_prompt_compaction.py
+
+"""
+Тести для стиснення транзакцій у AI-промптах
+"""
+from app.utils.prompt_compaction import compact_transactions, estimate_tokens
+
+
+def _tx(day: int, amount: float, category: str = "Їжа", note: str = "кава") -> dict:
+    return {
+        "date": f"2026-09-{day:02d}T12:00:00+00:00",
+        "amount": amount,
+        "currency": "UAH",
+        "category": category,
+        "note": note,
+    }
+
+
+def _total(text: str) -> float:
+    return sum(float(line.split(" | ")[1].split()[0]) for line in text.splitlines())
+
+
+class TestEstimateTokens:
+
+    def test_empty(self):
+        assert estimate_tokens("") == 0
+
+    def test_cyrillic_costs_more_than_latin(self):
+        assert estimate_tokens("привіт") > estimate_tokens("privit")
+
+
+class TestCompactTransactions:
+
+    def test_small_input_verbatim(self):
+        transactions = [_tx(1, -50), _tx(2, 1000, "Зарплата", "аванс")]
+        text = compact_transactions(transactions, max_tokens=1000)
+        assert text.splitlines() == [
+            "2026-09-01T12:00:00+00:00 | -50 UAH | Їжа | кава",
+            "2026-09-02T12:00:00+00:00 | 1000 UAH | Зарплата | аванс",
+        ]
+
+    def test_groups_small_expenses_and_keeps_totals(self):
+        transactions = [_tx(day, -40.5) for day in range(1, 29) for _ in range(10)]
+        text = compact_transactions(transactions, max_tokens=800)
+        assert estimate_tokens(text) <= 800
+        assert len(text.splitlines()) == 28
+        assert "2026-09-05 | -405 UAH | Їжа | транзакцій: 10" in text
+        assert round(_total(text), 2) == round(-40.5 * 280, 2)
+
+    def test_outliers_and_income_kept_verbatim(self):
+        transactions = [_tx(day, -30) for day in range(1, 29) for _ in range(5)]
+        transactions.append(_tx(15, -4000, note="ноутбук"))
+        transactions.append(_tx(10, 25000, "Зарплата", "зарплата"))
+        text = compact_transactions(transactions, max_tokens=800)
+        assert "2026-09-15T12:00:00+00:00 | -4000 UAH | Їжа | ноутбук" in text
+        assert "2026-09-10T12:00:00+00:00 | 25000 UAH | Зарплата | зарплата" in text
+
+    def test_hard_budget_drops_oldest(self):
+        transactions = [
+            _tx(day, -10 * day, category=f"Категорія {n}")
+            for day in range(1, 29) for n in range(20)
+        ]
+        text = compact_transactions(transactions, max_tokens=300)
+        assert estimate_tokens(text) <= 300
+        lines = text.splitlines()
+        assert lines[0].startswith("... ще")
+        assert "2026-09" in lines[-1]
@@ -0,0 +1,61 @@
+#File: tests/test_rate_table.py
+
+"""
+Тести для історичних курсів валют
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app.utils.rate_table import RateTable
+
+
+@pytest.fixture
+def table():
+    rates = RateTable(":memory:")
+    rates.upsert(date(2024, 1, 1), {"USD": 38.0, "EUR": 42.0})
+    rates.upsert(date(2024, 1, 3), {"USD": 39.0})
+    yield rates
+    rates.close()
+
+
+class TestRateTable:
+
+    def test_rate_on_exact_and_previous_day(self, table):
+        assert table.rate_on("USD", date(2024, 1, 1)) == 38.0
+        assert table.rate_on("usd", "2024-01-02T12:00:00") == 38.0
+        assert table.rate_on("USD", datetime(2024, 1, 5, 9, 30)) == 39.0
+
+    def test_no_rate_before_history(self, table):
+        assert table.rate_on("USD", date(2023, 12, 31)) is None
+
+    def test_convert_many_mixed(self, table):
+        result = table.convert_many(
+            [100, 10, 10, 5, 1, 7],
+            ["UAH", "USD", "USD", "EUR", "GBP", "USD"],
+            ["2024-01-01", "2024-01-02", "2024-01-03", "2024-02-01", "2024-01-01", "bad"],
+        )
+        assert list(result[:4]) == [100.0, 380.0, 390.0, 210.0]
+        assert np.isnan(result[4])
+        assert np.isnan(result[5])
+
+    def test_missing_currency_is_uah_and_missing_date_is_nan(self, table):
+        result = table.convert_many([5, 2], [None, "USD"], [None, None])
+        assert result[0] == 5.0
+        assert np.isnan(result[1])
+
+    def test_upsert_replaces_rate(self, table):
+        assert table.rate_on("USD", date(2024, 1, 3)) == 39.0
+        table.upsert(date(2024, 1, 3), {"USD": 39.5})
+        assert table.rate_on("USD", date(2024, 1, 3)) == 39.5
+
+    def test_missing_days(self, table):
+        assert table.missing_days(date(2024, 1, 1), date(2024, 1, 4)) == [
+            date(2024, 1, 2),
+            date(2024, 1, 4),
+        ]
+
+    def test_length_mismatch(self, table):
+        with pytest.raises(ValueError):
+            table.convert_many([1, 2], ["USD"], ["2024-01-01"])
@@ -0,0 +1,122 @@
+#File: tests/test_reminder_schedule.py
+
+"""
+Тести для розкладів нагадувань і черги спрацювань
+"""
+from datetime import datetime, time, timedelta
+
+import pytest
+import pytz
+
+from app.utils.reminder_schedule import (
+    ALL_WEEKDAYS,
+    REMINDER_TZ,
+    ReminderQueue,
+    ReminderSchedule,
+    parse_times,
+    parse_weekdays,
+)
+
+
+def kyiv(*args) -> datetime:
+    return REMINDER_TZ.localize(datetime(*args))
+
+
+class TestParsing:
+
+    def test_parse_times_sorted_unique(self):
+        assert parse_times("20:30, 9:00 9.00") == (time(9, 0), time(20, 30))
+
+    @pytest.mark.parametrize("text", ["25:00", "9:60", "abc", "1,2,3"])
+    def test_parse_times_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_times(text)
+
+    def test_parse_times_limit(self):
+        with pytest.raises(ValueError):
+            parse_times("1:00,2:00,3:00,4:00,5:00,6:00")
+
+    def test_parse_weekdays(self):
+        assert parse_weekdays("12345") == frozenset({1, 2, 3, 4, 5})
+        assert parse_weekdays("") == ALL_WEEKDAYS
+
+    def test_from_settings_falls_back_to_default(self):
+        schedule = ReminderSchedule.from_settings("oops", "67", [time(20, 0), time(9, 0)])
+        assert schedule.times == (time(9, 0), time(20, 0))
+        assert schedule.format_weekdays() == "Сб, Нд"
+        assert schedule.settings_row() == ["09:00,20:00", "67"]
+
+
+class TestNextAfter:
+
+    def test_same_day_later_time(self):
+        schedule = ReminderSchedule(times=(time(9, 0), time(20, 0)))
+        # 2024-05-06 – понеділок
+        fire_at = schedule.next_after(kyiv(2024, 5, 6, 10, 0))
+        assert fire_at == kyiv(2024, 5, 6, 20, 0)
+        assert fire_at.tzinfo == pytz.UTC
+
+    def test_skips_excluded_weekdays(self):
+        schedule = ReminderSchedule(times=(time(9, 0),), weekdays=frozenset({6, 7}))
+        assert schedule.next_after(kyiv(2024, 5, 6, 8, 0)) == kyiv(2024, 5, 11, 9, 0)
+
+    def test_offset_and_strictly_after(self):
+        schedule = ReminderSchedule(times=(time(9, 0),))
+        moment = kyiv(2024, 5, 6, 9, 5)
+        assert schedule.next_after(moment, timedelta(minutes=5)) == kyiv(2024, 5, 7, 9, 5)
+
+
+class TestReminderQueue:
+
+    def test_pop_due_reschedules(self):
+        queue = ReminderQueue()
+        start = kyiv(2024, 5, 6, 8, 0)
+        queue.schedule(1, ReminderSchedule(times=(time(9, 0),)), start)
+        queue.schedule(2, ReminderSchedule(times=(time(12, 0),)), start)
+        assert queue.pop_due(kyiv(2024, 5, 6, 8, 59)) == []
+        assert queue.pop_due(kyiv(2024, 5, 6, 9, 0)) == [1]
+        assert queue.next_due() == kyiv(2024, 5, 6, 12, 0)
+        assert queue.pop_due(kyiv(2024, 5, 7, 9, 30)) == [2, 1]
+        assert queue.pop_due(kyiv(2024, 5, 7, 9, 30)) == []
+
+    def test_reschedule_and_remove_drop_old_entries(self):
+        queue = ReminderQueue()
+        start = kyiv(2024, 5, 6, 8, 0)
+        queue.schedule(1, ReminderSchedule(times=(time(9, 0),)), start)
+        queue.schedule(1, ReminderSchedule(times=(time(10, 0),)), start)
+        queue.schedule(2, ReminderSchedule(times=(time(9, 30),)), start)
+        queue.remove(2)
+        assert len(queue) == 1 and 2 not in queue
+        assert queue.next_due() == kyiv(2024, 5, 6, 10, 0)
+        assert queue.pop_due(kyiv(2024, 5, 6, 10, 0)) == [1]
+
+    def test_spread_offsets_same_schedule(self):
+        queue = ReminderQueue(spread_minutes=15)
+        start = kyiv(2024, 5, 6, 8, 0)
+        for user_id in (30, 31, 44):
+            queue.schedule(user_id, ReminderSchedule(times=(time(9, 0),)), start)
+        assert queue.pop_due(kyiv(2024, 5, 6, 9, 0)) == [30]
+        assert queue.pop_due(kyiv(2024, 5, 6, 9, 1)) == [31]
+        assert queue.next_due() == kyiv(2024, 5, 6, 9, 14)
+
+    def test_reload_keeps_due_entries(self):
+        queue = ReminderQueue()
+        nine = ReminderSchedule(times=(time(9, 0),))
+        queue.schedule(1, nine, kyiv(2024, 5, 6, 8, 59, 30))
+        assert queue.pop_due(kyiv(2024, 5, 6, 8, 59, 30)) == []
+        # Перечитування таблиці на тіку 09:00:30, до pop_due
+        queue.reload(
+            {1: nine, 2: ReminderSchedule(times=(time(9, 0),), weekdays=frozenset({1}))},
+            since=kyiv(2024, 5, 6, 8, 59, 30),
+        )
+        assert queue.pop_due(kyiv(2024, 5, 6, 9, 0, 30)) == [1, 2]
+
+    def test_reload_drops_missing_and_reschedules_changed(self):
+        queue = ReminderQueue()
+        start = kyiv(2024, 5, 6, 8, 0)
+        queue.schedule(1, ReminderSchedule(times=(time(9, 0),)), start)
+        queue.schedule(2, ReminderSchedule(times=(time(9, 0),)), start)
+        queue.reload({2: ReminderSchedule(times=(time(10, 0),))}, since=start)
+        assert 1 not in queue
+        assert queue.pop_due(kyiv(2024, 5, 6, 9, 30)) == []
+        assert queue.pop_due(kyiv(2024, 5, 6, 10, 0)) == [2]
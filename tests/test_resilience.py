@@ -0,0 +1,167 @@
+#File: tests/test_resilience.py
+
+"""
+Тести для запобіжника та виконавця з лімітами
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.resilience import (
+    BoundedExecutor,
+    CircuitBreaker,
+    CircuitOpenError,
+    QueueFullError,
+    TokenBucket,
+)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_single_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 15
+        assert not breaker.allow()
+
+
+class TestBoundedExecutor:
+
+    def test_returns_result(self):
+        executor = BoundedExecutor("test", max_concurrency=2, max_queue=0, timeout=1)
+        try:
+            assert asyncio.run(executor.run(lambda x: x * 2, 21)) == 42
+        finally:
+            executor.shutdown()
+
+    def test_limits_concurrency_and_rejects_overflow(self):
+        release = threading.Event()
+        running = []
+
+        def slow():
+            running.append(1)
+            release.wait(2)
+            return "ok"
+
+        executor = BoundedExecutor("test", max_concurrency=1, max_queue=1, timeout=5)
+
+        async def scenario():
+            first = asyncio.create_task(executor.run(slow))
+            second = asyncio.create_task(executor.run(slow))
+            await asyncio.sleep(0.05)
+            assert len(running) == 1
+            with pytest.raises(QueueFullError):
+                await executor.run(slow)
+            release.set()
+            return await asyncio.gather(first, second)
+
+        try:
+            assert asyncio.run(scenario()) == ["ok", "ok"]
+        finally:
+            executor.shutdown()
+
+    def test_timeout_opens_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        executor = BoundedExecutor("test", max_concurrency=1, max_queue=0, timeout=0.05, breaker=breaker)
+
+        async def scenario():
+            with pytest.raises(asyncio.TimeoutError):
+                await executor.run(time.sleep, 0.3)
+            with pytest.raises(CircuitOpenError):
+                await executor.run(lambda: "ok")
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+
+class TestTokenBucket:
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(0.5)
+        clock.now = 0.5
+        assert bucket.try_acquire() == 0
+
+    def test_capacity_caps_idle_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=1, clock=clock)
+        clock.now = 100
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(1)
+
+    def test_pause_blocks_until_resume(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=10, clock=clock)
+        bucket.pause(5)
+        clock.now = 3
+        assert bucket.try_acquire() == pytest.approx(2)
+        clock.now = 5.5
+        assert bucket.try_acquire() == 0
+
+    def test_shorter_pause_does_not_shorten_longer_one(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, clock=clock)
+        bucket.pause(10)
+        bucket.pause(2)
+        clock.now = 5
+        assert bucket.try_acquire() == pytest.approx(5)
+
+    def test_acquire_waits_for_token(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def scenario():
+            started = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        assert asyncio.run(scenario()) >= 0.03
@@ -0,0 +1,67 @@
+#File: tests/test_sparklines.py
+
+"""
+Тести для текстових міні-графіків
+"""
+from app.utils.sparklines import (
+    BRAILLE_BASE,
+    block_sparkline,
+    braille_line,
+    horizontal_bar,
+    resample,
+)
+
+
+class TestResample:
+
+    def test_short_series_unchanged(self):
+        assert resample([1, 2, 3], 5) == [1, 2, 3]
+
+    def test_reducer_applied_per_chunk(self):
+        assert resample([1, 5, 2, 8, 3, 4], 3) == [5, 8, 4]
+        assert resample([1, 5, 2, 8], 2, reducer=sum) == [6, 10]
+
+
+class TestBlockSparkline:
+
+    def test_empty(self):
+        assert block_sparkline([]) == ""
+
+    def test_min_and_max(self):
+        line = block_sparkline([0, 5, 10])
+        assert line == "▁▅█"
+
+    def test_flat_series(self):
+        assert block_sparkline([0, 0, 0]) == "▁▁▁"
+        assert block_sparkline([3, 3]) == "██"
+
+    def test_width_limit(self):
+        assert len(block_sparkline(range(100), width=20)) == 20
+
+
+class TestHorizontalBar:
+
+    def test_full_and_empty(self):
+        assert horizontal_bar(1.0, 4) == "████"
+        assert horizontal_bar(0.0, 4) == "    "
+
+    def test_partial_cell(self):
+        assert horizontal_bar(0.5625, 2) == "█▏"
+
+
+class TestBrailleLine:
+
+    def test_dimensions(self):
+        rows = braille_line(list(range(100)), width=10, rows=3)
+        assert len(rows) == 3
+        assert all(len(row) == 10 for row in rows)
+
+    def test_rising_line_corners(self):
+        rows = braille_line([0, 1], width=1, rows=1)
+        # Ліва нижня та права верхня крапки, з'єднані по вертикалі
+        bits = ord(rows[0]) - BRAILLE_BASE
+        assert bits & 0x40
+        assert bits & 0x08
+
+    def test_empty(self):
+        assert braille_line([]) == []
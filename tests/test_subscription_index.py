@@ -0,0 +1,66 @@
+#File: tests/test_subscription_index.py
+
+"""
+Тести для індексу дат списання підписок
+"""
+from datetime import date
+
+import pytest
+
+from app.utils.subscription_index import SubscriptionIndex
+
+
+@pytest.fixture
+def index():
+    subscriptions = SubscriptionIndex(":memory:")
+    subscriptions.upsert("user_1", 3, date(2024, 5, 10))
+    subscriptions.upsert("user_1", 7, date(2024, 5, 12))
+    subscriptions.upsert("user_2", 2, date(2024, 5, 11))
+    yield subscriptions
+    subscriptions.close()
+
+
+class TestSubscriptionIndex:
+
+    def test_due_between_sorted_by_date(self, index):
+        assert index.due_between(date(2024, 5, 10), date(2024, 5, 11)) == [
+            (date(2024, 5, 10), "user_1", 3),
+            (date(2024, 5, 11), "user_2", 2),
+        ]
+
+    def test_due_sheets_unique(self, index):
+        assert index.due_sheets(date(2024, 5, 1), date(2024, 5, 31)) == ["user_1", "user_2"]
+        assert index.due_sheets(date(2024, 6, 1), date(2024, 6, 30)) == []
+
+    def test_upsert_moves_due_date(self, index):
+        index.upsert("user_1", 3, date(2024, 6, 10))
+        assert index.due_sheets(date(2024, 5, 10), date(2024, 5, 10)) == []
+        assert index.due_between(date(2024, 6, 10), date(2024, 6, 10)) == [
+            (date(2024, 6, 10), "user_1", 3),
+        ]
+
+    def test_remove_row_shifts_lower_rows(self, index):
+        index.upsert("user_1", 8, date(2024, 5, 13))
+        index.remove_row("user_1", 3)
+        rows = [(sheet, row) for _, sheet, row in index.due_between(date(2024, 5, 1), date(2024, 5, 31))]
+        assert rows == [("user_2", 2), ("user_1", 6), ("user_1", 7)]
+
+    def test_replace_sheet(self, index):
+        index.replace_sheet("user_1", [(5, date(2024, 5, 20))])
+        assert index.due_between(date(2024, 5, 1), date(2024, 5, 31)) == [
+            (date(2024, 5, 11), "user_2", 2),
+            (date(2024, 5, 20), "user_1", 5),
+        ]
+
+    def test_rename_and_retain_sheets(self, index):
+        index.rename_sheet("user_2", "alice")
+        assert index.due_sheets(date(2024, 5, 11), date(2024, 5, 11)) == ["alice"]
+        index.retain_sheets(["alice"])
+        assert index.due_sheets(date(2024, 5, 1), date(2024, 5, 31)) == ["alice"]
+
+    def test_needs_rebuild(self, index):
+        assert index.needs_rebuild(3600)
+        index.mark_built(built_at=1000.0)
+        assert index.built_at == 1000.0
+        assert not index.needs_rebuild(3600, now=2000.0)
+        assert index.needs_rebuild(3600, now=5000.0)